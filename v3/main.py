@@ -1,5 +1,6 @@
 import speech_recognition as sr
 import pyttsx3
+import wave
 import re
 import math
 import threading
@@ -7,9 +8,220 @@ import time
 import json
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import queue
 import sys
 
+# Palabras de activación para modo manos libres
+PALABRAS_ACTIVACION = ['calculadora', 'oye calculadora', 'hey calculadora']
+
+class DetectorActivacion:
+    """Detector local de la palabra de activación: búsqueda de palabras clave de PocketSphinx.
+    
+    Se alimenta con el audio tal como sale del micrófono y solo avisa cuando
+    oye alguna de las palabras; no graba frases ni usa la red. Lleva la cuenta
+    del audio procesado y del tiempo de CPU que ha costado.
+    """
+    
+    FRECUENCIA = 16000  # los modelos de PocketSphinx esperan 16 kHz
+    
+    def __init__(self, palabras, idioma='es-ES', sensibilidad=0.8):
+        # "oye calculadora" ya contiene "calculadora": basta con buscar la más corta
+        self.palabras = []
+        for palabra in sorted(set(palabras), key=len):
+            if not any(corta in palabra for corta in self.palabras):
+                self.palabras.append(palabra)
+        self.idioma = idioma
+        self.sensibilidad = sensibilidad
+        self.decoder = None
+        self.estado_resample = None
+        
+        self.segundos_audio = 0.0
+        self.segundos_cpu = 0.0
+        self.detecciones = 0
+    
+    def iniciar(self):
+        """Crea el decodificador; lanza sr.RequestError si falta PocketSphinx o el modelo"""
+        try:
+            from pocketsphinx import pocketsphinx
+        except ImportError:
+            raise sr.RequestError("PocketSphinx no instalado")
+        
+        directorio = os.path.join(os.path.dirname(sr.__file__), "pocketsphinx-data", self.idioma)
+        diccionario = os.path.join(directorio, "pronounciation-dictionary.dict")
+        if not os.path.isfile(diccionario):
+            raise sr.RequestError(f"sin modelo de PocketSphinx para {self.idioma}")
+        
+        # Una palabra fuera del diccionario hace fallar add_kws: quitar esas frases
+        with open(diccionario, encoding='utf-8', errors='replace') as f:
+            conocidas = {linea.split(maxsplit=1)[0].split('(', 1)[0] for linea in f if linea.strip()}
+        self.palabras = [frase for frase in self.palabras if all(p in conocidas for p in frase.split())]
+        if not self.palabras:
+            raise sr.RequestError(f"ninguna palabra de activación está en el diccionario de {self.idioma}")
+        
+        config = pocketsphinx.Config()
+        config.set_string("-hmm", os.path.join(directorio, "acoustic-model"))
+        config.set_string("-lm", os.path.join(directorio, "language-model.lm.bin"))
+        config.set_string("-dict", diccionario)
+        config.set_string("-logfn", os.devnull)
+        self.decoder = pocketsphinx.Decoder(config)
+        
+        # Umbral como en recognize_sphinx: entre 1e-50 y 1e-5 según la sensibilidad
+        with sr.PortableNamedTemporaryFile("w") as f:
+            f.writelines(f"{palabra} /1e{100 * self.sensibilidad - 110}/\n" for palabra in self.palabras)
+            f.flush()
+            self.decoder.add_kws("activacion", f.name)
+        self.decoder.activate_search("activacion")
+        self.decoder.start_utt()
+        return self
+    
+    def alimentar(self, datos, frecuencia, ancho=2):
+        """Procesa un trozo de audio; devuelve la palabra si se ha oído (None si no)"""
+        inicio = time.thread_time()
+        if ancho != 2 or frecuencia != self.FRECUENCIA:
+            try:
+                import audioop  # solo para convertir; Python 3.13 ya no lo trae
+            except ImportError:
+                raise sr.RequestError(f"el audio es de {frecuencia} Hz y {8 * ancho} bits y pasarlo a "
+                                      f"{self.FRECUENCIA} Hz y 16 bits necesita audioop (pip install audioop-lts)")
+        if ancho != 2:
+            datos = audioop.lin2lin(datos, ancho, 2)
+        if frecuencia != self.FRECUENCIA:
+            datos, self.estado_resample = audioop.ratecv(
+                datos, 2, 1, frecuencia, self.FRECUENCIA, self.estado_resample)
+        self.decoder.process_raw(datos, False, False)
+        hipotesis = self.decoder.hyp()
+        if hipotesis is not None:
+            # Empezar de cero para no volver a contar la misma palabra
+            self.decoder.end_utt()
+            self.decoder.start_utt()
+            self.detecciones += 1
+        self.segundos_audio += len(datos) / (2 * self.FRECUENCIA)
+        self.segundos_cpu += time.thread_time() - inicio
+        return hipotesis.hypstr if hipotesis is not None else None
+    
+    def esperar(self, source, seguir):
+        """Lee el micrófono hasta oír la palabra; None si seguir() deja de ser cierto"""
+        while seguir():
+            datos = source.stream.read(source.CHUNK)
+            palabra = self.alimentar(datos, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            if palabra:
+                return palabra
+        return None
+    
+    def uso_cpu(self):
+        """Porcentaje de un núcleo que cuesta seguir el audio en tiempo real"""
+        return 100 * self.segundos_cpu / self.segundos_audio if self.segundos_audio else 0.0
+    
+    def probar_wav(self, ruta, esperadas=0, bloque=1024):
+        """Pasa una grabación por el detector; devuelve uso de CPU y falsas activaciones"""
+        with wave.open(ruta, 'rb') as wav:
+            if wav.getnchannels() != 1:
+                raise ValueError("la grabación debe ser mono")
+            frecuencia, ancho = wav.getframerate(), wav.getsampwidth()
+            while True:
+                datos = wav.readframes(bloque)
+                if not datos:
+                    break
+                self.alimentar(datos, frecuencia, ancho)
+        
+        falsas = max(0, self.detecciones - esperadas)
+        return {
+            'segundos_audio': round(self.segundos_audio, 1),
+            'detecciones': self.detecciones,
+            'falsas_activaciones': falsas,
+            'falsas_por_hora': round(falsas * 3600 / self.segundos_audio, 2) if self.segundos_audio else 0.0,
+            'cpu_porcentaje': round(self.uso_cpu(), 2),
+        }
+
+
+class DiarioHistorial:
+    """Historial en un archivo JSONL al que solo se añaden líneas, escrito por un hilo.
+    
+    Cada operación se escribe en cuanto el hilo la recoge (un cierre brusco no
+    pierde la sesión) y el fsync se agrupa cada intervalo_fsync segundos. Al
+    pasar de tamano_maximo el archivo se rota a .1, .2, ...
+    """
+    
+    FIN = object()
+    
+    def __init__(self, archivo='historial_calculadora.jsonl', intervalo_fsync=1.0,
+                 tamano_maximo=64 * 1024 * 1024, archivos_rotados=3):
+        self.archivo = archivo
+        self.intervalo_fsync = intervalo_fsync
+        self.tamano_maximo = tamano_maximo
+        self.archivos_rotados = archivos_rotados
+        self.cola = queue.Queue()
+        self.hilo = None
+        self.escritos = 0
+    
+    def registrar(self, entrada):
+        """Encola un registro; vuelve al instante"""
+        if self.hilo is None:
+            self.hilo = threading.Thread(target=self.bucle_escritura, name='diario-historial', daemon=True)
+            self.hilo.start()
+        self.cola.put(entrada)
+    
+    def cerrar(self, timeout=5.0):
+        """Escribe lo pendiente, hace fsync y para el hilo"""
+        if self.hilo is not None:
+            self.cola.put(self.FIN)
+            self.hilo.join(timeout)
+            self.hilo = None
+    
+    def bucle_escritura(self):
+        try:
+            archivo = open(self.archivo, 'ab')
+        except OSError as e:
+            print(f"⚠️  Error abriendo el historial: {e}")
+            return
+        pendiente_fsync = False
+        ultimo_fsync = time.monotonic()
+        terminar = False
+        try:
+            while not terminar:
+                try:
+                    lote = [self.cola.get(timeout=self.intervalo_fsync if pendiente_fsync else None)]
+                except queue.Empty:
+                    lote = []
+                while True:
+                    try:
+                        lote.append(self.cola.get_nowait())
+                    except queue.Empty:
+                        break
+                if self.FIN in lote:
+                    terminar = True
+                    lote = [entrada for entrada in lote if entrada is not self.FIN]
+                
+                if lote:
+                    archivo.write(b''.join(
+                        json.dumps(entrada, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                        for entrada in lote))
+                    archivo.flush()
+                    self.escritos += len(lote)
+                    pendiente_fsync = True
+                if pendiente_fsync and (terminar or time.monotonic() - ultimo_fsync >= self.intervalo_fsync):
+                    os.fsync(archivo.fileno())
+                    pendiente_fsync = False
+                    ultimo_fsync = time.monotonic()
+                if archivo.tell() >= self.tamano_maximo:
+                    archivo = self.rotar(archivo)
+        except OSError as e:
+            print(f"⚠️  Error escribiendo el historial: {e}")
+        finally:
+            archivo.close()
+    
+    def rotar(self, archivo):
+        """Pasa el diario lleno a .1 (desplazando los anteriores) y abre uno nuevo"""
+        os.fsync(archivo.fileno())
+        archivo.close()
+        for numero in range(self.archivos_rotados - 1, 0, -1):
+            if os.path.exists(f"{self.archivo}.{numero}"):
+                os.replace(f"{self.archivo}.{numero}", f"{self.archivo}.{numero + 1}")
+        os.replace(self.archivo, f"{self.archivo}.1")
+        return open(self.archivo, 'ab')
+
+
 class CalculadoraVozLinux:
     def __init__(self):
         # Configuración inicial
@@ -18,12 +230,19 @@ class CalculadoraVozLinux:
         # Variables de estado
         self.ultimo_resultado = 0
         self.historial = []
+        self.diario = DiarioHistorial() if self.config['guardar_historial'] else None
         self.modo_continuo = False
         self.pausado = False
         
         # Cola para manejo de comandos
         self.cola_comandos = queue.Queue()
         
+        # Google y Sphinx decodifican cada frase a la vez; victorias y latencia por motor
+        self.pool_reconocimiento = ThreadPoolExecutor(max_workers=2, thread_name_prefix='reconocer')
+        self.estadisticas_reconocimiento = {
+            motor: {'intentos': 0, 'ganadas': 0, 'tiempo_total': 0.0} for motor in ('google', 'sphinx')
+        }
+        
         # Inicializar componentes de audio
         self.inicializar_audio()
         
@@ -31,7 +250,8 @@ class CalculadoraVozLinux:
         self.inicializar_patrones()
         
         # Palabras de activación para modo manos libres
-        self.palabras_activacion = ['calculadora', 'oye calculadora', 'hey calculadora']
+        self.palabras_activacion = list(PALABRAS_ACTIVACION)
+        self.detector_activacion = None
     
     def cargar_configuracion(self):
         """Carga configuración desde archivo JSON"""
@@ -43,6 +263,7 @@ class CalculadoraVozLinux:
             'modo_verboso': True,
             'idioma_reconocimiento': 'es-ES',
             'precision_decimales': 4,
+            'sensibilidad_activacion': 0.8,  # 0 = casi nunca se activa, 1 = con cualquier ruido
             'usar_hotkeys': False  # Deshabilitado por defecto en Linux
         }
         
@@ -280,13 +501,10 @@ class CalculadoraVozLinux:
                 
                 print("🔄 Procesando audio...")
                 
-                # Intentar reconocimiento con Google primero
+                # Google y Sphinx a la vez: sin conexión, Sphinx ya ha terminado cuando Google falla
                 try:
-                    texto = self.recognizer.recognize_google(
-                        audio, 
-                        language=self.config['idioma_reconocimiento']
-                    )
-                    print(f"📝 Escuchado: {texto}")
+                    texto, motor = self.reconocer_concurrente(audio)
+                    print(f"📝 Escuchado{' (offline)' if motor == 'sphinx' else ''}: {texto}")
                     return texto.lower()
                 
                 except sr.UnknownValueError:
@@ -297,15 +515,9 @@ class CalculadoraVozLinux:
                 
                 except sr.RequestError as e:
                     print(f"⚠️  Error del servicio de reconocimiento: {e}")
-                    # Intentar reconocimiento offline si está disponible
-                    try:
-                        texto = self.recognizer.recognize_sphinx(audio)
-                        print(f"📝 Escuchado (offline): {texto}")
-                        return texto.lower()
-                    except:
-                        if intento < intentos - 1:
-                            continue
-                        return "error_servicio"
+                    if intento < intentos - 1:
+                        continue
+                    return "error_servicio"
                 
             except sr.WaitTimeoutError:
                 if intento < intentos - 1:
@@ -322,6 +534,59 @@ class CalculadoraVozLinux:
         
         return "error"
     
+    def decodificar(self, motor, audio):
+        """Transcribe con un motor anotando su latencia"""
+        inicio = time.perf_counter()
+        try:
+            if motor == 'google':
+                return self.recognizer.recognize_google(audio, language=self.config['idioma_reconocimiento'])
+            return self.recognizer.recognize_sphinx(audio)
+        finally:
+            estadisticas = self.estadisticas_reconocimiento[motor]
+            estadisticas['intentos'] += 1
+            estadisticas['tiempo_total'] += time.perf_counter() - inicio
+    
+    def es_operacion_valida(self, texto):
+        """Si la transcripción encaja en alguno de los patrones de operación"""
+        texto = self.convertir_numeros_texto(re.sub(r'[,.]', '.', texto))
+        return any(re.search(patron, texto, re.IGNORECASE) for patron in self.patrones_operaciones)
+    
+    def reconocer_concurrente(self, audio):
+        """Decodifica la frase con Google y Sphinx a la vez; devuelve (texto, motor).
+        
+        Gana la primera transcripción que se entienda como operación. Si ninguna
+        lo hace se prefiere la de Google, y la de Sphinx solo si Google no tuvo
+        conexión, como al probarlos uno detrás de otro.
+        """
+        futuros = {self.pool_reconocimiento.submit(self.decodificar, motor, audio): motor
+                   for motor in ('google', 'sphinx')}
+        textos, errores = {}, {}
+        pendientes = set(futuros)
+        while pendientes:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                motor = futuros[futuro]
+                try:
+                    textos[motor] = futuro.result()
+                except Exception as e:
+                    errores[motor] = e
+                    continue
+                if textos[motor] and self.es_operacion_valida(textos[motor]):
+                    # La otra sigue en el pool, pero su resultado ya no se espera
+                    self.estadisticas_reconocimiento[motor]['ganadas'] += 1
+                    return textos[motor], motor
+        
+        if textos.get('google'):
+            motor = 'google'
+        elif textos.get('sphinx') and isinstance(errores.get('google'), sr.RequestError):
+            motor = 'sphinx'
+        elif isinstance(errores.get('google'), sr.RequestError) and 'sphinx' in errores:
+            raise errores['google']
+        else:
+            raise sr.UnknownValueError()
+        self.estadisticas_reconocimiento[motor]['ganadas'] += 1
+        return textos[motor], motor
+    
     def procesar_operacion(self, texto):
         """Procesamiento de operaciones con mejor manejo de errores"""
         texto_original = texto
@@ -362,6 +627,8 @@ class CalculadoraVozLinux:
                         'timestamp': datetime.now().strftime("%H:%M:%S")
                     }
                     self.historial.append(entrada_historial)
+                    if self.diario is not None:
+                        self.diario.registrar(dict(entrada_historial, fecha=datetime.now().isoformat(timespec='seconds')))
                     
                     # Limitar historial
                     if len(self.historial) > 50:
@@ -443,10 +710,47 @@ class CalculadoraVozLinux:
         else:
             self.hablar("Calculadora reactivada", 'alta')
     
+    def crear_detector_activacion(self):
+        """Detector local de la palabra de activación, o None si PocketSphinx no está disponible"""
+        if self.detector_activacion is None:
+            try:
+                self.detector_activacion = DetectorActivacion(
+                    self.palabras_activacion,
+                    idioma=self.config['idioma_reconocimiento'],
+                    sensibilidad=self.config['sensibilidad_activacion']
+                ).iniciar()
+            except Exception as e:
+                print(f"⚠️  Sin detector local de activación ({e}); se usará Google para oír 'calculadora'")
+                return None
+        return self.detector_activacion
+    
     def escuchar_continuo(self):
         """Modo de escucha continua"""
         self.hablar("Escucha continua iniciada. Di 'calculadora' seguido de tu operación.")
         
+        detector = self.crear_detector_activacion()
+        if detector is not None:
+            # Esperar la palabra en local: solo la orden que sigue va a los reconocedores
+            while self.modo_continuo:
+                try:
+                    with self.microphone as source:
+                        palabra = detector.esperar(source, lambda: self.modo_continuo and not self.pausado)
+                    
+                    if palabra:
+                        if self.config['modo_verboso']:
+                            print(f"👂 Activación: '{palabra}'")
+                        self.hablar("Te escucho", 'alta')
+                        comando = self.escuchar(timeout=8)
+                        if comando not in ['timeout', 'no_entendido', 'error', 'error_servicio']:
+                            self.cola_comandos.put(comando)
+                    elif self.pausado:
+                        time.sleep(0.5)
+                except Exception as e:
+                    if self.config['modo_verboso']:
+                        print(f"Error en escucha continua: {e}")
+                    time.sleep(1)
+            return
+        
         while self.modo_continuo:
             try:
                 with self.microphone as source:
@@ -613,7 +917,7 @@ class CalculadoraVozLinux:
         """Salida segura de la aplicación"""
         self.modo_continuo = False
         
-        if self.config['guardar_historial'] and self.historial:
+        if self.diario is not None:
             self.guardar_historial()
         
         self.guardar_configuracion()
@@ -629,15 +933,10 @@ class CalculadoraVozLinux:
         sys.exit(0)
     
     def guardar_historial(self):
-        """Guarda el historial en archivo"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"historial_calculadora_{timestamp}.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.historial, f, indent=4, ensure_ascii=False)
-            print(f"📄 Historial guardado en {filename}")
-        except Exception as e:
-            print(f"⚠️  Error guardando historial: {e}")
+        """Termina de escribir el diario (cada operación ya se fue añadiendo al hacerla)"""
+        self.diario.cerrar()
+        if self.diario.escritos:
+            print(f"📄 Historial guardado en {self.diario.archivo} ({self.diario.escritos} operaciones)")
     
     def manejar_errores_escucha(self, tipo_error):
         """Maneja diferentes tipos de errores de escucha"""
@@ -717,6 +1016,17 @@ class CalculadoraVozLinux:
         
         if self.historial:
             self.hablar(f"Operaciones en historial: {len(self.historial)}")
+        
+        for motor, estadisticas in self.estadisticas_reconocimiento.items():
+            if estadisticas['intentos']:
+                media = estadisticas['tiempo_total'] / estadisticas['intentos'] * 1000
+                print(f"🏁 {motor.capitalize()}: ganó {estadisticas['ganadas']} de {estadisticas['intentos']} frases, "
+                      f"{media:.0f} ms de media")
+        
+        if self.detector_activacion and self.detector_activacion.segundos_audio:
+            print(f"👂 Activación: {self.detector_activacion.detecciones} en "
+                  f"{self.detector_activacion.segundos_audio / 60:.1f} min de escucha, "
+                  f"{self.detector_activacion.uso_cpu():.1f}% de CPU")
     
     def ejecutar(self):
         """Bucle principal mejorado con mejor manejo de errores"""
@@ -854,10 +1164,35 @@ def mostrar_instrucciones_instalacion():
    • Si TTS no funciona: sudo apt-get install festival speech-dispatcher
 """)
 
+def probar_activacion(ruta, esperadas=0):
+    """Pasa una grabación por el detector de activación e informa de CPU y falsas activaciones"""
+    calculadora = CalculadoraVozLinux.__new__(CalculadoraVozLinux)
+    config = calculadora.cargar_configuracion()
+    detector = DetectorActivacion(PALABRAS_ACTIVACION,
+                                  idioma=config['idioma_reconocimiento'],
+                                  sensibilidad=config['sensibilidad_activacion'])
+    try:
+        detector.iniciar()
+        informe = detector.probar_wav(ruta, esperadas)
+    except (sr.RequestError, OSError, ValueError, wave.Error) as e:
+        print(f"❌ No se pudo probar la activación: {e}")
+        return None
+    
+    print(f"🎧 {ruta}: {informe['segundos_audio']} s de audio")
+    print(f"   Activaciones: {informe['detecciones']} (esperadas {esperadas})")
+    print(f"   Falsas activaciones: {informe['falsas_activaciones']} ({informe['falsas_por_hora']} por hora)")
+    print(f"   CPU: {informe['cpu_porcentaje']}% de un núcleo")
+    return informe
+
 def main():
     """Función principal con diagnóstico completo"""
     print("🚀 Iniciando Calculadora de Voz para Linux...")
     
+    # python main.py --probar-activacion grabacion.wav [activaciones_esperadas]
+    if len(sys.argv) > 2 and sys.argv[1] == '--probar-activacion':
+        probar_activacion(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+        return
+    
     # Verificar dependencias
     faltantes = verificar_dependencias()
     if faltantes:
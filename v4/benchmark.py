@@ -0,0 +1,335 @@
+import math
+import re
+import sys
+import time
+
+from expresiones import MotorExpresiones
+from numeros_texto import convertir_numeros_texto
+
+
+# Frases típicas ya normalizadas (números en dígitos), como llegan a procesar_operacion
+CORPUS_OPERACIONES = [
+    "5 más 3", "10 por 2", "20 entre 4", "2 elevado a la 3", "raíz cuadrada de 9",
+    "seno de 30", "coseno de 60", "tangente de 45", "logaritmo de 100",
+    "resultado más 5", "resultado anterior menos 2", "cuánto es 7 multiplicado por 8",
+    "100 dividido por 7", "3.5 + 2.25", "oye calculadora dime 12 menos 4 por favor",
+    "no sé qué decir", "historial", "2 ** 10", "15 x 3", "8 potencia 2",
+]
+
+
+# Transcripciones tal como las devuelven los reconocedores, con el resultado esperado
+CORPUS_TRANSCRIPCIONES = [
+    ("cinco más tres", 8), ("diez por dos", 20), ("veinte entre cuatro", 5),
+    ("dos elevado a tres", 8), ("raíz cuadrada de nueve", 3), ("quince menos seis", 9),
+    ("veintitrés más diecinueve", 42), ("ciento cuarenta y dos menos treinta y siete", 105),
+    ("dos mil quinientos entre cincuenta", 50), ("tres coma cinco por dos", 7),
+    ("menos siete por tres", -21), ("un millón doscientos mil entre mil", 1200),
+    ("tres cuartos más un medio", 1.25), ("dos y medio por cuatro", 10),
+    ("cuarenta y cinco por once", 495), ("novecientos noventa y nueve más uno", 1000),
+    ("cero coma cinco más cero coma veinticinco", 0.75), ("mil millones entre un millón", 1000),
+    ("oye calculadora cuánto es sesenta menos quince", 45), ("cien por cien", 10000),
+]
+
+
+# Expresiones encadenadas con el resultado esperado (precedencia, paréntesis, funciones)
+CORPUS_EXPRESIONES = [
+    ("2 más 3 por 4", 14), ("abre paréntesis 2 más 3 cierra paréntesis por 4", 20),
+    ("10 menos 2 menos 3", 5), ("2 elevado a 3 elevado a 2", 512),
+    ("raíz cuadrada de 9 más 7", 10),
+    ("raíz cuadrada de abre paréntesis 9 más 7 cierra paréntesis", 4),
+    ("100 entre 5 entre 2", 10), ("resultado más 2 por 3", 16),
+    ("cuánto es 7 multiplicado por 8 menos 6", 50), ("3 por abre paréntesis 4 más 1 cierra paréntesis", 15),
+    ("5 más 3", 8), ("resultado anterior menos 4", 6),
+]
+
+
+def convertir_numeros_legado(texto):
+    """Conversión previa a numeros_texto: un re.sub por palabra del diccionario (referencia)"""
+    numeros_texto = {
+        'cero': '0', 'uno': '1', 'dos': '2', 'tres': '3', 'cuatro': '4',
+        'cinco': '5', 'seis': '6', 'siete': '7', 'ocho': '8', 'nueve': '9',
+        'diez': '10', 'once': '11', 'doce': '12', 'trece': '13', 'catorce': '14',
+        'quince': '15', 'veinte': '20', 'treinta': '30', 'cuarenta': '40',
+        'cincuenta': '50', 'sesenta': '60', 'setenta': '70', 'ochenta': '80',
+        'noventa': '90', 'cien': '100'
+    }
+    for palabra, numero in numeros_texto.items():
+        texto = re.sub(r'\b' + palabra + r'\b', numero, texto, flags=re.IGNORECASE)
+    return texto
+
+
+def patrones_legado(ultimo_resultado=0):
+    """Tabla de expresiones regulares previa al motor de expresiones (referencia)"""
+    return {
+        r'\b(\d+(?:\.\d+)?)\s*(?:más|mas|suma|sumado|plus|\+)\s*(\d+(?:\.\d+)?)\b':
+            lambda x, y: (float(x) + float(y), 'suma'),
+        r'\b(\d+(?:\.\d+)?)\s*(?:menos|resta|restado|restar|-)\s*(\d+(?:\.\d+)?)\b':
+            lambda x, y: (float(x) - float(y), 'resta'),
+        r'\b(\d+(?:\.\d+)?)\s*(?:por|multiplicado|multiplicar|times|\*|x)\s*(?:por\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x, y: (float(x) * float(y), 'multiplicación'),
+        r'\b(\d+(?:\.\d+)?)\s*(?:entre|dividido|dividir|division|/)\s*(?:por\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x, y: (float(x) / float(y) if float(y) != 0 else None, 'división'),
+        r'\b(\d+(?:\.\d+)?)\s*(?:elevado|potencia|exponente|\^|\*\*)\s*(?:a\s*(?:la\s*)?)?(\d+(?:\.\d+)?)\b':
+            lambda x, y: (float(x) ** float(y), 'potencia'),
+        r'\b(?:resultado|anterior)\s*(?:más|mas|\+)\s*(\d+(?:\.\d+)?)\b':
+            lambda x: (ultimo_resultado + float(x), 'suma con resultado anterior'),
+        r'\b(?:resultado|anterior)\s*(?:menos|-)\s*(\d+(?:\.\d+)?)\b':
+            lambda x: (ultimo_resultado - float(x), 'resta con resultado anterior'),
+        r'\braíz\s*cuadrada\s*(?:de\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x: (math.sqrt(float(x)), 'raíz cuadrada'),
+        r'\bseno\s*(?:de\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x: (math.sin(math.radians(float(x))), 'seno'),
+        r'\bcoseno\s*(?:de\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x: (math.cos(math.radians(float(x))), 'coseno'),
+        r'\btangente\s*(?:de\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x: (math.tan(math.radians(float(x))), 'tangente'),
+        r'\blogaritmo\s*(?:de\s*)?(\d+(?:\.\d+)?)\b':
+            lambda x: (math.log10(float(x)) if float(x) > 0 else None, 'logaritmo'),
+    }
+
+
+def evaluar_legado(patrones, texto):
+    """Bucle original de procesar_operacion: re.search patrón por patrón"""
+    for patron, operacion in patrones.items():
+        match = re.search(patron, texto, re.IGNORECASE)
+        if match:
+            return operacion(*match.groups())
+    return None
+
+
+def medir(funcion, corpus, repeticiones):
+    """Devuelve frases por segundo de funcion sobre el corpus"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for texto in corpus:
+            funcion(texto)
+    return repeticiones * len(corpus) / (time.perf_counter() - inicio)
+
+
+def benchmark_operaciones(repeticiones=2000):
+    """Compara el motor de expresiones (sin caché de ASTs) con el bucle de expresiones regulares"""
+    patrones = patrones_legado()
+    motor = MotorExpresiones(tamano_cache=0)
+
+    legado = medir(lambda t: evaluar_legado(patrones, t), CORPUS_OPERACIONES, repeticiones)
+    nuevo = medir(motor.evaluar, CORPUS_OPERACIONES, repeticiones)
+
+    print("🧪 PARSER DE OPERACIONES")
+    print(f"   Bucle de regex:        {legado:12,.0f} frases/s")
+    print(f"   Motor de expresiones:  {nuevo:12,.0f} frases/s  (x{nuevo / legado:.1f})")
+
+
+def contar_correctas(convertir, evaluar):
+    """Cuántas transcripciones del corpus dan el resultado esperado"""
+    correctas = 0
+    for texto, esperado in CORPUS_TRANSCRIPCIONES:
+        resultado = evaluar(convertir(texto))
+        if resultado is not None and resultado[0] is not None and abs(resultado[0] - esperado) < 1e-9:
+            correctas += 1
+    return correctas
+
+
+def benchmark_numeros(repeticiones=2000):
+    """Compara el lector de números con los re.sub del diccionario de 26 palabras"""
+    textos = [texto for texto, _ in CORPUS_TRANSCRIPCIONES]
+    legado = medir(convertir_numeros_legado, textos, repeticiones)
+    nuevo = medir(convertir_numeros_texto, textos, repeticiones)
+
+    patrones = patrones_legado()
+    correctas_legado = contar_correctas(convertir_numeros_legado, lambda t: evaluar_legado(patrones, t))
+    correctas_nuevo = contar_correctas(convertir_numeros_texto, MotorExpresiones().evaluar)
+
+    print("🧪 NÚMEROS EN PALABRAS")
+    print(f"   re.sub por palabra:    {legado:12,.0f} frases/s   "
+          f"({correctas_legado}/{len(textos)} resultados correctos)")
+    print(f"   Lector en una pasada:  {nuevo:12,.0f} frases/s   "
+          f"({correctas_nuevo}/{len(textos)} resultados correctos)")
+
+
+def benchmark_expresiones(repeticiones=2000):
+    """Motor de expresiones: aciertos frente al bucle de regex y coste de la caché de ASTs"""
+    textos = [texto for texto, _ in CORPUS_EXPRESIONES]
+    patrones = patrones_legado(ultimo_resultado=10)
+
+    def correctas(evaluar):
+        total = 0
+        for texto, esperado in CORPUS_EXPRESIONES:
+            resultado = evaluar(texto, 10)  # ultimo_resultado = 10
+            if resultado is not None and resultado[0] is not None and abs(resultado[0] - esperado) < 1e-9:
+                total += 1
+        return total
+
+    # Sin caché: cada frase se tokeniza y se analiza de nuevo
+    sin_cache = MotorExpresiones(tamano_cache=0)
+    con_cache = MotorExpresiones()
+    frio = medir(sin_cache.evaluar, textos, repeticiones)
+    caliente = medir(con_cache.evaluar, textos, repeticiones)
+    legado = medir(lambda t: evaluar_legado(patrones, t), textos, repeticiones)
+
+    print("🧪 MOTOR DE EXPRESIONES")
+    print(f"   Bucle de regex:        {legado:12,.0f} frases/s   "
+          f"({correctas(lambda t, _: evaluar_legado(patrones, t))}/{len(textos)} resultados correctos)")
+    print(f"   Parser sin caché:      {frio:12,.0f} frases/s   "
+          f"({correctas(sin_cache.evaluar)}/{len(textos)} resultados correctos)")
+    print(f"   Parser con caché AST:  {caliente:12,.0f} frases/s  (x{caliente / frio:.1f} sobre sin caché)")
+
+
+class SalidaNula:
+    """Sumidero de audio que descarta el PCM: mide el bucle del driver, no la reproducción"""
+
+    def __init__(self, frecuencia):
+        pass
+
+    def write(self, datos):
+        pass
+
+    def close(self, discard=False):
+        pass
+
+
+def benchmark_tts_bucle(frases=200):
+    try:
+        import pyttsx3
+    except ImportError:
+        print("⚠️  pyttsx3 no disponible")
+        return
+
+    print("🧪 BUCLE DEL DRIVER PYTTSX3 (say → finished-utterance)")
+    for nombre in ('dummy', 'espeak'):
+        try:
+            engine = pyttsx3.init(nombre)
+        except Exception as e:
+            print(f"   {nombre:<8} no disponible ({e})")
+            continue
+        if nombre == 'espeak':
+            from pyttsx3.drivers.espeak import EspeakDriver
+            EspeakDriver.sink_factory = SalidaNula
+
+        fin = []
+        engine.connect('finished-utterance', lambda name, completed: fin.append(time.perf_counter()))
+        latencias = []
+        cpu = time.process_time()
+        inicio_total = time.perf_counter()
+        for i in range(frases):
+            inicio = time.perf_counter()
+            engine.say(f"{i} más {i}")
+            engine.runAndWait()
+            latencias.append(fin[-1] - inicio if fin else time.perf_counter() - inicio)
+        total = time.perf_counter() - inicio_total
+        cpu = time.process_time() - cpu
+
+        latencias.sort()
+        print(f"   {nombre:<8} {frases} frases en {total:.2f} s: mediana {latencias[len(latencias) // 2] * 1000:.2f} ms, "
+              f"p95 {latencias[int(len(latencias) * 0.95)] * 1000:.2f} ms, CPU {cpu / frases * 1000:.2f} ms/frase")
+
+
+class DestinoNulo:
+    """Destino de audio que descarta el PCM: mide la síntesis, no la reproducción"""
+
+    def formato(self, frecuencia, canales, ancho):
+        pass
+
+    def empezar(self):
+        pass
+
+    def escribir(self, datos):
+        pass
+
+    def terminar(self):
+        pass
+
+
+def benchmark_tts_proceso(frases=50):
+    import shutil
+    import subprocess
+    from proceso_tts import ProcesoEspeak, percentil
+
+    if not shutil.which('espeak'):
+        print("⚠️  espeak no disponible")
+        return
+
+    textos = [f"{i} más {i} es {i * 2}" for i in range(frases)]
+
+    print("🧪 ESPEAK: UN PROCESO POR FRASE FRENTE A PROCESO PERSISTENTE (hasta el primer audio)")
+    primeras = []
+    for texto in textos:
+        inicio = time.perf_counter()
+        proceso = subprocess.Popen(['espeak', '-v', 'es+f3', '--stdout', texto], stdout=subprocess.PIPE)
+        proceso.stdout.read(4096)
+        primeras.append(time.perf_counter() - inicio)
+        proceso.stdout.read()
+        proceso.wait()
+    print(f"   Un proceso por frase: mediana {percentil(primeras, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentil(primeras, 0.95) * 1000:.1f} ms")
+
+    persistente = ProcesoEspeak(verboso=False)
+    destino = DestinoNulo()
+    try:
+        persistente.decir("preparado", destino)
+        primeras = [persistente.decir(texto, destino)[0] for texto in textos]
+    finally:
+        persistente.cerrar()
+    print(f"   Proceso persistente:  mediana {percentil(primeras, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentil(primeras, 0.95) * 1000:.1f} ms")
+
+
+def benchmark_dsp(minutos=10, frecuencia=44100):
+    import random
+    from speech_recognition import dsp
+
+    try:
+        import audioop
+    except ImportError:  # Python 3.13+
+        audioop = None
+
+    # Ruido de micrófono: 16 bits, mono salvo para tomono
+    muestras = minutos * 60 * frecuencia
+    aleatorio = random.Random(0)
+    mono = aleatorio.randbytes(muestras * 2)
+    estereo = aleatorio.randbytes(muestras * 4)
+    operaciones = [
+        ('rms', lambda m: m.rms(mono, 2)),
+        ('lin2lin 2→4', lambda m: m.lin2lin(mono, 2, 4)),
+        ('byteswap', lambda m: m.byteswap(mono, 2)),
+        ('tomono', lambda m: m.tomono(estereo, 2, 1, 1)),  # como AudioFile.AudioFileStream
+        ('ratecv →16 kHz', lambda m: m.ratecv(mono, 2, 1, frecuencia, 16000, None)),
+    ]
+    implementaciones = [('audioop', audioop)] if audioop else []
+    if dsp.np is not None:
+        implementaciones.append(('numpy', dsp))
+    else:
+        print("⚠️  NumPy no disponible: se mide la versión en Python puro")
+        implementaciones.append(('python', dsp))
+
+    print(f"🧪 DSP DE AUDIO ({minutos} min a {frecuencia} Hz, 16 bits)")
+    for nombre, funcion in operaciones:
+        tiempos = []
+        for implementacion, modulo in implementaciones:
+            inicio = time.perf_counter()
+            funcion(modulo)
+            tiempos.append(f"{implementacion} {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+        print(f"   {nombre:<15} " + "   ".join(tiempos))
+
+
+BENCHMARKS = {
+    'operaciones': benchmark_operaciones,
+    'numeros': benchmark_numeros,
+    'expresiones': benchmark_expresiones,
+    'tts_bucle': benchmark_tts_bucle,
+    'tts_proceso': benchmark_tts_proceso,
+    'dsp': benchmark_dsp,
+}
+
+
+def main():
+    """Ejecuta los benchmarks indicados (todos si no se indica ninguno)"""
+    nombres = sys.argv[1:] or list(BENCHMARKS)
+    for nombre in nombres:
+        if nombre not in BENCHMARKS:
+            print(f"❌ Benchmark desconocido: {nombre}. Opciones: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[nombre]()
+
+
+if __name__ == "__main__":
+    main()
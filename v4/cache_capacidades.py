@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+from modelo_vosk import RUTAS_MODELO_VOSK
+
+
+# Junto a calculadora_config.json
+ARCHIVO_CAPACIDADES = 'calculadora_capacidades.json'
+
+# Paquetes cuya versión cambia lo que el arranque puede descubrir
+PAQUETES = ['SpeechRecognition', 'pyttsx3', 'pocketsphinx', 'vosk', 'PyAudio']
+
+# Programas externos de síntesis
+PROGRAMAS = ['espeak', 'espeak-ng', 'festival', 'aplay']
+
+
+def version_paquete(nombre):
+    """Versión instalada sin importar el paquete (None si no está)"""
+    try:
+        from importlib import metadata
+        return metadata.version(nombre)
+    except Exception:
+        return None
+
+
+def marca_ruta(ruta):
+    """mtime de una ruta (None si no existe)"""
+    try:
+        return os.stat(ruta).st_mtime
+    except OSError:
+        return None
+
+
+def dispositivos_audio():
+    """Lista barata de dispositivos de audio, sin abrir PortAudio"""
+    dispositivos = []
+    try:
+        with open('/proc/asound/cards', 'r') as f:
+            dispositivos.append(f.read())
+    except OSError:
+        pass
+    try:
+        dispositivos.extend(sorted(os.listdir('/dev/snd')))
+    except OSError:
+        pass
+    return dispositivos
+
+
+def huella_entorno(rutas_modelos=None):
+    """Resumen del entorno: si cambia, las capacidades guardadas ya no valen"""
+    programas = {}
+    for programa in PROGRAMAS:
+        ruta = shutil.which(programa)
+        programas[programa] = (ruta, marca_ruta(ruta)) if ruta else None
+
+    datos = {
+        'python': sys.version,
+        'paquetes': {nombre: version_paquete(nombre) for nombre in PAQUETES},
+        'modelos': {ruta: marca_ruta(ruta) for ruta in (rutas_modelos or RUTAS_MODELO_VOSK)},
+        'programas': programas,
+        'audio': dispositivos_audio(),
+    }
+    return hashlib.sha1(json.dumps(datos, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class CacheCapacidades:
+    """Capacidades descubiertas en el arranque (motor TTS, voz, micrófono, modelos).
+
+    Cada sección se valida al usarla: si falla, se borra y se vuelve a sondear
+    solo esa parte. Al final del arranque se reescribe si algo cambió.
+    """
+
+    def __init__(self, archivo=ARCHIVO_CAPACIDADES, verboso=True):
+        self.archivo = archivo
+        self.verboso = verboso
+        self.huella = None
+        self.secciones = {}
+        self.valida = False
+        self.modificada = False
+
+    def cargar(self):
+        """Lee el archivo y lo descarta si la huella del entorno no coincide"""
+        self.huella = huella_entorno()
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        if datos.get('huella') != self.huella:
+            if self.verboso:
+                print("🔄 El entorno cambió: se vuelven a sondear las capacidades")
+            return False
+
+        self.secciones = datos.get('capacidades', {})
+        self.valida = True
+        return True
+
+    def obtener(self, seccion):
+        """Valor guardado de una sección (None si no hay)"""
+        return self.secciones.get(seccion)
+
+    def guardar_seccion(self, seccion, valor):
+        if self.secciones.get(seccion) != valor:
+            self.secciones[seccion] = valor
+            self.modificada = True
+
+    def invalidar(self, seccion):
+        """Descarta una sección que falló al usarla"""
+        if seccion in self.secciones:
+            del self.secciones[seccion]
+            self.modificada = True
+
+    def guardar(self):
+        """Escribe el archivo si alguna sección cambió"""
+        if not self.modificada:
+            return
+        datos = {
+            'huella': self.huella or huella_entorno(),
+            'fecha': datetime.now().isoformat(),
+            'capacidades': self.secciones,
+        }
+        try:
+            temporal = self.archivo + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(datos, f, indent=2, ensure_ascii=False)
+            os.replace(temporal, self.archivo)
+            self.modificada = False
+        except OSError as e:
+            if self.verboso:
+                print(f"⚠️  No se pudo guardar la caché de capacidades: {e}")
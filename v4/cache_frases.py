@@ -0,0 +1,207 @@
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import threading
+import wave
+
+
+# Junto a calculadora_config.json
+DIRECTORIO_CACHE = 'cache_voz'
+TAMANO_MAXIMO = 50 * 1024 * 1024
+
+# Frases que la calculadora repite siempre igual: se sintetizan una vez y se reproducen
+FRASES_FIJAS = [
+    "Calculadora de voz offline iniciada. Di 'ayuda' para ver comandos disponibles",
+    "¿Alguna otra operación?",
+    "No te entendí. ¿Puedes repetir?",
+    "Configuración guardada",
+    "Configuración mostrada en pantalla",
+    "Ayuda mostrada en pantalla. Puedes hacer operaciones como 'cinco más tres' o 'diez por dos'",
+    "No reconocí la operación. Prueba con 'cinco más tres' o 'diez por dos'.",
+    "Error de reconocimiento. Inténtalo de nuevo",
+    "Historial limpiado",
+    "Resultado borrado",
+    "No hay operaciones en el historial",
+    "Modo continuo activado. Di 'salir' para terminar",
+    "Modo continuo desactivado",
+    "Volumen ajustado",
+    "Guardando configuración y cerrando...",
+    "¡Hasta luego!",
+]
+
+BLOQUE_REPRODUCCION = 4096
+
+
+def resumen(texto, longitud=20):
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:longitud]
+
+
+class CacheFrases:
+    """Audio ya sintetizado de frases fijas, en WAV, por configuración de voz.
+
+    El nombre de cada archivo es <configuración>_<frase>: la configuración
+    resume (motor, voz, velocidad, volumen), así que al cambiar cualquiera de
+    ellos las frases anteriores dejan de coincidir y se borran. El tamaño total
+    se limita borrando las menos usadas (mtime, que se actualiza al reproducir).
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_maximo=TAMANO_MAXIMO, verboso=True):
+        self.directorio = directorio
+        self.tamano_maximo = tamano_maximo
+        self.verboso = verboso
+
+        self.configuracion = None
+        self._frases = set()  # resúmenes de las frases guardadas para la configuración actual
+        self._lock = threading.Lock()
+        self._pyaudio = None
+
+        self.aciertos = 0
+        self.generadas = 0
+        self.eliminadas = 0
+
+    def configurar(self, motor, voz, velocidad, volumen):
+        """Fija la configuración de voz; si cambió, borra el audio de la anterior"""
+        configuracion = resumen(repr((motor, voz, velocidad, volumen)), 12)
+        with self._lock:
+            if configuracion == self.configuracion:
+                return False
+            self.configuracion = configuracion
+            os.makedirs(self.directorio, exist_ok=True)
+            self._frases = set()
+            for nombre in os.listdir(self.directorio):
+                prefijo, _, resto = nombre.partition('_')
+                if prefijo == configuracion and resto.endswith('.wav'):
+                    self._frases.add(resto[:-4])
+                else:
+                    self._eliminar(nombre)
+        return True
+
+    def ruta(self, texto):
+        return os.path.join(self.directorio, f"{self.configuracion}_{resumen(texto)}.wav")
+
+    def contiene(self, texto):
+        """Si la frase está guardada (sin tocar el disco)"""
+        return self.configuracion is not None and resumen(texto) in self._frases
+
+    def buscar(self, texto):
+        """Ruta del audio de la frase, marcándola como usada (None si no está)"""
+        with self._lock:
+            if not self.contiene(texto):
+                return None
+            ruta = self.ruta(texto)
+            try:
+                os.utime(ruta)
+            except OSError:
+                self._frases.discard(resumen(texto))
+                return None
+            self.aciertos += 1
+            return ruta
+
+    def guardar(self, texto, generar):
+        """Sintetiza la frase con generar(ruta) y la guarda; devuelve la ruta o None"""
+        with self._lock:
+            configuracion = self.configuracion
+            if configuracion is None:
+                return None
+            ruta = self.ruta(texto)
+        temporal = ruta + '.tmp'
+        try:
+            generar(temporal)
+            with wave.open(temporal, 'rb') as wav:
+                if wav.getnframes() == 0:
+                    raise ValueError("audio vacío")
+            os.replace(temporal, ruta)
+        except Exception as e:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            if self.verboso:
+                print(f"⚠️  No se pudo guardar la frase en caché: {e}")
+            return None
+
+        with self._lock:
+            if configuracion != self.configuracion:
+                # La configuración cambió mientras se sintetizaba: este audio ya no vale
+                self._eliminar(os.path.basename(ruta))
+                return None
+            self._frases.add(resumen(texto))
+            self.generadas += 1
+            self.recortar()
+        return ruta
+
+    def recortar(self):
+        """Borra las frases menos usadas hasta quedar bajo el tamaño máximo (con el lock tomado)"""
+        archivos = []
+        total = 0
+        for nombre in os.listdir(self.directorio):
+            try:
+                estado = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            archivos.append((estado.st_mtime, estado.st_size, nombre))
+            total += estado.st_size
+
+        for _, tamano, nombre in sorted(archivos):
+            if total <= self.tamano_maximo:
+                break
+            self._eliminar(nombre)
+            total -= tamano
+
+    def _eliminar(self, nombre):
+        try:
+            os.unlink(os.path.join(self.directorio, nombre))
+        except OSError:
+            return
+        prefijo, _, resto = nombre.partition('_')
+        if prefijo == self.configuracion:
+            self._frases.discard(resto[:-4])
+        self.eliminadas += 1
+
+    def reproducir(self, ruta):
+        """Reproduce un WAV; bloquea hasta terminar"""
+        with wave.open(ruta, 'rb') as wav:
+            formato = (wav.getsampwidth(), wav.getnchannels(), wav.getframerate())
+            datos = wav.readframes(wav.getnframes())
+        self.reproducir_pcm(datos, *formato)
+
+    def reproducir_pcm(self, datos, ancho, canales, frecuencia):
+        """Reproduce PCM por PyAudio (o aplay si no está); bloquea hasta terminar"""
+        try:
+            if self._pyaudio is None:
+                import pyaudio
+                self._pyaudio = pyaudio.PyAudio()
+        except ImportError:
+            if not shutil.which('aplay'):
+                raise
+            wav = io.BytesIO()
+            with wave.open(wav, 'wb') as salida:
+                salida.setsampwidth(ancho)
+                salida.setnchannels(canales)
+                salida.setframerate(frecuencia)
+                salida.writeframes(datos)
+            subprocess.run(['aplay', '-q', '-'], input=wav.getvalue(), check=True, timeout=30)
+            return
+
+        stream = self._pyaudio.open(format=self._pyaudio.get_format_from_width(ancho),
+                                    channels=canales, rate=frecuencia, output=True)
+        try:
+            paso = BLOQUE_REPRODUCCION * ancho * canales
+            for inicio in range(0, len(datos), paso):
+                stream.write(datos[inicio:inicio + paso])
+        finally:
+            stream.stop_stream()
+            stream.close()
+
+    def cerrar(self):
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+
+    def estadisticas(self):
+        return {
+            'frases': len(self._frases),
+            'aciertos': self.aciertos,
+            'generadas': self.generadas,
+            'eliminadas': self.eliminadas,
+        }
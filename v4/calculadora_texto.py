@@ -0,0 +1,230 @@
+import math
+import re
+from datetime import datetime
+
+from expresiones import MotorExpresiones
+from historial_sqlite import TIPOS
+from numeros_texto import convertir_numeros_texto
+
+
+MAX_HISTORIAL = 50
+
+# Frases que consultar_historial responde con el historial guardado
+CONSULTAS_DEL_DIA = ('historial de hoy', 'operaciones de hoy')
+CONSULTAS_SUMA = ('suma de todos los resultados', 'suma de los resultados')
+# Basta con 'última' y un tipo de TIPOS; estas son las formas que entran en la gramática de Sphinx
+CONSULTAS_ULTIMA = ('cuál fue la última', 'la última')
+
+
+def frases_consulta_historial():
+    """Frases completas de consulta del historial ("cuál fue la última raíz cuadrada"...)"""
+    ultimas = [f'{inicio} {tipo}' for inicio in CONSULTAS_ULTIMA for tipo in TIPOS]
+    return list(CONSULTAS_DEL_DIA + CONSULTAS_SUMA) + ultimas
+
+
+class CalculadoraTexto:
+    """Núcleo de la calculadora sin audio: operaciones, comandos de historial y estado.
+
+    No importa nada de voz ni espera nunca: los mensajes se devuelven y, si se pasa
+    'decir', se entregan también a esa función (CalculadoraVozOffline pasa hablar).
+    Con un 'diario' (DiarioHistorial o HistorialSQLite) cada operación se registra
+    además en disco; con 'consultas' (HistorialSQLite) se puede preguntar por el
+    historial completo ("historial de hoy", "cuál fue la última raíz cuadrada").
+    """
+
+    def __init__(self, precision_decimales=4, decir=None, expresiones=None, diario=None, consultas=None):
+        self.precision_decimales = precision_decimales
+        self.decir = decir
+        self.expresiones = expresiones or MotorExpresiones()
+        self.diario = diario
+        self.consultas = consultas
+
+        self.ultimo_resultado = 0
+        self.historial = []
+        self._mensajes = None  # lista solo mientras dura procesar_comando
+
+        # Comandos que solo tocan el estado; los más específicos primero
+        self.comandos = [
+            (('limpiar historial',), self.limpiar_historial),
+            (('historial',), self.leer_historial),
+            (('borrar resultado', 'limpiar resultado'), self.borrar_resultado),
+            (('último resultado', 'resultado anterior'), self.decir_ultimo_resultado),
+        ]
+
+    def emitir(self, texto):
+        if self._mensajes is not None:
+            self._mensajes.append(texto)
+        if self.decir is not None:
+            self.decir(texto)
+
+    @staticmethod
+    def normalizar(texto):
+        """Texto tal como lo ve el parser: decimales con punto y números en dígitos"""
+        return convertir_numeros_texto(re.sub(r'[,.]', '.', texto))
+
+    def calcular(self, texto, ultimo_resultado=None):
+        """Evalúa sin tocar el estado; devuelve (resultado, tipo, error)"""
+        if ultimo_resultado is None:
+            ultimo_resultado = self.ultimo_resultado
+        try:
+            resultado_tupla = self.expresiones.evaluar(self.normalizar(texto), ultimo_resultado)
+        except Exception as e:
+            return None, None, f"Error matemático: {str(e)}"
+
+        if resultado_tupla is None:
+            return None, None, "No reconocí la operación. Prueba con 'cinco más tres' o 'diez por dos'."
+
+        resultado, tipo_operacion = resultado_tupla
+
+        if resultado is None:
+            return None, tipo_operacion, "Error: Operación no válida"
+
+        if math.isnan(resultado) or math.isinf(resultado):
+            return None, tipo_operacion, "Error: Resultado no válido"
+
+        return resultado, tipo_operacion, None
+
+    def procesar_operacion(self, texto):
+        """Evalúa la operación, la guarda en el historial; devuelve (resultado, mensaje)"""
+        resultado, tipo_operacion, error = self.calcular(texto)
+        if error:
+            return None, error
+
+        self.ultimo_resultado = resultado
+        ahora = datetime.now()
+        entrada = {
+            'operacion': texto,
+            'resultado': resultado,
+            'tipo': tipo_operacion,
+            'timestamp': ahora.strftime("%H:%M:%S")
+        }
+        self.historial.append(entrada)
+        if self.diario is not None:
+            self.diario.registrar(dict(entrada, fecha=ahora.isoformat()))
+
+        if len(self.historial) > MAX_HISTORIAL:
+            del self.historial[:-MAX_HISTORIAL]
+
+        return resultado, f"El resultado de la {tipo_operacion} es {self.formatear_numero(resultado)}"
+
+    def procesar_comando(self, texto):
+        """Comando de historial u operación; devuelve (estado, mensajes)"""
+        self._mensajes = mensajes = []
+        try:
+            # Como en la calculadora de voz: una operación válida no se toma por comando
+            resultado, _, _ = self.calcular(texto)
+            if resultado is None and self.procesar_comandos(texto):
+                return "comando_especial", mensajes
+
+            resultado, mensaje = self.procesar_operacion(texto)
+            self.emitir(mensaje)
+            return ("operacion_exitosa" if resultado is not None else "operacion_fallida"), mensajes
+        finally:
+            self._mensajes = None
+
+    def procesar_comandos(self, texto):
+        """Ejecuta el primer comando de estado que aparezca en el texto"""
+        if self.consultas is not None and self.consultar_historial(texto):
+            return True
+        for palabras_clave, accion in self.comandos:
+            if any(palabra in texto for palabra in palabras_clave):
+                accion()
+                return True
+        return False
+
+    def evaluar(self, texto):
+        """Evalúa una operación (y la recuerda como último resultado); devuelve el resultado o None"""
+        resultado, _ = self.procesar_operacion(texto)
+        return resultado
+
+    def formatear_numero(self, numero):
+        """Formatea números para pronunciación"""
+        try:
+            if abs(numero - int(numero)) < 1e-10:
+                return str(int(numero))
+            else:
+                formatted = f"{numero:.{self.precision_decimales}f}".rstrip('0').rstrip('.')
+                return formatted
+        except Exception:
+            return str(numero)
+
+    def leer_historial(self):
+        """Lee el historial de operaciones"""
+        if not self.historial:
+            self.emitir("No hay operaciones en el historial")
+            return
+
+        total = self.consultas.contar() if self.consultas is not None else len(self.historial)
+        self.emitir(f"Tienes {total} operaciones en el historial. Te leo las últimas 5:")
+
+        for entrada in self.historial[-5:]:
+            self.emitir(f"A las {entrada['timestamp']}: {entrada['operacion']} = "
+                        f"{self.formatear_numero(entrada['resultado'])}")
+
+    def consultar_historial(self, texto):
+        """Preguntas sobre el historial guardado; devuelve False si el texto no es una"""
+        if any(frase in texto for frase in CONSULTAS_DEL_DIA):
+            operaciones = self.consultas.del_dia()
+            if not operaciones:
+                self.emitir("Hoy no has hecho ninguna operación")
+                return True
+            self.emitir(f"Hoy has hecho {len(operaciones)} operaciones. Te leo las últimas 5:")
+            for fecha, operacion, resultado, _ in operaciones[-5:]:
+                self.emitir(f"A las {fecha[11:19]}: {operacion} = {self.formatear_numero(resultado)}")
+            return True
+
+        if any(frase in texto for frase in CONSULTAS_SUMA):
+            cantidad, total = self.consultas.suma_resultados()
+            self.emitir(f"La suma de los {cantidad} resultados es {self.formatear_numero(total)}")
+            return True
+
+        if 'última' in texto or 'ultima' in texto:
+            tipo = self.consultas.tipo_mencionado(texto)
+            if tipo is None:
+                return False
+            fila = self.consultas.ultima_de_tipo(tipo)
+            if fila is None:
+                self.emitir(f"No hay ninguna {tipo} en el historial")
+            else:
+                fecha, operacion, resultado, _ = fila
+                self.emitir(f"La última {tipo} fue {operacion} = {self.formatear_numero(resultado)}, "
+                            f"el {fecha[:10]} a las {fecha[11:19]}")
+            return True
+
+        return False
+
+    def es_consulta_historial(self, texto):
+        """Si consultar_historial respondería al texto, sin consultar la base"""
+        if self.consultas is None:
+            return False
+        if any(frase in texto for frase in CONSULTAS_DEL_DIA + CONSULTAS_SUMA):
+            return True
+        return ('última' in texto or 'ultima' in texto) and self.consultas.tipo_mencionado(texto) is not None
+
+    def limpiar_historial(self):
+        """Limpia el historial"""
+        self.historial.clear()
+        self.emitir("Historial limpiado")
+
+    def decir_ultimo_resultado(self):
+        """Dice el último resultado calculado"""
+        if self.ultimo_resultado is not None:
+            self.emitir(f"El último resultado es {self.formatear_numero(self.ultimo_resultado)}")
+        else:
+            self.emitir("No hay resultado anterior")
+
+    def borrar_resultado(self):
+        """Borra el último resultado"""
+        self.ultimo_resultado = 0
+        self.emitir("Resultado borrado")
+
+
+_calculadora = None
+
+
+def evaluar(texto):
+    """Evalúa una operación en español con una calculadora compartida; devuelve el resultado o None"""
+    global _calculadora
+    if _calculadora is None:
+        _calculadora = CalculadoraTexto()
+    return _calculadora.evaluar(texto)
@@ -0,0 +1,262 @@
+import math
+import threading
+import time
+
+import speech_recognition as sr
+from speech_recognition import dsp
+
+
+class BufferCircular:
+    """Buffer circular de audio preasignado: un escritor, varios lectores con su propio cursor.
+
+    Las posiciones son absolutas (bytes escritos desde el arranque), así un lector
+    sabe si se ha quedado atrás y el escritor nunca tiene que esperar a nadie.
+    """
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self.datos = bytearray(capacidad)
+        self.escrito = 0          # total de bytes escritos
+        self.desbordes = 0        # lecturas que perdieron audio por quedarse atrás
+        self.cerrado = False
+        self._condicion = threading.Condition()
+
+    def escribir(self, trozo):
+        n = len(trozo)
+        if n > self.capacidad:
+            trozo = trozo[-self.capacidad:]
+            n = self.capacidad
+        with self._condicion:
+            inicio = self.escrito % self.capacidad
+            primera = min(n, self.capacidad - inicio)
+            self.datos[inicio:inicio + primera] = trozo[:primera]
+            if primera < n:
+                self.datos[:n - primera] = trozo[primera:]
+            self.escrito += n
+            self._condicion.notify_all()
+
+    def leer(self, posicion, n, timeout=None):
+        """Lee n bytes desde posicion esperando a que lleguen; devuelve (datos, nueva posición).
+
+        Devuelve datos vacíos si el buffer se cierra o vence el timeout.
+        """
+        with self._condicion:
+            if not self._condicion.wait_for(lambda: self.escrito >= posicion + n or self.cerrado, timeout):
+                return b'', posicion
+            if self.escrito < posicion + n:
+                return b'', posicion
+
+            # El escritor ya pisó parte de lo pedido: saltar al audio más antiguo disponible
+            mas_antiguo = self.escrito - self.capacidad
+            if posicion < mas_antiguo:
+                self.desbordes += 1
+                posicion = mas_antiguo
+                if self.escrito < posicion + n:
+                    return b'', posicion
+
+            inicio = posicion % self.capacidad
+            primera = min(n, self.capacidad - inicio)
+            datos = bytes(self.datos[inicio:inicio + primera])
+            if primera < n:
+                datos += bytes(self.datos[:n - primera])
+            return datos, posicion + n
+
+    def cerrar(self):
+        with self._condicion:
+            self.cerrado = True
+            self._condicion.notify_all()
+
+
+class EstimadorRuido:
+    """Sigue el ruido de fondo trozo a trozo y mantiene energy_threshold al día.
+
+    Sustituye a adjust_for_ambient_noise antes de cada escucha: el umbral ya está
+    calibrado cuando empieza listen(). El piso de ruido baja rápido (un golpe de
+    silencio) y sube despacio, y no se mueve mientras hay voz por encima del umbral.
+    """
+
+    def __init__(self, recognizer=None, segundos_calibracion=0.5, tau_bajada=0.5, tau_subida=5.0,
+                 umbral_minimo=80):
+        self.recognizer = recognizer
+        self.segundos_calibracion = segundos_calibracion
+        self.tau_bajada = tau_bajada
+        self.tau_subida = tau_subida
+        self.umbral_minimo = umbral_minimo
+        self.ratio = recognizer.dynamic_energy_ratio if recognizer is not None else 1.5
+
+        self.piso_ruido = None
+        self.umbral = recognizer.energy_threshold if recognizer is not None else 300
+        self.ultima_energia = 0
+        self.trozos = 0
+        self.trozos_voz = 0
+        self.calibrado = False
+        self.momento_calibracion = None
+        self._energias_calibracion = []
+        self._segundos_calibrando = 0.0
+
+    def actualizar(self, trozo, sample_width, segundos):
+        energia = dsp.rms(trozo, sample_width)
+        self.ultima_energia = energia
+        self.trozos += 1
+
+        if not self.calibrado:
+            self._energias_calibracion.append(energia)
+            self._segundos_calibrando += segundos
+            if self._segundos_calibrando < self.segundos_calibracion:
+                return
+            self.piso_ruido = sum(self._energias_calibracion) / len(self._energias_calibracion)
+            self._energias_calibracion = []
+            self.calibrado = True
+            self.momento_calibracion = time.time()
+        elif energia < self.piso_ruido:
+            alfa = math.exp(-segundos / self.tau_bajada)
+            self.piso_ruido = self.piso_ruido * alfa + energia * (1 - alfa)
+        elif energia < self.umbral:
+            alfa = math.exp(-segundos / self.tau_subida)
+            self.piso_ruido = self.piso_ruido * alfa + energia * (1 - alfa)
+        else:
+            self.trozos_voz += 1
+            return
+
+        self.umbral = max(self.umbral_minimo, self.piso_ruido * self.ratio)
+        if self.recognizer is not None:
+            self.recognizer.energy_threshold = self.umbral
+
+    def estadisticas(self):
+        """Datos de calibración para diagnóstico"""
+        return {
+            'calibrado': self.calibrado,
+            'piso_ruido': round(self.piso_ruido, 1) if self.piso_ruido is not None else None,
+            'umbral': round(self.umbral, 1),
+            'ultima_energia': self.ultima_energia,
+            'trozos': self.trozos,
+            'trozos_voz': self.trozos_voz,
+            'segundos_desde_calibracion': (round(time.time() - self.momento_calibracion, 1)
+                                           if self.momento_calibracion else None),
+        }
+
+
+class FuenteCaptura(sr.AudioSource):
+    """AudioSource sobre el buffer circular, para usar con Recognizer.listen y compañía.
+
+    Entrar en el 'with' no abre nada: solo coloca un cursor de lectura unos
+    cientos de ms antes del instante actual (pre-roll).
+    """
+
+    def __init__(self, captura, preroll=None):
+        self.captura = captura
+        self.preroll = captura.preroll if preroll is None else preroll
+        self.SAMPLE_RATE = captura.SAMPLE_RATE
+        self.SAMPLE_WIDTH = captura.SAMPLE_WIDTH
+        self.CHUNK = captura.CHUNK
+        self.stream = None
+
+    def __enter__(self):
+        assert self.stream is None, "This audio source is already inside a context manager"
+        self.stream = FuenteCaptura.LectorCaptura(self.captura, self.preroll)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    class LectorCaptura(object):
+        def __init__(self, captura, preroll):
+            self.captura = captura
+            self.bytes_por_muestra = captura.SAMPLE_WIDTH
+            buffer = captura.buffer
+            atras = int(preroll * captura.SAMPLE_RATE) * self.bytes_por_muestra
+            # Sin pasar del audio más antiguo que aún guarda el buffer
+            self.posicion = max(0, buffer.escrito - atras, buffer.escrito - buffer.capacidad)
+
+        def read(self, size):
+            datos, self.posicion = self.captura.buffer.leer(
+                self.posicion, size * self.bytes_por_muestra, timeout=self.captura.TIMEOUT_LECTURA)
+            return datos
+
+        def close(self):
+            pass
+
+
+class CapturaMicrofono:
+    """Hilo de captura con un único stream de PyAudio abierto durante toda la sesión"""
+
+    TIMEOUT_LECTURA = 2.0  # segundos sin audio antes de dar el stream por terminado
+
+    def __init__(self, microphone, segundos_buffer=30, preroll=0.4, estimador_ruido=None, verboso=True):
+        self.microphone = microphone
+        self.SAMPLE_RATE = microphone.SAMPLE_RATE
+        self.SAMPLE_WIDTH = microphone.SAMPLE_WIDTH
+        self.CHUNK = microphone.CHUNK
+        self.preroll = preroll
+        self.estimador_ruido = estimador_ruido
+        self.segundos_por_trozo = self.CHUNK / self.SAMPLE_RATE
+        self.verboso = verboso
+
+        bytes_por_trozo = self.CHUNK * self.SAMPLE_WIDTH
+        trozos = max(1, int(segundos_buffer * self.SAMPLE_RATE / self.CHUNK))
+        self.buffer = BufferCircular(trozos * bytes_por_trozo)
+
+        self.activa = False
+        self.error = None
+        self._hilo = None
+
+    def iniciar(self):
+        """Abre el micrófono una sola vez y arranca el hilo de captura"""
+        if self.activa:
+            return
+        self.microphone.__enter__()
+        if self.microphone.stream is None:
+            raise OSError("no se pudo abrir el stream del micrófono")
+        self.activa = True
+        self._hilo = threading.Thread(target=self.bucle_captura, daemon=True)
+        self._hilo.start()
+
+    def bucle_captura(self):
+        stream = self.microphone.stream
+        try:
+            while self.activa:
+                trozo = stream.read(self.CHUNK)
+                if not trozo:
+                    break
+                self.procesar_trozo(trozo)
+        except Exception as e:
+            self.error = e
+            if self.verboso:
+                print(f"⚠️  Captura de audio detenida: {e}")
+        finally:
+            # El hilo es el dueño del stream: lo cierra él, también si falla la lectura
+            self.activa = False
+            self.buffer.cerrar()
+            try:
+                self.microphone.__exit__(None, None, None)
+            except Exception:
+                pass
+
+    def procesar_trozo(self, trozo):
+        self.buffer.escribir(trozo)
+        if self.estimador_ruido is not None:
+            self.estimador_ruido.actualizar(trozo, self.SAMPLE_WIDTH, self.segundos_por_trozo)
+
+    def fuente(self, preroll=None):
+        """AudioSource que lee del buffer compartido"""
+        return FuenteCaptura(self, preroll)
+
+    def detener(self):
+        """Para el hilo, que cierra el stream al salir del bucle"""
+        if self._hilo is None:
+            return
+        self.activa = False
+        self._hilo.join(timeout=1.0)
+        self._hilo = None
+
+    def estadisticas(self):
+        """Estado de la captura para diagnóstico"""
+        segundos = self.buffer.escrito / (self.SAMPLE_RATE * self.SAMPLE_WIDTH)
+        return {
+            'activa': self.activa,
+            'segundos_capturados': round(segundos, 1),
+            'capacidad_s': self.buffer.capacidad / (self.SAMPLE_RATE * self.SAMPLE_WIDTH),
+            'desbordes': self.buffer.desbordes,
+            'error': str(self.error) if self.error else None,
+            'ruido': self.estimador_ruido.estadisticas() if self.estimador_ruido is not None else None,
+        }
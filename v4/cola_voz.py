@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+
+# Menor número = se dice antes. 'fondo' es trabajo que no suena (generar la caché
+# de frases): solo corre cuando no hay nada más y esperar() no cuenta con él
+PRIORIDADES = {'alta': 0, 'normal': 1, 'baja': 2, 'fondo': 3}
+
+
+class Mensaje:
+    """Algo que hacer en el hilo de voz: un texto que decir o una acción sobre el motor"""
+
+    __slots__ = ('prioridad', 'secuencia', 'texto', 'accion', 'futuro', 'creado')
+
+    def __init__(self, prioridad, secuencia, texto=None, accion=None):
+        self.prioridad = prioridad
+        self.secuencia = secuencia
+        self.texto = texto
+        self.accion = accion
+        self.futuro = Future()
+        self.creado = time.monotonic()
+
+    def __lt__(self, otro):
+        return (self.prioridad, self.secuencia) < (otro.prioridad, otro.secuencia)
+
+
+def unir_frases(textos):
+    """Une varios mensajes en una sola locución, con una pausa entre frases"""
+    partes = []
+    for texto in textos:
+        texto = texto.strip()
+        if partes and partes[-1][-1] not in '.!?:;,':
+            partes[-1] += '.'
+        partes.append(texto)
+    return ' '.join(partes)
+
+
+class ColaVoz:
+    """Hilo de voz con cola de prioridades: hablar no bloquea a quien llama.
+
+    - Los mensajes salen por prioridad y, dentro de cada una, en orden de llegada.
+    - Los mensajes de texto consecutivos de la misma prioridad se dicen juntos
+      en una sola locución (una sola llamada al motor).
+    - Un mensaje 'alta' cancela los 'baja' pendientes, y un 'baja' que lleva
+      más de max_espera_baja segundos en la cola ya no se dice.
+    - Las acciones (cambiar velocidad, voz...) se ejecutan en el mismo hilo,
+      en orden con los textos: el motor solo se toca desde aquí. Las de
+      prioridad 'fondo' no se esperan en esperar() y se descartan al detener.
+
+    Cada mensaje devuelve un Future que se completa cuando se ha dicho, o queda
+    cancelado si se descarta. Si se pasa 'unible', los textos para los que
+    devuelva False se dicen solos (p. ej. frases con audio ya grabado).
+    """
+
+    def __init__(self, sintetizar, max_espera_baja=5.0, max_caracteres=500, verboso=True, unible=None):
+        self.sintetizar = sintetizar
+        self.unible = unible
+        self.max_espera_baja = max_espera_baja
+        self.max_caracteres = max_caracteres
+        self.verboso = verboso
+
+        self._pendientes = []
+        self._secuencia = itertools.count()
+        self._condicion = threading.Condition()
+        self._ocupada = False  # el hilo está con un trabajo que no es de fondo
+        self._detenida = False
+        self.hilo = None
+
+        self.locuciones = 0
+        self.mensajes_unidos = 0
+        self.cancelados = 0
+
+    def iniciar(self):
+        if self.hilo is None:
+            self._detenida = False
+            self.hilo = threading.Thread(target=self.bucle, name='voz', daemon=True)
+            self.hilo.start()
+        return self
+
+    def decir(self, texto, prioridad='normal'):
+        """Encola un texto; devuelve el Future de cuando termine de decirse"""
+        return self._encolar(PRIORIDADES.get(prioridad, PRIORIDADES['normal']), texto=texto)
+
+    def ejecutar(self, accion, prioridad='normal'):
+        """Encola una función a ejecutar en el hilo de voz; el Future lleva su resultado"""
+        return self._encolar(PRIORIDADES.get(prioridad, PRIORIDADES['normal']), accion=accion)
+
+    def _encolar(self, prioridad, texto=None, accion=None):
+        if self.hilo is None:
+            self.iniciar()
+        mensaje = Mensaje(prioridad, next(self._secuencia), texto, accion)
+        with self._condicion:
+            if prioridad == PRIORIDADES['alta']:
+                self._cancelar(lambda pendiente: pendiente.prioridad == PRIORIDADES['baja'])
+            heapq.heappush(self._pendientes, mensaje)
+            self._condicion.notify_all()
+        return mensaje.futuro
+
+    def cancelar(self, prioridad='normal'):
+        """Descarta los textos pendientes de esa prioridad o menos urgentes; devuelve cuántos"""
+        minima = PRIORIDADES.get(prioridad, PRIORIDADES['normal'])
+        with self._condicion:
+            cancelados = self._cancelar(lambda pendiente: pendiente.prioridad >= minima)
+            self._condicion.notify_all()
+        return cancelados
+
+    def _cancelar(self, condicion):
+        """Quita de la cola los textos que cumplan la condición (con el lock tomado)"""
+        quedan = []
+        cancelados = 0
+        for pendiente in self._pendientes:
+            if pendiente.texto is not None and condicion(pendiente):
+                pendiente.futuro.cancel()
+                cancelados += 1
+            else:
+                quedan.append(pendiente)
+        if cancelados:
+            heapq.heapify(quedan)
+            self._pendientes = quedan
+            self.cancelados += cancelados
+        return cancelados
+
+    def _pendiente_primer_plano(self):
+        """Si queda algo que no sea de fondo, en la cola o en curso (con el lock tomado)"""
+        return self._ocupada or any(pendiente.prioridad < PRIORIDADES['fondo'] for pendiente in self._pendientes)
+
+    def esperar(self, timeout=None):
+        """Espera a que no quede nada por decir (el trabajo de fondo no cuenta);
+        devuelve False si vence el timeout"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._condicion:
+            while self._pendiente_primer_plano():
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+        return True
+
+    def detener(self, timeout=5.0):
+        """Dice lo pendiente, descarta el trabajo de fondo y para el hilo"""
+        if self.hilo is None:
+            return
+        self.esperar(timeout)
+        with self._condicion:
+            for pendiente in self._pendientes:
+                pendiente.futuro.cancel()
+            self._pendientes = []
+            self._detenida = True
+            self._condicion.notify_all()
+        self.hilo.join(timeout)
+        self.hilo = None
+
+    def siguiente(self):
+        """Saca el siguiente trabajo, uniendo los textos consecutivos de igual prioridad"""
+        with self._condicion:
+            while True:
+                while not self._pendientes and not self._detenida:
+                    self._condicion.wait()
+                if self._detenida:
+                    return None
+
+                mensaje = heapq.heappop(self._pendientes)
+                if self._caducado(mensaje):
+                    continue
+
+                lote = [mensaje]
+                if mensaje.texto is not None and self._es_unible(mensaje):
+                    caracteres = len(mensaje.texto)
+                    while self._pendientes:
+                        otro = self._pendientes[0]
+                        if otro.texto is None or otro.prioridad != mensaje.prioridad:
+                            break
+                        if not self._es_unible(otro):
+                            break
+                        if caracteres + len(otro.texto) > self.max_caracteres:
+                            break
+                        heapq.heappop(self._pendientes)
+                        if not self._caducado(otro):
+                            lote.append(otro)
+                            caracteres += len(otro.texto)
+
+                self._ocupada = mensaje.prioridad < PRIORIDADES['fondo']
+                return lote
+
+    def _es_unible(self, mensaje):
+        return self.unible is None or self.unible(mensaje.texto)
+
+    def _caducado(self, mensaje):
+        if (mensaje.texto is not None and mensaje.prioridad == PRIORIDADES['baja'] and
+                time.monotonic() - mensaje.creado > self.max_espera_baja):
+            mensaje.futuro.cancel()
+            self.cancelados += 1
+            return True
+        return False
+
+    def bucle(self):
+        while True:
+            lote = self.siguiente()
+            if lote is None:
+                return
+
+            lote = [mensaje for mensaje in lote if mensaje.futuro.set_running_or_notify_cancel()]
+            try:
+                if len(lote) == 1 and lote[0].accion is not None:
+                    lote[0].futuro.set_result(lote[0].accion())
+                elif lote:
+                    self.sintetizar(unir_frases(mensaje.texto for mensaje in lote))
+                    self.locuciones += 1
+                    self.mensajes_unidos += len(lote) - 1
+                    for mensaje in lote:
+                        mensaje.futuro.set_result(True)
+            except Exception as e:
+                if self.verboso:
+                    print(f"⚠️  Error TTS: {e}")
+                for mensaje in lote:
+                    if not mensaje.futuro.done():
+                        mensaje.futuro.set_exception(e)
+            finally:
+                with self._condicion:
+                    self._ocupada = False
+                    self._condicion.notify_all()
+
+    def estadisticas(self):
+        with self._condicion:
+            pendientes = len(self._pendientes)
+        return {
+            'pendientes': pendientes,
+            'locuciones': self.locuciones,
+            'mensajes_unidos': self.mensajes_unidos,
+            'cancelados': self.cancelados,
+        }
@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import threading
+import time
+
+
+# Junto a historial_calculadora.json
+ARCHIVO_DIARIO = 'historial_calculadora.jsonl'
+
+# Al pasar de este tamaño el diario se rota a .1, .2, ...; se conservan ARCHIVOS_ROTADOS
+TAMANO_MAXIMO = 64 * 1024 * 1024
+ARCHIVOS_ROTADOS = 3
+
+# Bloque con el que leer_cola recorre el archivo desde el final
+BLOQUE_LECTURA = 64 * 1024
+
+_FIN = object()
+
+
+def ruta_rotada(archivo, numero):
+    return f"{archivo}.{numero}"
+
+
+def leer_cola(archivo=ARCHIVO_DIARIO, n=50, incluir_rotados=True):
+    """Últimos n registros del diario sin leerlo entero.
+
+    Lee bloques desde el final hasta tener n líneas completas; si el archivo
+    actual no llega, sigue por los rotados (.1, .2, ...). Una última línea a
+    medias (corte durante una escritura) se ignora.
+    """
+    registros = []
+    archivos = [archivo]
+    if incluir_rotados:
+        archivos += [ruta_rotada(archivo, numero) for numero in range(1, ARCHIVOS_ROTADOS + 1)]
+
+    for ruta in archivos:
+        if len(registros) >= n:
+            break
+        faltan = n - len(registros)
+        pedir = faltan
+        try:
+            while True:
+                lineas = _ultimas_lineas(ruta, pedir)
+                leidos = _decodificar(lineas)
+                # Las líneas dañadas no cuentan: se piden más mientras el archivo tenga
+                if len(leidos) >= faltan or len(lineas) < pedir:
+                    break
+                pedir += faltan - len(leidos)
+        except OSError:
+            continue
+        registros = leidos[-faltan:] + registros
+    return registros[-n:] if n else []
+
+
+def _ultimas_lineas(ruta, n):
+    """Últimas n líneas completas (bytes) de un archivo"""
+    with open(ruta, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        posicion = f.tell()
+        datos = b''
+        while posicion > 0 and datos.count(b'\n') <= n:
+            tamano = min(BLOQUE_LECTURA, posicion)
+            posicion -= tamano
+            f.seek(posicion)
+            datos = f.read(tamano) + datos
+
+    # Lo que va detrás del último salto de línea no está completo
+    completas, _, _ = datos.rpartition(b'\n')
+    lineas = completas.split(b'\n') if completas else []
+    if posicion > 0:
+        lineas = lineas[1:]  # la primera puede estar cortada por el bloque
+    return lineas[-n:] if n else []
+
+
+def _termina_en_salto(ruta):
+    with open(ruta, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _decodificar(lineas):
+    registros = []
+    for linea in lineas:
+        try:
+            registros.append(json.loads(linea))
+        except ValueError:
+            continue
+    return registros
+
+
+class DiarioHistorial:
+    """Historial en un archivo JSONL al que solo se añaden líneas.
+
+    registrar() no toca el disco: deja el registro en una cola que un hilo
+    escribe por lotes. Cada lote se escribe en cuanto llega (un cierre brusco
+    del proceso no pierde lo ya escrito) y el fsync se agrupa cada
+    intervalo_fsync segundos para no pagarlo en cada operación.
+    """
+
+    def __init__(self, archivo=ARCHIVO_DIARIO, intervalo_fsync=1.0, lote_maximo=256,
+                 tamano_maximo=TAMANO_MAXIMO, archivos_rotados=ARCHIVOS_ROTADOS, verboso=True):
+        self.archivo = archivo
+        self.intervalo_fsync = intervalo_fsync
+        self.lote_maximo = lote_maximo
+        self.tamano_maximo = tamano_maximo
+        self.archivos_rotados = archivos_rotados
+        self.verboso = verboso
+
+        self.cola = queue.Queue()
+        self.hilo = None
+        self.escritos = 0
+        self.sincronizaciones = 0
+        self.rotaciones = 0
+        self.errores = 0
+
+    def iniciar(self):
+        if self.hilo is None:
+            self.hilo = threading.Thread(target=self.bucle_escritura, name='diario-historial', daemon=True)
+            self.hilo.start()
+        return self
+
+    def registrar(self, entrada):
+        """Encola un registro; vuelve al instante"""
+        if self.hilo is None:
+            self.iniciar()
+        self.cola.put(entrada)
+
+    def cerrar(self, timeout=5.0):
+        """Escribe lo pendiente, hace fsync y para el hilo"""
+        if self.hilo is None:
+            return
+        self.cola.put(_FIN)
+        self.hilo.join(timeout)
+        self.hilo = None
+
+    def bucle_escritura(self):
+        archivo = None
+        pendiente_fsync = False
+        ultimo_fsync = time.monotonic()
+        try:
+            archivo = open(self.archivo, 'ab')
+            if archivo.tell() > 0 and not _termina_en_salto(self.archivo):
+                # Línea a medias de una sesión cortada: que no se pegue al siguiente registro
+                archivo.write(b'\n')
+            terminar = False
+            while not terminar:
+                # Espera al primer registro (o a que toque el fsync) y recoge los que ya haya
+                espera = self.intervalo_fsync if pendiente_fsync else None
+                try:
+                    lote = [self.cola.get(timeout=espera)]
+                except queue.Empty:
+                    lote = []
+                while len(lote) < self.lote_maximo:
+                    try:
+                        lote.append(self.cola.get_nowait())
+                    except queue.Empty:
+                        break
+
+                if _FIN in lote:
+                    terminar = True
+                    lote = [entrada for entrada in lote if entrada is not _FIN]
+
+                if lote:
+                    archivo.write(b''.join(
+                        json.dumps(entrada, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                        for entrada in lote))
+                    archivo.flush()
+                    self.escritos += len(lote)
+                    pendiente_fsync = True
+
+                if pendiente_fsync and (terminar or time.monotonic() - ultimo_fsync >= self.intervalo_fsync):
+                    os.fsync(archivo.fileno())
+                    self.sincronizaciones += 1
+                    pendiente_fsync = False
+                    ultimo_fsync = time.monotonic()
+
+                if archivo.tell() >= self.tamano_maximo:
+                    archivo = self.rotar(archivo)
+        except Exception as e:
+            self.errores += 1
+            if self.verboso:
+                print(f"⚠️  Diario de historial detenido: {e}")
+        finally:
+            if archivo is not None:
+                archivo.close()
+
+    def rotar(self, archivo):
+        """Cierra el diario lleno, lo pasa a .1 (desplazando los anteriores) y abre uno nuevo"""
+        os.fsync(archivo.fileno())
+        archivo.close()
+
+        mas_antiguo = ruta_rotada(self.archivo, self.archivos_rotados)
+        if os.path.exists(mas_antiguo):
+            os.unlink(mas_antiguo)
+        for numero in range(self.archivos_rotados - 1, 0, -1):
+            origen = ruta_rotada(self.archivo, numero)
+            if os.path.exists(origen):
+                os.replace(origen, ruta_rotada(self.archivo, numero + 1))
+        if self.archivos_rotados > 0:
+            os.replace(self.archivo, ruta_rotada(self.archivo, 1))
+        else:
+            os.unlink(self.archivo)
+
+        self.rotaciones += 1
+        return open(self.archivo, 'ab')
+
+    def ultimos(self, n=50):
+        """Últimos n registros ya escritos"""
+        return leer_cola(self.archivo, n)
+
+    def estadisticas(self):
+        return {
+            'escritos': self.escritos,
+            'pendientes': self.cola.qsize(),
+            'sincronizaciones': self.sincronizaciones,
+            'rotaciones': self.rotaciones,
+            'errores': self.errores,
+        }
@@ -0,0 +1,248 @@
+from collections import OrderedDict
+
+from gramatica_operaciones import (
+    GramaticaOperaciones, NUM, OP, FUNC, REF, ABRE, CIERRA, OTRO,
+)
+
+
+# Poder de enlace de cada operador binario (mayor = se agrupa antes)
+PRECEDENCIA = {
+    'suma': 10,
+    'resta': 10,
+    'multiplicacion': 20,
+    'division': 20,
+    'potencia': 40,
+}
+
+# La potencia asocia por la derecha: 2 ^ 3 ^ 2 = 2 ^ 9
+ASOCIA_DERECHA = {'potencia'}
+
+# Signo unario y funciones: más fuerte que * y /, más débil que la potencia
+# ("menos 2 elevado a 2" = -(2^2), "raíz cuadrada de 2 por 8" = raíz(2) * 8).
+# Un negativo ya escrito en dígitos es un solo número: "-2 ^ 2" = (-2)^2; por eso
+# convertir_numeros_texto no pega el 'menos' a un número que va a elevarse
+PRECEDENCIA_PREFIJO = 30
+
+# Tipos de token que pueden formar parte de una expresión
+TIPOS_EXPRESION = {NUM, OP, FUNC, REF, ABRE, CIERRA}
+
+TIPO_COMBINADA = 'operación combinada'
+
+
+class ErrorSintaxis(Exception):
+    """La secuencia de tokens no forma una expresión completa"""
+
+
+class Parser:
+    """Parser de Pratt sobre la lista de tokens de GramaticaOperaciones.
+
+    Nodos del AST (tuplas):
+        ('num', valor)
+        ('ref',)                      -> ultimo_resultado al evaluar
+        ('neg', nodo)
+        ('bin', operacion, izq, der)
+        ('func', funcion, nodo)
+    """
+
+    def __init__(self, tipos, valores):
+        self.tipos = tipos
+        self.valores = valores
+        self.pos = 0
+
+    def siguiente(self):
+        if self.pos >= len(self.tipos):
+            raise ErrorSintaxis("expresión incompleta")
+        tipo, valor = self.tipos[self.pos], self.valores[self.pos]
+        self.pos += 1
+        return tipo, valor
+
+    def ver(self):
+        return self.tipos[self.pos] if self.pos < len(self.tipos) else None
+
+    def analizar(self):
+        nodo = self.expresion(0)
+        if self.pos != len(self.tipos):
+            raise ErrorSintaxis(f"token inesperado: {self.valores[self.pos]}")
+        return nodo
+
+    def expresion(self, poder_minimo):
+        izquierda = self.prefijo()
+
+        while self.ver() == OP:
+            operacion = self.valores[self.pos]
+            poder = PRECEDENCIA[operacion]
+            if poder <= poder_minimo:
+                break
+            self.pos += 1
+            poder_derecha = poder - 1 if operacion in ASOCIA_DERECHA else poder
+            izquierda = ('bin', operacion, izquierda, self.expresion(poder_derecha))
+
+        return izquierda
+
+    def prefijo(self):
+        tipo, valor = self.siguiente()
+
+        if tipo == NUM:
+            return ('num', float(valor))
+        if tipo == REF:
+            # "resultado anterior" son dos tokens REF para un único valor
+            while self.ver() == REF:
+                self.pos += 1
+            return ('ref',)
+        if tipo == ABRE:
+            nodo = self.expresion(0)
+            # Un paréntesis sin cerrar al final de la frase se da por cerrado
+            if self.ver() == CIERRA:
+                self.pos += 1
+            elif self.ver() is not None:
+                raise ErrorSintaxis("falta cerrar paréntesis")
+            return nodo
+        if tipo == FUNC:
+            return ('func', valor, self.expresion(PRECEDENCIA_PREFIJO))
+        if tipo == OP and valor == 'resta':
+            return ('neg', self.expresion(PRECEDENCIA_PREFIJO))
+        if tipo == OP and valor == 'suma':
+            return self.expresion(PRECEDENCIA_PREFIJO)
+
+        raise ErrorSintaxis(f"token inesperado: {valor}")
+
+
+class Expresion:
+    """AST compilado de una frase, evaluable con distintos resultados anteriores"""
+
+    def __init__(self, arbol, operaciones, funciones):
+        self.arbol = arbol
+        self.operaciones = operaciones
+        self.funciones = funciones
+        self.tipo = self.describir(arbol)
+
+    def describir(self, arbol):
+        """Tipo de operación para el mensaje hablado"""
+        if arbol[0] == 'bin':
+            _, operacion, izquierda, derecha = arbol
+            if izquierda[0] in ('num', 'ref') and derecha[0] == 'num':
+                tipo = self.operaciones[operacion][1]
+                return f'{tipo} con resultado anterior' if izquierda[0] == 'ref' else tipo
+        elif arbol[0] == 'func' and arbol[2][0] == 'num':
+            return self.funciones[arbol[1]][1]
+        return TIPO_COMBINADA
+
+    def evaluar(self, ultimo_resultado=0):
+        """Devuelve el resultado o None si algún paso no es válido (división por cero...)"""
+        return self.calcular(self.arbol, ultimo_resultado)
+
+    def calcular(self, nodo, ultimo_resultado):
+        clase = nodo[0]
+        if clase == 'num':
+            return nodo[1]
+        if clase == 'ref':
+            return ultimo_resultado
+        if clase == 'bin':
+            izquierda = self.calcular(nodo[2], ultimo_resultado)
+            if izquierda is None:
+                return None
+            derecha = self.calcular(nodo[3], ultimo_resultado)
+            if derecha is None:
+                return None
+            return self.operaciones[nodo[1]][0](izquierda, derecha)
+        if clase == 'neg':
+            valor = self.calcular(nodo[1], ultimo_resultado)
+            return None if valor is None else -valor
+        if clase == 'func':
+            valor = self.calcular(nodo[2], ultimo_resultado)
+            return None if valor is None else self.funciones[nodo[1]][0](valor)
+        return None
+
+
+class MotorExpresiones:
+    """Tokenizador -> parser de Pratt -> AST -> evaluador, con caché de ASTs"""
+
+    def __init__(self, gramatica=None, tamano_cache=512):
+        self.gramatica = gramatica or GramaticaOperaciones()
+        self.tamano_cache = tamano_cache
+        # texto normalizado -> Expresion (o None si la frase no contiene operación)
+        self._cache = OrderedDict()
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+
+    @staticmethod
+    def normalizar(texto):
+        return ' '.join(texto.lower().split())
+
+    def compilar(self, texto):
+        """Devuelve la Expresion de la frase (cacheada) o None si no hay operación"""
+        clave = self.normalizar(texto)
+        cache = self._cache
+        if clave in cache:
+            cache.move_to_end(clave)
+            self.aciertos_cache += 1
+            return cache[clave]
+
+        self.fallos_cache += 1
+        expresion = self.construir(clave)
+        cache[clave] = expresion
+        if len(cache) > self.tamano_cache:
+            cache.popitem(last=False)
+        return expresion
+
+    def construir(self, texto):
+        """Analiza el tramo de operación más largo de la frase"""
+        tipos, valores = self.gramatica.tokenizar(texto)
+
+        # Tramos de tokens de expresión separados por palabras ajenas ("cuánto es", "por favor")
+        tramos = []
+        inicio = None
+        for i, tipo in enumerate(tipos + OTRO):
+            if tipo in TIPOS_EXPRESION:
+                if inicio is None:
+                    inicio = i
+            elif inicio is not None:
+                tramos.append((inicio, i))
+                inicio = None
+        tramos.sort(key=lambda tramo: tramo[0] - tramo[1])
+
+        for inicio, fin in tramos:
+            arbol = self.analizar_tramo(tipos, valores, inicio, fin)
+            if arbol is None and tipos[inicio] == REF:
+                # "el resultado de 2 más 3": el 'resultado' de delante no es un operando
+                while inicio < fin and tipos[inicio] == REF:
+                    inicio += 1
+                arbol = self.analizar_tramo(tipos, valores, inicio, fin)
+            if arbol is not None:
+                return Expresion(arbol, self.gramatica.operaciones, self.gramatica.funciones)
+        return None
+
+    def analizar_tramo(self, tipos, valores, inicio, fin):
+        """Si el tramo no cierra ("5 más 3 por" + "favor"), se recorta por la derecha"""
+        while fin > inicio:
+            arbol = self.analizar(tipos[inicio:fin], valores[inicio:fin])
+            if arbol is not None:
+                return arbol
+            fin -= 1
+        return None
+
+    @staticmethod
+    def analizar(tipos, valores):
+        # Un número suelto no es una operación
+        if FUNC not in tipos and OP not in tipos:
+            return None
+        try:
+            arbol = Parser(tipos, valores).analizar()
+        except ErrorSintaxis:
+            return None
+        return arbol if arbol[0] != 'num' else None
+
+    def evaluar(self, texto, ultimo_resultado=0):
+        """Evalúa la frase; devuelve (resultado, tipo) o None si no hay operación"""
+        expresion = self.compilar(texto)
+        if expresion is None:
+            return None
+        return expresion.evaluar(ultimo_resultado), expresion.tipo
+
+    def estadisticas(self):
+        """Uso de la caché de ASTs para diagnóstico"""
+        return {
+            'entradas': len(self._cache),
+            'aciertos': self.aciertos_cache,
+            'fallos': self.fallos_cache,
+        }
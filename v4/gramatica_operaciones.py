@@ -0,0 +1,134 @@
+import math
+import re
+
+
+# Un único patrón compilado recorre el texto una sola vez y lo parte en tokens
+PATRON_TOKENS = re.compile(r'-?\d+(?:\.\d+)?|[^\W\d_]+|\*\*|[+\-*/^()]')
+
+# Tipos de token (un carácter cada uno, para poder casar reglas sobre la cadena de tipos)
+NUM = 'n'
+OP = 'o'
+FUNC = 'f'
+REF = 'r'
+ABRE = '('
+CIERRA = ')'
+OTRO = '?'
+
+# Operaciones binarias: nombre -> (función, tipo para el mensaje)
+OPERACIONES_BINARIAS = {
+    'suma': (lambda x, y: x + y, 'suma'),
+    'resta': (lambda x, y: x - y, 'resta'),
+    'multiplicacion': (lambda x, y: x * y, 'multiplicación'),
+    'division': (lambda x, y: x / y if y != 0 else None, 'división'),
+    'potencia': (lambda x, y: x ** y, 'potencia'),
+}
+
+# Funciones de un argumento: nombre -> (función, tipo para el mensaje)
+FUNCIONES = {
+    'raiz_cuadrada': (lambda x: math.sqrt(x), 'raíz cuadrada'),
+    'seno': (lambda x: math.sin(math.radians(x)), 'seno'),
+    'coseno': (lambda x: math.cos(math.radians(x)), 'coseno'),
+    'tangente': (lambda x: math.tan(math.radians(x)), 'tangente'),
+    'logaritmo': (lambda x: math.log10(x) if x > 0 else None, 'logaritmo'),
+}
+
+# Vocabulario: palabra o símbolo -> (tipo de token, valor)
+PALABRAS_CLAVE = {
+    'más': (OP, 'suma'), 'mas': (OP, 'suma'), 'suma': (OP, 'suma'), 'sumado': (OP, 'suma'),
+    'plus': (OP, 'suma'), '+': (OP, 'suma'),
+    'menos': (OP, 'resta'), 'resta': (OP, 'resta'), 'restado': (OP, 'resta'),
+    'restar': (OP, 'resta'), '-': (OP, 'resta'),
+    'por': (OP, 'multiplicacion'), 'multiplicado': (OP, 'multiplicacion'),
+    'multiplicar': (OP, 'multiplicacion'), 'times': (OP, 'multiplicacion'),
+    'x': (OP, 'multiplicacion'), '*': (OP, 'multiplicacion'),
+    'entre': (OP, 'division'), 'dividido': (OP, 'division'), 'dividir': (OP, 'division'),
+    'division': (OP, 'division'), '/': (OP, 'division'),
+    'elevado': (OP, 'potencia'), 'potencia': (OP, 'potencia'), 'exponente': (OP, 'potencia'),
+    '^': (OP, 'potencia'), '**': (OP, 'potencia'),
+    'seno': (FUNC, 'seno'), 'coseno': (FUNC, 'coseno'), 'tangente': (FUNC, 'tangente'),
+    'logaritmo': (FUNC, 'logaritmo'),
+    'resultado': (REF, None), 'anterior': (REF, None),
+    '(': (ABRE, None), ')': (CIERRA, None),
+}
+
+# Expresiones de dos palabras que forman un solo token
+BIGRAMAS = {
+    ('raíz', 'cuadrada'): (FUNC, 'raiz_cuadrada'),
+    ('raiz', 'cuadrada'): (FUNC, 'raiz_cuadrada'),
+    ('abre', 'paréntesis'): (ABRE, None), ('abre', 'parentesis'): (ABRE, None),
+    ('abrir', 'paréntesis'): (ABRE, None), ('abrir', 'parentesis'): (ABRE, None),
+    ('cierra', 'paréntesis'): (CIERRA, None), ('cierra', 'parentesis'): (CIERRA, None),
+    ('cerrar', 'paréntesis'): (CIERRA, None), ('cerrar', 'parentesis'): (CIERRA, None),
+}
+
+PRIMERAS_BIGRAMA = {primera for primera, _ in BIGRAMAS}
+
+# Palabras de relleno que no cambian el significado ("seno de 30", "elevado a la 2")
+RELLENO = {'de', 'a', 'la', 'el', 'al'}
+
+# Verbos que nombran la operación delante de los operandos ("resta 10 menos 2",
+# "multiplicar 3 por 4"): ahí no son operador, y 'resta' no es el signo de 10
+VERBOS = {'suma', 'resta', 'restar', 'multiplicar', 'dividir'}
+
+class GramaticaOperaciones:
+    """Vocabulario de operaciones: tokenizador y tablas de operadores y funciones.
+
+    El análisis lo hace expresiones.MotorExpresiones sobre los tokens.
+    """
+
+    def __init__(self, operaciones=None, funciones=None, palabras_clave=None):
+        self.operaciones = operaciones or OPERACIONES_BINARIAS
+        self.funciones = funciones or FUNCIONES
+        self.palabras_clave = palabras_clave or PALABRAS_CLAVE
+
+    def tokenizar(self, texto):
+        """Convierte el texto en tokens en una sola pasada; devuelve (tipos, valores)"""
+        palabras_clave = self.palabras_clave
+        tipos = []
+        valores = []
+        pendiente = None  # primera palabra de un posible bigrama
+
+        for palabra in PATRON_TOKENS.findall(texto.lower()):
+            if pendiente is not None:
+                token = BIGRAMAS.get((pendiente, palabra))
+                pendiente_token, pendiente = palabras_clave.get(pendiente, (OTRO, pendiente)), None
+                if token:
+                    tipos.append(token[0])
+                    valores.append(token[1])
+                    continue
+                tipos.append(pendiente_token[0])
+                valores.append(pendiente_token[1])
+
+            token = palabras_clave.get(palabra)
+            if token is not None and palabra in VERBOS and not (tipos and tipos[-1] in (NUM, REF, CIERRA)):
+                token = (OTRO, palabra)
+            if token is not None:
+                # "multiplicado por", "dividido por": el 'por' es parte del operador
+                if palabra == 'por' and tipos and tipos[-1] == OP:
+                    continue
+                tipos.append(token[0])
+                valores.append(token[1])
+            elif palabra[0].isdigit():
+                tipos.append(NUM)
+                valores.append(palabra)
+            elif palabra[0] == '-' and len(palabra) > 1:
+                # "-7" es un número negativo salvo que siga a otro operando ("10-7")
+                if tipos and tipos[-1] in (NUM, REF, CIERRA):
+                    tipos.append(OP)
+                    valores.append('resta')
+                    palabra = palabra[1:]
+                tipos.append(NUM)
+                valores.append(palabra)
+            elif palabra in RELLENO:
+                continue
+            elif palabra in PRIMERAS_BIGRAMA:
+                pendiente = palabra
+            else:
+                tipos.append(OTRO)
+                valores.append(palabra)
+
+        if pendiente is not None:
+            token = palabras_clave.get(pendiente, (OTRO, pendiente))
+            tipos.append(token[0])
+            valores.append(token[1])
+        return ''.join(tipos), valores
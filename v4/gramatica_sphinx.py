@@ -0,0 +1,140 @@
+import hashlib
+import os
+
+from gramatica_operaciones import BIGRAMAS, FUNC, OP, PALABRAS_CLAVE, RELLENO
+from numeros_texto import (ARTICULOS, DENOMINADORES, ESCALAS, ORDINALES, PEQUENOS,
+                           SEPARADORES_DECIMALES, SIN_ACENTOS)
+
+
+# Junto a calculadora_config.json; speech_recognition deja el .fsg compilado al lado del .gram
+DIRECTORIO_GRAMATICA = 'gramatica_sphinx'
+PREFIJO = 'calculadora'
+
+# Lo que suele rodear a una orden: "oye calculadora, cuánto es ... por favor"
+CORTESIA = ['oye calculadora', 'hey calculadora', 'calculadora', 'oye', 'cuánto es', 'cuanto es',
+            'dime', 'calcula', 'por favor']
+
+
+def sin_tildes(palabra):
+    return palabra.lower().translate(SIN_ACENTOS)
+
+
+def ruta_diccionario(idioma='es-ES'):
+    """Diccionario de pronunciación que usa recognize_sphinx para ese idioma"""
+    import speech_recognition
+    return os.path.join(os.path.dirname(speech_recognition.__file__), 'pocketsphinx-data', idioma,
+                        'pronounciation-dictionary.dict')
+
+
+def leer_diccionario(ruta):
+    """Palabras del diccionario agrupadas por su forma sin tildes ('dieciseis' -> {'dieciséis'})"""
+    palabras = {}
+    with open(ruta, encoding='utf-8', errors='replace') as f:
+        for linea in f:
+            palabra = linea.split(maxsplit=1)[0] if linea.strip() else ''
+            palabra = palabra.split('(', 1)[0]  # variantes de pronunciación: "palabra(2)"
+            if palabra:
+                palabras.setdefault(sin_tildes(palabra), set()).add(palabra)
+    return palabras
+
+
+def vocabulario(comandos=()):
+    """Frases que entiende la calculadora, por grupo de la gramática"""
+    numeros = (set(PEQUENOS) | set(ESCALAS) | set(DENOMINADORES) | set(ORDINALES) |
+               SEPARADORES_DECIMALES | ARTICULOS | {'y'})
+    operadores, funciones, enlaces = set(), set(), set(RELLENO)
+    palabras_clave = [(palabra, tipo) for palabra, (tipo, _) in PALABRAS_CLAVE.items() if palabra.isalpha()]
+    palabras_clave += [(' '.join(bigrama), tipo) for bigrama, (tipo, _) in BIGRAMAS.items()]
+    for frase, tipo in palabras_clave:
+        if tipo == OP:
+            operadores.add(frase)
+        elif tipo == FUNC:
+            funciones.add(frase)
+        else:
+            enlaces.add(frase)  # "resultado", "abre paréntesis"...
+    return {
+        'numero': numeros,
+        'operador': operadores,
+        'funcion': funciones,
+        'enlace': enlaces,
+        'comando': set(comandos),
+        'cortesia': set(CORTESIA),
+    }
+
+
+def en_diccionario(frase, diccionario):
+    """La frase con la grafía del diccionario (tildes incluidas), o None si falta alguna palabra"""
+    palabras = []
+    for palabra in frase.split():
+        formas = diccionario.get(sin_tildes(palabra))
+        if not formas:
+            return None
+        palabras.append(palabra if palabra in formas else sorted(formas)[0])
+    return ' '.join(palabras)
+
+
+def generar_jsgf(nombre, grupos):
+    """JSGF con una regla por grupo; la orden es una secuencia libre de palabras del vocabulario.
+
+    No impone el orden de los operandos: restringir el vocabulario ya quita la
+    mayor parte de las confusiones, y el parser decide qué es una operación.
+    """
+    lineas = ['#JSGF V1.0;', f'grammar {nombre};', '']
+    for grupo, frases in sorted(grupos.items()):
+        if frases:
+            lineas.append(f"<{grupo}> = {' | '.join(sorted(frases))};")
+    elementos = ' | '.join(f'<{grupo}>' for grupo in ('numero', 'operador', 'funcion', 'enlace') if grupos[grupo])
+    orden = f'({elementos})+'
+    if grupos['comando']:
+        orden = f'<comando> | {orden}'
+    cortesia = '[<cortesia>+] ' if grupos['cortesia'] else ''
+    lineas += ['', f'public <{nombre}> = {cortesia}({orden}){" [<cortesia>+]" if cortesia else ""};', '']
+    return '\n'.join(lineas)
+
+
+def crear_gramatica(comandos=(), idioma='es-ES', directorio=DIRECTORIO_GRAMATICA, verboso=True):
+    """Escribe la gramática de la calculadora para Sphinx y devuelve su ruta (None si no se puede).
+
+    Solo entran las palabras que están en el diccionario del modelo (si no,
+    PocketSphinx no compila la gramática). El nombre lleva un resumen del
+    contenido: speech_recognition compila el .fsg la primera vez y lo reutiliza
+    mientras exista, así que una gramática distinta no puede usar uno viejo.
+    """
+    try:
+        diccionario = leer_diccionario(ruta_diccionario(idioma))
+    except (OSError, ImportError) as e:
+        if verboso:
+            print(f"⚠️  Sin diccionario de Sphinx para la gramática: {e}")
+        return None
+
+    grupos = {}
+    descartadas = 0
+    for grupo, frases in vocabulario(comandos).items():
+        grupos[grupo] = set()
+        for frase in frases:
+            frase = en_diccionario(frase, diccionario)
+            if frase is None:
+                descartadas += 1
+            else:
+                grupos[grupo].add(frase)
+    if not grupos['numero'] or not grupos['operador']:
+        if verboso:
+            print("⚠️  El diccionario de Sphinx no tiene el vocabulario de la calculadora")
+        return None
+
+    contenido = generar_jsgf('GRAMATICA', grupos)
+    nombre = f"{PREFIJO}_{hashlib.sha1(contenido.encode('utf-8')).hexdigest()[:12]}"
+    ruta = os.path.join(directorio, f'{nombre}.gram')
+    if not os.path.exists(ruta):
+        os.makedirs(directorio, exist_ok=True)
+        for viejo in os.listdir(directorio):
+            if viejo.startswith(PREFIJO + '_'):
+                os.unlink(os.path.join(directorio, viejo))
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(generar_jsgf(nombre, grupos))
+        os.replace(temporal, ruta)
+        if verboso:
+            palabras = sum(len(frases) for frases in grupos.values())
+            print(f"📝 Gramática de Sphinx: {palabras} frases ({descartadas} fuera del diccionario)")
+    return ruta
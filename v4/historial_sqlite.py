@@ -0,0 +1,182 @@
+import queue
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from gramatica_operaciones import FUNCIONES, OPERACIONES_BINARIAS
+
+
+ARCHIVO_BASE = 'historial_calculadora.db'
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS operaciones (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    operacion TEXT NOT NULL,
+    resultado REAL,
+    tipo TEXT
+);
+CREATE INDEX IF NOT EXISTS operaciones_fecha ON operaciones (fecha);
+CREATE INDEX IF NOT EXISTS operaciones_tipo ON operaciones (tipo, id);
+"""
+
+# Sentencias fijas con parámetros: sqlite3 las prepara una vez por conexión y las reutiliza
+INSERTAR = "INSERT INTO operaciones (fecha, operacion, resultado, tipo) VALUES (?, ?, ?, ?)"
+CONTAR = "SELECT COUNT(*) FROM operaciones"
+ENTRE_FECHAS = ("SELECT fecha, operacion, resultado, tipo FROM operaciones "
+                "WHERE fecha >= ? AND fecha < ? ORDER BY id")
+ULTIMAS = ("SELECT fecha, operacion, resultado, tipo FROM ("
+          "SELECT * FROM operaciones ORDER BY id DESC LIMIT ?) ORDER BY id")
+SUMA_RESULTADOS = "SELECT COUNT(resultado), TOTAL(resultado) FROM operaciones"
+# Una búsqueda por índice para cada tipo en lugar de ordenar todas las filas de ambos
+ULTIMA_DE_TIPO = ("SELECT fecha, operacion, resultado, tipo FROM ("
+                  "SELECT * FROM (SELECT * FROM operaciones WHERE tipo = ? ORDER BY id DESC LIMIT 1) "
+                  "UNION ALL "
+                  "SELECT * FROM (SELECT * FROM operaciones WHERE tipo = ? ORDER BY id DESC LIMIT 1)"
+                  ") ORDER BY id DESC LIMIT 1")
+
+# Tipos que puede tener una operación simple, para "cuál fue la última ..."
+TIPOS = sorted({tipo for _, tipo in OPERACIONES_BINARIAS.values()} |
+               {tipo for _, tipo in FUNCIONES.values()}, key=len, reverse=True)
+
+_FIN = object()
+
+
+def sin_tildes(texto):
+    return texto.translate(str.maketrans('áéíóúü', 'aeiouu'))
+
+
+def conectar(archivo):
+    conexion = sqlite3.connect(archivo, check_same_thread=False)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    # Con WAL, NORMAL solo puede perder las últimas transacciones si cae el sistema, nunca corrompe
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.executescript(ESQUEMA)
+    return conexion
+
+
+class HistorialSQLite:
+    """Historial sin límite en SQLite (modo WAL), con consultas por fecha y por tipo.
+
+    Tiene la misma interfaz que DiarioHistorial para el núcleo: registrar()
+    solo encola y un hilo inserta por lotes en una transacción, así el bucle
+    de voz no espera nunca al disco. Las consultas leen por otra conexión
+    (WAL permite leer mientras se escribe) tras esperar a que la cola se vacíe.
+    """
+
+    def __init__(self, archivo=ARCHIVO_BASE, lote_maximo=256, verboso=True):
+        self.archivo = archivo
+        self.lote_maximo = lote_maximo
+        self.verboso = verboso
+
+        self.cola = queue.Queue()
+        self.hilo = None
+        self.escritos = 0
+        self.errores = 0
+
+        self._lectura = None
+        self._lock_lectura = threading.Lock()
+
+    def iniciar(self):
+        if self.hilo is None:
+            # El esquema se crea aquí para que las consultas no dependan del hilo escritor
+            conectar(self.archivo).close()
+            self.hilo = threading.Thread(target=self.bucle_escritura, name='historial-sqlite', daemon=True)
+            self.hilo.start()
+        return self
+
+    def registrar(self, entrada):
+        """Encola una operación; vuelve al instante"""
+        if self.hilo is None:
+            self.iniciar()
+        self.cola.put(entrada)
+
+    def cerrar(self, timeout=5.0):
+        if self.hilo is not None:
+            self.cola.put(_FIN)
+            self.hilo.join(timeout)
+            self.hilo = None
+        with self._lock_lectura:
+            if self._lectura is not None:
+                self._lectura.close()
+                self._lectura = None
+
+    def bucle_escritura(self):
+        conexion = None
+        try:
+            conexion = conectar(self.archivo)
+            terminar = False
+            while not terminar:
+                lote = [self.cola.get()]
+                while len(lote) < self.lote_maximo:
+                    try:
+                        lote.append(self.cola.get_nowait())
+                    except queue.Empty:
+                        break
+
+                terminar = _FIN in lote
+                try:
+                    filas = [(entrada.get('fecha') or datetime.now().isoformat(), entrada['operacion'],
+                              entrada['resultado'], entrada.get('tipo'))
+                             for entrada in lote if entrada is not _FIN]
+                    if filas:
+                        with conexion:
+                            conexion.executemany(INSERTAR, filas)
+                        self.escritos += len(filas)
+                except (sqlite3.Error, KeyError) as e:
+                    self.errores += 1
+                    if self.verboso:
+                        print(f"⚠️  Error guardando historial: {e}")
+                finally:
+                    for _ in lote:
+                        self.cola.task_done()
+        except Exception as e:
+            self.errores += 1
+            if self.verboso:
+                print(f"⚠️  Historial SQLite detenido: {e}")
+        finally:
+            if conexion is not None:
+                conexion.close()
+
+    def consultar(self, sql, parametros=()):
+        """Ejecuta una consulta con lo encolado hasta ahora ya escrito"""
+        if self.hilo is not None and self.hilo.is_alive():
+            self.cola.join()
+        with self._lock_lectura:
+            if self._lectura is None:
+                self._lectura = conectar(self.archivo)
+            return self._lectura.execute(sql, parametros).fetchall()
+
+    def contar(self):
+        return self.consultar(CONTAR)[0][0]
+
+    def del_dia(self, dia=None):
+        """Operaciones de un día (hoy por defecto), en orden"""
+        dia = dia or date.today()
+        return self.consultar(ENTRE_FECHAS, (dia.isoformat(), (dia + timedelta(days=1)).isoformat()))
+
+    def ultimas(self, n=10):
+        """Últimas n operaciones, de la más antigua a la más reciente"""
+        return self.consultar(ULTIMAS, (n,))
+
+    def suma_resultados(self):
+        """(número de resultados, suma de todos ellos)"""
+        cantidad, total = self.consultar(SUMA_RESULTADOS)[0]
+        return cantidad, total
+
+    def ultima_de_tipo(self, tipo):
+        """Última operación de un tipo, sola o sobre el resultado anterior (None si no hay)"""
+        filas = self.consultar(ULTIMA_DE_TIPO, (tipo, f'{tipo} con resultado anterior'))
+        return filas[0] if filas else None
+
+    @staticmethod
+    def tipo_mencionado(texto):
+        """Tipo de operación nombrado en el texto ("la última raíz cuadrada" -> 'raíz cuadrada')"""
+        texto = sin_tildes(texto.lower())
+        for tipo in TIPOS:
+            if sin_tildes(tipo) in texto:
+                return tipo
+        return None
+
+    def estadisticas(self):
+        return {'escritos': self.escritos, 'pendientes': self.cola.qsize(), 'errores': self.errores}
@@ -0,0 +1,124 @@
+import re
+import threading
+import wave
+from array import array
+
+from gramatica_operaciones import FUNCIONES, OPERACIONES_BINARIAS
+from numeros_texto import VOCABULARIO_HABLADO, numero_a_palabras
+
+
+# Mensajes que terminan en un número: "El resultado de la suma es 8", "El último resultado es 8"
+PATRON_RESULTADO = re.compile(r'(?P<prefijo>.+ es) (?P<numero>-?\d+(?:\.\d+)?)')
+
+# Silencio entre palabras y tras el prefijo, y margen que se deja al recortar cada clip
+PAUSA_PALABRAS = 0.03
+PAUSA_PREFIJO = 0.08
+MARGEN_RECORTE = 0.015
+UMBRAL_SILENCIO = 300  # amplitud (16 bits) por debajo de la cual se considera silencio
+
+
+def prefijos_resultado():
+    """Todos los comienzos con que se anuncia un resultado"""
+    tipos = {tipo for _, tipo in OPERACIONES_BINARIAS.values()}
+    tipos |= {f'{tipo} con resultado anterior' for tipo in tipos}
+    tipos |= {tipo for _, tipo in FUNCIONES.values()}
+    tipos.add('operación combinada')
+    return sorted(f'El resultado de la {tipo} es' for tipo in tipos) + ['El último resultado es']
+
+
+def recortar_silencio(datos, ancho, canales, frecuencia):
+    """Quita el silencio del principio y del final de un clip (solo PCM de 16 bits)"""
+    if ancho != 2:
+        return datos
+    muestras = array('h', datos)
+    inicio = next((i for i, m in enumerate(muestras) if abs(m) > UMBRAL_SILENCIO), None)
+    if inicio is None:
+        return datos
+    fin = next(i for i in range(len(muestras) - 1, -1, -1) if abs(muestras[i]) > UMBRAL_SILENCIO)
+    margen = int(MARGEN_RECORTE * frecuencia) * canales
+    inicio = max(0, inicio - margen) // canales * canales
+    fin = min(len(muestras), fin + 1 + margen)
+    return muestras[inicio:fin].tobytes()
+
+
+class LecturaConcatenada:
+    """Dice los resultados uniendo clips ya sintetizados en lugar de sintetizar la frase.
+
+    El prefijo ("El resultado de la suma es") y cada palabra del número
+    ("mil", "doscientos", "y", "coma"...) se guardan como frases en la
+    CacheFrases, es decir, una vez por configuración de voz. Para decir un
+    resultado solo hay que leer esos clips (en memoria tras el primer uso),
+    recortarles el silencio y concatenar el PCM.
+    """
+
+    def __init__(self, cache_frases):
+        self.cache = cache_frases
+        self._clips = {}  # ruta -> (formato, PCM recortado)
+        self._lock = threading.Lock()
+        self.lecturas = 0
+
+    def clips_necesarios(self):
+        return prefijos_resultado() + VOCABULARIO_HABLADO
+
+    def piezas(self, texto):
+        """Clips que forman el mensaje (None si no es un resultado que se sepa leer así)"""
+        coincidencia = PATRON_RESULTADO.fullmatch(texto.strip())
+        if not coincidencia:
+            return None
+        palabras = numero_a_palabras(coincidencia.group('numero'))
+        if palabras is None:
+            return None
+        return [coincidencia.group('prefijo')] + palabras
+
+    def disponible(self, texto):
+        """Si están todos los clips del mensaje (sin tocar el disco)"""
+        piezas = self.piezas(texto)
+        return piezas is not None and all(self.cache.contiene(pieza) for pieza in piezas)
+
+    def clip(self, pieza):
+        ruta = self.cache.buscar(pieza)
+        if ruta is None:
+            return None
+        with self._lock:
+            if ruta not in self._clips:
+                with wave.open(ruta, 'rb') as wav:
+                    formato = (wav.getsampwidth(), wav.getnchannels(), wav.getframerate())
+                    datos = wav.readframes(wav.getnframes())
+                self._clips[ruta] = (formato, recortar_silencio(datos, *formato))
+            return self._clips[ruta]
+
+    def componer(self, texto):
+        """(PCM, formato) del mensaje, o None si falta algún clip o no coinciden los formatos"""
+        piezas = self.piezas(texto)
+        if piezas is None:
+            return None
+        clips = [self.clip(pieza) for pieza in piezas]
+        if any(clip is None for clip in clips) or len({formato for formato, _ in clips}) != 1:
+            return None
+
+        formato = clips[0][0]
+        ancho, canales, frecuencia = formato
+        def silencio(segundos):
+            return bytes(int(segundos * frecuencia) * ancho * canales)
+
+        partes = [clips[0][1], silencio(PAUSA_PREFIJO)]
+        for i, (_, datos) in enumerate(clips[1:]):
+            if i:
+                partes.append(silencio(PAUSA_PALABRAS))
+            partes.append(datos)
+        return b''.join(partes), formato
+
+    def reproducir(self, texto):
+        """Dice el mensaje por concatenación; False si hay que sintetizarlo entero"""
+        compuesto = self.componer(texto)
+        if compuesto is None:
+            return False
+        datos, formato = compuesto
+        self.cache.reproducir_pcm(datos, *formato)
+        self.lecturas += 1
+        return True
+
+    def olvidar(self):
+        """Descarta los clips en memoria (tras cambiar la configuración de voz)"""
+        with self._lock:
+            self._clips.clear()
@@ -1,5 +1,6 @@
 import contextlib
 import importlib
+from collections import deque
 import traceback
 import weakref
 
@@ -13,7 +14,7 @@ class DriverProxy:
     @ivar _engine: Reference to the engine that owns the driver
     @type _engine: L{engine.Engine}
     @ivar _queue: Queue of commands outstanding for the driver
-    @type _queue: list
+    @type _queue: collections.deque
     @ivar _busy: True when the driver is busy processing a command, False when
         not
     @type _busy: bool
@@ -43,7 +44,7 @@ class DriverProxy:
         self._driver = self._module.buildDriver(weakref.proxy(self))
         # initialize refs
         self._engine = engine
-        self._queue = []
+        self._queue = deque()
         self._busy = True
         self._name = None
         self._iterator = None
@@ -74,7 +75,7 @@ class DriverProxy:
         driver is not currently busy.
         """
         while (not self._busy) and len(self._queue):
-            cmd = self._queue.pop(0)
+            cmd = self._queue.popleft()
             self._name = cmd[2]
             try:
                 cmd[0](*cmd[1])
@@ -139,7 +140,7 @@ class DriverProxy:
                 break
             if mtd == self._engine.endLoop:
                 break
-            self._queue.pop(0)
+            self._queue.popleft()
         self._driver.stop()
 
     def save_to_file(self, text, filename, name) -> None:
@@ -192,7 +193,7 @@ class DriverProxy:
 
     def endLoop(self, useDriverLoop) -> None:
         """Called by the engine to stop an event loop."""
-        self._queue = []
+        self._queue.clear()
         self._driver.stop()
         if useDriverLoop:
             self._driver.endLoop()
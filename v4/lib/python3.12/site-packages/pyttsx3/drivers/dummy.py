@@ -1,5 +1,5 @@
 import contextlib
-import time
+import threading
 
 from pyttsx3.voice import Voice
 
@@ -37,6 +37,9 @@ class DummyDriver:
         """
         self._proxy = proxy
         self._looping = False
+        # endLoop() may come before startLoop() (runAndWait pumps it while idle)
+        self._end_requested = False
+        self._wakeup = threading.Event()
         # hold config values as if we had a real tts implementation that
         # supported them
         voices = [
@@ -66,13 +69,13 @@ class DummyDriver:
         @precondition: There was no previous successful call to L{startLoop}
             without an intervening call to L{stopLoop}.
         """
-        first = True
         self._looping = True
-        while self._looping:
-            if first:
-                self._proxy.setBusy(False)
-                first = False
-            time.sleep(0.5)
+        self._proxy.setBusy(False)
+        while not self._end_requested:
+            self._wakeup.wait()
+            self._wakeup.clear()
+        self._looping = False
+        self._end_requested = False
 
     def endLoop(self) -> None:
         """
@@ -81,7 +84,8 @@ class DummyDriver:
         @precondition: A previous call to L{startLoop} succeeded and there was
             no intervening call to L{endLoop}.
         """
-        self._looping = False
+        self._end_requested = True
+        self._wakeup.set()
 
     def iterate(self):
         """Iterates from within an external run loop."""
@@ -3,8 +3,9 @@ import logging
 import os
 import platform
 import subprocess
-import time
+import threading
 import wave
+from collections import deque
 from tempfile import NamedTemporaryFile
 
 if platform.system() == "Windows":
@@ -14,6 +15,115 @@ from pyttsx3.voice import Voice
 
 from . import _espeak
 
+SAMPLE_WIDTH = 2  # espeak delivers 16-bit mono PCM
+DEFAULT_SAMPLE_RATE = 22050
+
+
+class PyAudioSink:
+    """Plays PCM through a PyAudio output stream as it is written.
+
+    ``audio`` is a ``pyaudio.PyAudio`` instance owned by the caller, so that
+    PortAudio is initialized once per driver rather than once per utterance.
+    """
+
+    def __init__(self, rate, audio):
+        import pyaudio
+
+        self._stream = audio.open(format=pyaudio.paInt16, channels=1, rate=rate, output=True)
+
+    def write(self, data):
+        self._stream.write(data)
+
+    def close(self, discard=False):
+        try:
+            if discard:
+                self._stream.abort()
+            else:
+                self._stream.stop_stream()  # waits until the buffered audio has played
+        finally:
+            self._stream.close()
+
+
+class AplaySink:
+    """Streams raw PCM into aplay's stdin (Linux without PyAudio)."""
+
+    def __init__(self, rate):
+        self._process = subprocess.Popen(
+            ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(rate)],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, data):
+        self._process.stdin.write(data)
+
+    def close(self, discard=False):
+        if discard:
+            self._process.kill()
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self._process.wait()
+
+
+class TempFileSink:
+    """Collects the utterance and plays it from a WAV file (players that need a file)."""
+
+    def __init__(self, rate):
+        self._rate = rate
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+
+    def close(self, discard=False):
+        if discard or not self._chunks:
+            return
+        with NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+            with wave.open(temp_wav, "wb") as f:
+                f.setnchannels(1)
+                f.setsampwidth(SAMPLE_WIDTH)
+                f.setframerate(self._rate)
+                f.writeframes(b"".join(self._chunks))
+            temp_wav_name = temp_wav.name
+        try:
+            if platform.system() == "Darwin":
+                subprocess.run(["afplay", temp_wav_name], check=True)
+            elif platform.system() == "Windows":
+                winsound.PlaySound(temp_wav_name, winsound.SND_FILENAME)
+            else:
+                subprocess.run(["aplay", "-q", temp_wav_name], check=True)
+        finally:
+            os.remove(temp_wav_name)  # noqa: PTH107
+
+
+class WaveFileSink:
+    """Writes each chunk straight into a WAV file (save_to_file)."""
+
+    def __init__(self, filename, rate):
+        self._file = wave.open(filename, "wb")
+        self._file.setnchannels(1)
+        self._file.setsampwidth(SAMPLE_WIDTH)
+        self._file.setframerate(rate)
+
+    def write(self, data):
+        self._file.writeframesraw(data)
+
+    def close(self, discard=False):
+        self._file.close()
+
+
+def default_sink(rate, audio=None):
+    """Streaming playback where possible: PyAudio (when ``audio`` is given), then aplay, then a temporary file."""
+    if platform.system() == "Linux":
+        if audio is not None:
+            try:
+                return PyAudioSink(rate, audio)
+            except Exception:
+                logging.debug("PyAudio output not available, falling back to aplay")
+        return AplaySink(rate)
+    return TempFileSink(rate)
+
 
 # noinspection PyPep8Naming
 def buildDriver(proxy):
@@ -24,6 +134,9 @@ def buildDriver(proxy):
 class EspeakDriver:
     _moduleInitialized = False
     _defaultVoice = ""
+    _sampleRate = DEFAULT_SAMPLE_RATE
+    # Callable(rate) -> object with write(data) and close(discard=False); None = default_sink
+    sink_factory = None
 
     def __init__(self, proxy):
         if not EspeakDriver._moduleInitialized:
@@ -34,6 +147,7 @@ class EspeakDriver:
             if rate == -1:
                 msg = "could not initialize espeak"
                 raise RuntimeError(msg)
+            EspeakDriver._sampleRate = rate
             current_voice = _espeak.GetCurrentVoice()
             if current_voice and current_voice.contents.name:
                 EspeakDriver._defaultVoice = current_voice.contents.name.decode("utf-8")
@@ -45,10 +159,17 @@ class EspeakDriver:
         self._looping = False
         self._stopping = False
         self._speaking = False
+        self._end_requested = False
         self._text_to_say = None
-        self._data_buffer = b""
+        self._utterance_name = None
+        self._pending = deque()  # (text, filename or None, name) waiting to be synthesized
+        self._sink = None
         self._numerise_buffer = []
         self._save_file = None
+        self._pyaudio = None  # shared by this driver's PyAudioSinks; False once it turned out unavailable
+        self._error = None  # first failure reported from the synthesis callback, raised when the loop ends
+        # The run loop sleeps on this; synthesis callbacks, stop() and endLoop() wake it
+        self._wakeup = threading.Condition()
 
         _espeak.SetSynthCallback(self._onSynth)
         self.setProperty("voice", EspeakDriver._defaultVoice)
@@ -62,14 +183,23 @@ class EspeakDriver:
     def decode_numeric(self, data):
         return self._numerise_buffer[int(data) - 1]
 
-    @staticmethod
-    def destroy():
+    def destroy(self):
         _espeak.SetSynthCallback(None)
+        if self._pyaudio:
+            self._pyaudio.terminate()
+        self._pyaudio = None
+
+    def _wake(self):
+        with self._wakeup:
+            self._wakeup.notify_all()
 
     def stop(self):
-        if _espeak.IsPlaying():
+        # endLoop() also calls stop(): only an utterance in progress cancels what is queued
+        if self._speaking or _espeak.IsPlaying():
+            self._pending.clear()
             self._stopping = True
             _espeak.Cancel()
+            self._wake()
 
     @staticmethod
     def getProperty(name: str):
@@ -159,118 +289,153 @@ class EspeakDriver:
         """
         Save the synthesized speech to the specified filename.
         """
-        self._save_file = filename
-        self._text_to_say = text
+        self._pending.append((text, filename, self._proxy._name))
+        self._wake()
+
+    def _open_sink(self):
+        rate = EspeakDriver._sampleRate
+        if self._save_file:
+            return WaveFileSink(self._save_file, rate)
+        if EspeakDriver.sink_factory is not None:
+            return EspeakDriver.sink_factory(rate)
+        return default_sink(rate, self._get_pyaudio())
+
+    def _get_pyaudio(self):
+        """The driver's PyAudio instance, created on first use (None when PyAudio is missing)"""
+        if self._pyaudio is None and platform.system() == "Linux":
+            try:
+                import pyaudio
 
-    def _start_synthesis(self, text):
+                self._pyaudio = pyaudio.PyAudio()
+            except Exception:
+                logging.debug("PyAudio not available, falling back to aplay")
+                self._pyaudio = False
+        return self._pyaudio or None
+
+    def _report_error(self, error):
+        """Errors inside the ctypes callback would be lost: fire the error event and keep the first for startLoop to raise"""
+        if self._error is None:
+            self._error = error
+        self._proxy.notify("error", exception=error, name=self._utterance_name)
+
+    def _close_sink(self, discard=False):
+        sink, self._sink = self._sink, None
+        if sink is not None:
+            sink.close(discard=discard)
+
+    def _start_synthesis(self, text, filename=None, name=None):
+        # Utterances are queued before they are spoken: keep the name each one was queued with
+        self._utterance_name = name
+        self._text_to_say = text
+        self._save_file = filename
         self._proxy.setBusy(True)
-        self._proxy.notify("started-utterance")
-        self._speaking = True
-        self._data_buffer = b""  # Ensure buffer is cleared before starting
+        self._proxy.notify("started-utterance", name=self._utterance_name)
         try:
+            # Audio goes to the sink as espeak produces it: playback starts mid-synthesis
+            self._sink = self._open_sink()
+            self._speaking = True
             _espeak.Synth(str(text).encode("utf-8"), flags=_espeak.ENDPAUSE | _espeak.CHARS_UTF8)
         except Exception as e:
+            self._speaking = False
+            self._close_sink(discard=True)
+            self._save_file = None
             self._proxy.setBusy(False)
-            self._proxy.notify("error", exception=e)
+            self._proxy.notify("error", exception=e, name=self._utterance_name)
             raise
 
-    def _onSynth(self, wav, numsamples, events):  # noqa: C901,PLR0912,PLR0915
-        """
-        TODO: Refactor this function because it is too complex by several measures.
-        """
+    def _onSynth(self, wav, numsamples, events):
         if not self._speaking:
             return 0
 
-        # Process each event in the current callback
+        # The samples of this callback come before its events
+        if numsamples > 0 and self._sink is not None:
+            try:
+                self._sink.write(ctypes.string_at(wav, numsamples * SAMPLE_WIDTH))
+            except Exception as e:
+                self._report_error(e)
+                self._stopping = True
+                return 1  # abort synthesis
+
         i = 0
         while True:
             event = events[i]
             if event.type == _espeak.EVENT_LIST_TERMINATED:
                 break
             if event.type == _espeak.EVENT_WORD:
-                if self._text_to_say:
-                    start_index = event.text_position - 1
-                    end_index = start_index + event.length
-                    word = self._text_to_say[start_index:end_index]
-                else:
-                    word = "Unknown"
-                self._proxy.notify(
-                    "started-word",
-                    name=word,
-                    location=event.text_position,
-                    length=event.length,
-                )
-
+                self._notify_word(event)
             elif event.type == _espeak.EVENT_MSG_TERMINATED:
-                # Final event indicating synthesis completion
-                if self._save_file:
-                    try:
-                        with wave.open(self._save_file, "wb") as f:
-                            f.setnchannels(1)  # Mono
-                            f.setsampwidth(2)  # 16-bit samples
-                            f.setframerate(22050)  # 22,050 Hz sample rate
-                            f.writeframes(self._data_buffer)
-                        print(f"Audio saved to {self._save_file}")
-                    except Exception as e:
-                        msg = f"Error saving WAV file: {e}"
-                        raise RuntimeError(msg)
-                else:
-                    try:
-                        with NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                            with wave.open(temp_wav, "wb") as f:
-                                f.setnchannels(1)  # Mono
-                                f.setsampwidth(2)  # 16-bit samples
-                                f.setframerate(22050)  # 22,050 Hz sample rate
-                                f.writeframes(self._data_buffer)
-
-                            temp_wav_name = temp_wav.name
-                            temp_wav.flush()
-
-                        # Playback functionality (for say method)
-                        if platform.system() == "Darwin":  # macOS
-                            subprocess.run(["afplay", temp_wav_name], check=True)
-                        elif platform.system() == "Linux":
-                            os.system(f"aplay {temp_wav_name} -q")
-                        elif platform.system() == "Windows":
-                            winsound.PlaySound(temp_wav_name, winsound.SND_FILENAME)
-
-                        # Remove the file after playback
-                        os.remove(temp_wav_name)  # noqa: PTH107
-                    except Exception as e:
-                        print(f"Playback error: {e}")
-
-                # Clear the buffer and mark as finished
-                self._data_buffer = b""
-                self._speaking = False
-                self._proxy.notify("finished-utterance", completed=True)
-                self._proxy.setBusy(False)
-                self.endLoop()
+                self._finish_utterance()
                 break
-
             i += 1
 
-        # Accumulate audio data if available
-        if numsamples > 0:
-            self._data_buffer += ctypes.string_at(wav, numsamples * ctypes.sizeof(ctypes.c_short))
-
         return 0
 
+    def _notify_word(self, event):
+        if self._text_to_say:
+            start_index = event.text_position - 1
+            end_index = start_index + event.length
+            word = self._text_to_say[start_index:end_index]
+        else:
+            word = "Unknown"
+        self._proxy.notify(
+            "started-word",
+            name=word,
+            location=event.text_position,
+            length=event.length,
+        )
+
+    def _finish_utterance(self):
+        """Final event: flush the sink (waits for playback) and report completion"""
+        try:
+            self._close_sink()
+        except Exception as e:
+            msg = f"Error saving WAV file: {e}" if self._save_file else f"Playback error: {e}"
+            self._report_error(RuntimeError(msg))
+        finally:
+            self._save_file = None
+            self._speaking = False
+        self._proxy.notify("finished-utterance", completed=True, name=self._utterance_name)
+        self._proxy.setBusy(False)
+        self._wake()
+
     def endLoop(self):
-        self._looping = False
+        # May arrive before startLoop (runAndWait pumps it while idle): remembered until then
+        self._end_requested = True
+        self._wake()
 
     def startLoop(self):
-        first = True
+        """Runs until endLoop() has been requested and every queued utterance has finished.
+
+        Instead of polling, the loop waits on a condition that the synthesis
+        callback, stop() and endLoop() notify, so each utterance is followed by
+        the next one (or the end of the loop) without delay. An error reported
+        by the synthesis callback (playback, or writing the WAV file) is raised
+        once the loop has ended.
+        """
         self._looping = True
-        while self._looping:
-            if not self._looping:
-                break
-            if first:
-                self._proxy.setBusy(False)
-                first = False
-                if self._text_to_say:
-                    self._start_synthesis(self._text_to_say)
-            self.iterate()
-            time.sleep(0.01)
+        self._proxy.setBusy(False)  # pumps the queued commands into _pending
+        try:
+            while self._looping:
+                with self._wakeup:
+                    while self._speaking and not self._stopping:
+                        self._wakeup.wait()
+                self.iterate()
+                if self._speaking:
+                    continue
+                if self._pending:
+                    self._start_synthesis(*self._pending.popleft())
+                elif self._end_requested:
+                    break
+                else:
+                    with self._wakeup:
+                        if not (self._pending or self._end_requested or self._stopping):
+                            self._wakeup.wait()
+        finally:
+            self._looping = False
+            self._end_requested = False
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
 
     def iterate(self):
         if not self._looping:
@@ -278,9 +443,13 @@ class EspeakDriver:
         if self._stopping:
             _espeak.Cancel()
             self._stopping = False
-            self._proxy.notify("finished-utterance", completed=False)
+            self._speaking = False
+            self._close_sink(discard=True)
+            self._save_file = None
+            self._proxy.notify("finished-utterance", completed=False, name=self._utterance_name)
             self._proxy.setBusy(False)
             self.endLoop()
 
     def say(self, text):
-        self._text_to_say = text
+        self._pending.append((text, None, self._proxy._name))
+        self._wake()
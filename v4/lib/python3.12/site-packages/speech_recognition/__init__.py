@@ -4,8 +4,6 @@
 
 from __future__ import annotations
 
-import aifc
-import audioop
 import base64
 import collections
 import hashlib
@@ -25,7 +23,8 @@ from urllib.error import HTTPError, URLError
 from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 
-from .audio import AudioData, get_flac_converter
+from . import dsp
+from .audio import AudioData, get_aifc, get_flac_converter
 from .exceptions import (
     RequestError,
     TranscriptionFailed,
@@ -152,9 +151,9 @@ class Microphone(AudioSource):
                     continue
 
                 # compute RMS of debiased audio
-                energy = -audioop.rms(buffer, 2)
+                energy = -dsp.rms(buffer, 2)
                 energy_bytes = bytes([energy & 0xFF, (energy >> 8) & 0xFF])
-                debiased_energy = audioop.rms(audioop.add(buffer, energy_bytes * (len(buffer) // 2), 2), 2)
+                debiased_energy = dsp.rms(dsp.add(buffer, energy_bytes * (len(buffer) // 2), 2), 2)
 
                 if debiased_energy > 30:  # probably actually audio
                     result[device_index] = device_name
@@ -231,8 +230,9 @@ class AudioFile(AudioSource):
         try:
             # attempt to read the file as WAV
             self.audio_reader = wave.open(self.filename_or_fileobject, "rb")
-            self.little_endian = True  # RIFF WAV is a little-endian format (most ``audioop`` operations assume that the frames are stored in little-endian form)
+            self.little_endian = True  # RIFF WAV is a little-endian format (the ``dsp`` operations assume that the frames are stored in little-endian form)
         except (wave.Error, EOFError):
+            aifc = get_aifc()  # AIFF files are read with it, and FLAC files are decoded to AIFF
             try:
                 # attempt to read the file as AIFF
                 self.audio_reader = aifc.open(self.filename_or_fileobject, "rb")
@@ -268,19 +268,11 @@ class AudioFile(AudioSource):
         assert 1 <= self.audio_reader.getnchannels() <= 2, "Audio must be mono or stereo"
         self.SAMPLE_WIDTH = self.audio_reader.getsampwidth()
 
-        # 24-bit audio needs some special handling for old Python versions (workaround for https://bugs.python.org/issue12866)
-        samples_24_bit_pretending_to_be_32_bit = False
-        if self.SAMPLE_WIDTH == 3:  # 24-bit audio
-            try: audioop.bias(b"", self.SAMPLE_WIDTH, 0)  # test whether this sample width is supported (for example, ``audioop`` in Python 3.3 and below don't support sample width 3, while Python 3.4+ do)
-            except audioop.error:  # this version of audioop doesn't support 24-bit audio (probably Python 3.3 or less)
-                samples_24_bit_pretending_to_be_32_bit = True  # while the ``AudioFile`` instance will outwardly appear to be 32-bit, it will actually internally be 24-bit
-                self.SAMPLE_WIDTH = 4  # the ``AudioFile`` instance should present itself as a 32-bit stream now, since we'll be converting into 32-bit on the fly when reading
-
         self.SAMPLE_RATE = self.audio_reader.getframerate()
         self.CHUNK = 4096
         self.FRAME_COUNT = self.audio_reader.getnframes()
         self.DURATION = self.FRAME_COUNT / float(self.SAMPLE_RATE)
-        self.stream = AudioFile.AudioFileStream(self.audio_reader, self.little_endian, samples_24_bit_pretending_to_be_32_bit)
+        self.stream = AudioFile.AudioFileStream(self.audio_reader, self.little_endian)
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
@@ -290,10 +282,9 @@ class AudioFile(AudioSource):
         self.DURATION = None
 
     class AudioFileStream(object):
-        def __init__(self, audio_reader, little_endian, samples_24_bit_pretending_to_be_32_bit):
+        def __init__(self, audio_reader, little_endian):
             self.audio_reader = audio_reader  # an audio file object (e.g., a `wave.Wave_read` instance)
             self.little_endian = little_endian  # whether the audio data is little-endian (when working with big-endian things, we'll have to convert it to little-endian before we process it)
-            self.samples_24_bit_pretending_to_be_32_bit = samples_24_bit_pretending_to_be_32_bit  # this is true if the audio is 24-bit audio, but 24-bit audio isn't supported, so we have to pretend that this is 32-bit audio and convert it on the fly
 
         def read(self, size=-1):
             buffer = self.audio_reader.readframes(self.audio_reader.getnframes() if size == -1 else size)
@@ -301,17 +292,10 @@ class AudioFile(AudioSource):
 
             sample_width = self.audio_reader.getsampwidth()
             if not self.little_endian:  # big endian format, convert to little endian on the fly
-                if hasattr(audioop, "byteswap"):  # ``audioop.byteswap`` was only added in Python 3.4 (incidentally, that also means that we don't need to worry about 24-bit audio being unsupported, since Python 3.4+ always has that functionality)
-                    buffer = audioop.byteswap(buffer, sample_width)
-                else:  # manually reverse the bytes of each sample, which is slower but works well enough as a fallback
-                    buffer = buffer[sample_width - 1::-1] + b"".join(buffer[i + sample_width:i:-1] for i in range(sample_width - 1, len(buffer), sample_width))
-
-            # workaround for https://bugs.python.org/issue12866
-            if self.samples_24_bit_pretending_to_be_32_bit:  # we need to convert samples from 24-bit to 32-bit before we can process them with ``audioop`` functions
-                buffer = b"".join(b"\x00" + buffer[i:i + sample_width] for i in range(0, len(buffer), sample_width))  # since we're in little endian, we prepend a zero byte to each 24-bit sample to get a 32-bit sample
-                sample_width = 4  # make sure we thread the buffer as 32-bit audio now, after converting it from 24-bit audio
+                buffer = dsp.byteswap(buffer, sample_width)
+
             if self.audio_reader.getnchannels() != 1:  # stereo audio
-                buffer = audioop.tomono(buffer, sample_width, 1, 1)  # convert stereo audio data to mono
+                buffer = dsp.tomono(buffer, sample_width, 1, 1)  # convert stereo audio data to mono
             return buffer
 
 
@@ -383,7 +367,7 @@ class Recognizer(AudioSource):
             elapsed_time += seconds_per_buffer
             if elapsed_time > duration: break
             buffer = source.stream.read(source.CHUNK)
-            energy = audioop.rms(buffer, source.SAMPLE_WIDTH)  # energy of the audio signal
+            energy = dsp.rms(buffer, source.SAMPLE_WIDTH)  # energy of the audio signal
 
             # dynamically adjust the energy threshold using asymmetric weighted average
             damping = self.dynamic_energy_adjustment_damping ** seconds_per_buffer  # account for different chunk sizes and rates
@@ -427,7 +411,7 @@ class Recognizer(AudioSource):
             frames.append(buffer)
 
             # resample audio to the required sample rate
-            resampled_buffer, resampling_state = audioop.ratecv(buffer, source.SAMPLE_WIDTH, 1, source.SAMPLE_RATE, snowboy_sample_rate, resampling_state)
+            resampled_buffer, resampling_state = dsp.ratecv(buffer, source.SAMPLE_WIDTH, 1, source.SAMPLE_RATE, snowboy_sample_rate, resampling_state)
             resampled_frames.append(resampled_buffer)
             if time.time() - last_check > check_interval:
                 # run Snowboy on the resampled audio
@@ -496,7 +480,7 @@ class Recognizer(AudioSource):
                         frames.popleft()
 
                     # detect whether speaking has started on audio input
-                    energy = audioop.rms(buffer, source.SAMPLE_WIDTH)  # energy of the audio signal
+                    energy = dsp.rms(buffer, source.SAMPLE_WIDTH)  # energy of the audio signal
                     if energy > self.energy_threshold: break
 
                     # dynamically adjust the energy threshold using asymmetric weighted average
@@ -533,7 +517,7 @@ class Recognizer(AudioSource):
                 phrase_count += 1
 
                 # check if speaking has stopped for longer than the pause threshold on the audio input
-                energy = audioop.rms(buffer, source.SAMPLE_WIDTH)  # unit energy of the audio signal within the buffer
+                energy = dsp.rms(buffer, source.SAMPLE_WIDTH)  # unit energy of the audio signal within the buffer
                 if energy > self.energy_threshold:
                     pause_count = 0
                 else:
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import aifc
-import audioop
 import io
 import os
 import platform
@@ -10,6 +8,8 @@ import subprocess
 import sys
 import wave
 
+from . import dsp
+
 
 class AudioData(object):
     """
@@ -93,52 +93,28 @@ class AudioData(object):
 
         # make sure unsigned 8-bit audio (which uses unsigned samples) is handled like higher sample width audio (which uses signed samples)
         if self.sample_width == 1:
-            raw_data = audioop.bias(
+            raw_data = dsp.bias(
                 raw_data, 1, -128
             )  # subtract 128 from every sample to make them act like signed samples
 
         # resample audio at the desired rate if specified
         if convert_rate is not None and self.sample_rate != convert_rate:
-            raw_data, _ = audioop.ratecv(
+            raw_data = dsp.resample(
                 raw_data,
                 self.sample_width,
-                1,
                 self.sample_rate,
                 convert_rate,
-                None,
             )
 
         # convert samples to desired sample width if specified
         if convert_width is not None and self.sample_width != convert_width:
-            if (
-                convert_width == 3
-            ):  # we're converting the audio into 24-bit (workaround for https://bugs.python.org/issue12866)
-                raw_data = audioop.lin2lin(
-                    raw_data, self.sample_width, 4
-                )  # convert audio into 32-bit first, which is always supported
-                try:
-                    audioop.bias(
-                        b"", 3, 0
-                    )  # test whether 24-bit audio is supported (for example, ``audioop`` in Python 3.3 and below don't support sample width 3, while Python 3.4+ do)
-                except (
-                    audioop.error
-                ):  # this version of audioop doesn't support 24-bit audio (probably Python 3.3 or less)
-                    raw_data = b"".join(
-                        raw_data[i + 1: i + 4]
-                        for i in range(0, len(raw_data), 4)
-                    )  # since we're in little endian, we discard the first byte from each 32-bit sample to get a 24-bit sample
-                else:  # 24-bit audio fully supported, we don't need to shim anything
-                    raw_data = audioop.lin2lin(
-                        raw_data, self.sample_width, convert_width
-                    )
-            else:
-                raw_data = audioop.lin2lin(
-                    raw_data, self.sample_width, convert_width
-                )
+            raw_data = dsp.lin2lin(
+                raw_data, self.sample_width, convert_width
+            )
 
         # if the output is 8-bit audio with unsigned samples, convert the samples we've been treating as signed to unsigned again
         if convert_width == 1:
-            raw_data = audioop.bias(
+            raw_data = dsp.bias(
                 raw_data, 1, 128
             )  # add 128 to every sample to make them act like unsigned samples again
 
@@ -194,17 +170,10 @@ class AudioData(object):
         )
 
         # the AIFF format is big-endian, so we need to convert the little-endian raw data to big-endian
-        if hasattr(
-            audioop, "byteswap"
-        ):  # ``audioop.byteswap`` was only added in Python 3.4
-            raw_data = audioop.byteswap(raw_data, sample_width)
-        else:  # manually reverse the bytes of each sample, which is slower but works well enough as a fallback
-            raw_data = raw_data[sample_width - 1:: -1] + b"".join(
-                raw_data[i + sample_width: i: -1]
-                for i in range(sample_width - 1, len(raw_data), sample_width)
-            )
+        raw_data = dsp.byteswap(raw_data, sample_width)
 
         # generate the AIFF-C file contents
+        aifc = get_aifc()
         with io.BytesIO() as aiff_file:
             aiff_writer = aifc.open(aiff_file, "wb")
             try:  # note that we can't use context manager, since that was only added in Python 3.4
@@ -320,6 +289,17 @@ def get_flac_converter():
     return flac_converter
 
 
+def get_aifc():
+    """Returns the ``aifc`` module, needed only for AIFF audio, or raises an ImportError explaining how to get it (it is not in the standard library since Python 3.13)."""
+    try:
+        import aifc
+    except ImportError:
+        raise ImportError(
+            "AIFF audio requires the aifc module, which was removed from the standard library in Python 3.13 - consider installing it by running `pip install standard-aifc`"
+        ) from None
+    return aifc
+
+
 def shutil_which(pgm):
     """Python 2 compatibility: backport of ``shutil.which()`` from Python 3"""
     path = os.getenv("PATH")
@@ -0,0 +1,319 @@
+"""
+Audio sample operations used by the library, replacing the ``audioop`` module (deprecated in Python 3.11, removed in 3.13).
+
+The functions take and return little-endian signed PCM byte strings with ``width`` bytes per sample (1 to 4), like their ``audioop`` counterparts. When NumPy is installed they are vectorized with it; otherwise a pure-Python implementation with the same results is used (except for ``ratecv``/``resample``, which fall back to linear interpolation).
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the pure-Python versions below are used instead
+    np = None
+
+_BLOCK_SAMPLES = 1 << 16  # long buffers are reduced in blocks of this many samples, which stay in the CPU cache
+_RESAMPLE_BLOCK = 1 << 20  # filter windows (in samples) copied at a time when resampling, to bound memory use
+_ZERO_CROSSINGS = 8  # resampling filter length, in zero crossings of the low-pass filter on each side of its center
+_KAISER_BETA = 5.0
+
+
+def _check(fragment, width, channels=1):
+    if width not in (1, 2, 3, 4):
+        raise ValueError("Sample width should be 1, 2, 3 or 4")
+    if len(fragment) % (width * channels) != 0:
+        raise ValueError("Audio data is not a whole number of frames")
+
+
+def _limits(width):
+    bits = 8 * width
+    return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+
+
+# pure-Python implementations
+
+_ARRAY_TYPECODES = {1: "b", 2: "h", 4: "i" if array("i").itemsize == 4 else "l"}
+
+
+def _unpack(fragment, width):
+    """Returns the samples in ``fragment`` as a sequence of ints."""
+    if width == 3:
+        return [int.from_bytes(fragment[i:i + 3], "little", signed=True) for i in range(0, len(fragment), 3)]
+    samples = array(_ARRAY_TYPECODES[width], bytes(fragment))
+    if sys.byteorder == "big": samples.byteswap()
+    return samples
+
+
+def _pack(samples, width):
+    if width == 3:
+        return b"".join(sample.to_bytes(3, "little", signed=True) for sample in samples)
+    samples = array(_ARRAY_TYPECODES[width], samples)
+    if sys.byteorder == "big": samples.byteswap()
+    return samples.tobytes()
+
+
+def _python_rms(fragment, width):
+    _check(fragment, width)
+    samples = _unpack(fragment, width)
+    if not samples: return 0
+    return int(math.sqrt(sum(sample * sample for sample in samples) / len(samples)))
+
+
+def _python_add(fragment1, fragment2, width):
+    _check(fragment1, width)
+    if len(fragment1) != len(fragment2): raise ValueError("Lengths should be the same")
+    low, high = _limits(width)
+    return _pack([min(max(a + b, low), high) for a, b in zip(_unpack(fragment1, width), _unpack(fragment2, width))], width)
+
+
+def _python_bias(fragment, width, bias):
+    _check(fragment, width)
+    low, high = _limits(width)
+    span = 1 << (8 * width)
+    return _pack([(sample + bias - low) % span + low for sample in _unpack(fragment, width)], width)  # wraps around on overflow
+
+
+def _python_lin2lin(fragment, width, newwidth):
+    _check(fragment, width)
+    _check(b"", newwidth)
+    if width == newwidth: return bytes(fragment)
+    shift = 8 * (newwidth - width)
+    if shift > 0:
+        return _pack([sample << shift for sample in _unpack(fragment, width)], newwidth)
+    return _pack([sample >> -shift for sample in _unpack(fragment, width)], newwidth)
+
+
+def _python_byteswap(fragment, width):
+    _check(fragment, width)
+    if width == 1: return bytes(fragment)
+    return b"".join(fragment[i:i + width][::-1] for i in range(0, len(fragment), width))
+
+
+def _python_tomono(fragment, width, lfactor, rfactor):
+    _check(fragment, width, 2)
+    low, high = _limits(width)
+    samples = _unpack(fragment, width)
+    return _pack([min(max(math.floor(left * lfactor + right * rfactor), low), high) for left, right in zip(samples[0::2], samples[1::2])], width)
+
+
+def _python_ratecv(fragment, width, nchannels, inrate, outrate, state):
+    """Linear interpolation between neighbouring frames; ``state`` is ``(previous frame, position of the next output)``."""
+    _check(fragment, width, nchannels)
+    step = math.gcd(inrate, outrate)
+    up, down = outrate // step, inrate // step
+    samples = _unpack(fragment, width)
+    frames = [tuple(samples[i:i + nchannels]) for i in range(0, len(samples), nchannels)]
+    if state is None:
+        position = 0
+    else:
+        previous_frame, position = state
+        frames.insert(0, previous_frame)
+    if not frames: return b"", state
+
+    low, high = _limits(width)
+    output = []
+    while position // up + 1 < len(frames):  # positions are measured in 1/``up`` of an input frame
+        index, phase = divmod(position, up)
+        for current, following in zip(frames[index], frames[index + 1]):
+            output.append(min(max(round(current + (following - current) * phase / up), low), high))
+        position += down
+    return _pack(output, width), (frames[-1], position - (len(frames) - 1) * up)
+
+
+def _python_resample(fragment, width, inrate, outrate):
+    _check(fragment, width)
+    if not fragment: return b""
+    data, state = _python_ratecv(fragment, width, 1, inrate, outrate, None)
+    tail, _ = _python_ratecv(fragment[-width:], width, 1, inrate, outrate, state)  # repeat the last sample to emit the outputs that need one more frame
+    return (data + tail)[:_resampled_length(len(fragment) // width, inrate, outrate) * width]
+
+
+def _resampled_length(samples, inrate, outrate):
+    return -(-samples * outrate // inrate)
+
+
+# NumPy implementations
+
+def _numpy_unpack(fragment, width):
+    """Returns the samples in ``fragment`` as a NumPy array of signed integers (a read-only view when possible)."""
+    if width == 3:
+        raw = np.frombuffer(fragment, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return (samples ^ 0x800000) - 0x800000  # sign-extend the 24-bit values
+    return np.frombuffer(fragment, dtype="<i{}".format(width))
+
+
+def _numpy_pack(samples, width):
+    """Converts ``samples`` (integral values, already within range for ``width``) to bytes."""
+    if width == 3:
+        samples = samples.astype("<i4", copy=False)
+        return samples.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return samples.astype("<i{}".format(width), copy=False).tobytes()
+
+
+def _numpy_rms(fragment, width):
+    _check(fragment, width)
+    samples = _numpy_unpack(fragment, width)
+    if len(samples) == 0: return 0
+    total = 0.0
+    for start in range(0, len(samples), _BLOCK_SAMPLES):
+        block = samples[start:start + _BLOCK_SAMPLES].astype(np.float64)
+        total += float(np.dot(block, block))
+    return int(math.sqrt(total / len(samples)))
+
+
+def _numpy_add(fragment1, fragment2, width):
+    _check(fragment1, width)
+    if len(fragment1) != len(fragment2): raise ValueError("Lengths should be the same")
+    low, high = _limits(width)
+    total = _numpy_unpack(fragment1, width).astype(np.int64) + _numpy_unpack(fragment2, width)
+    return _numpy_pack(np.clip(total, low, high), width)
+
+
+def _numpy_bias(fragment, width, bias):
+    _check(fragment, width)
+    low, _ = _limits(width)
+    span = 1 << (8 * width)
+    samples = (_numpy_unpack(fragment, width).astype(np.int64) + (bias - low)) % span + low  # wraps around on overflow
+    return _numpy_pack(samples, width)
+
+
+def _numpy_lin2lin(fragment, width, newwidth):
+    _check(fragment, width)
+    _check(b"", newwidth)
+    if width == newwidth: return bytes(fragment)
+    shift = 8 * (newwidth - width)
+    samples = _numpy_unpack(fragment, width)
+    # the result always fits in 32 bits; shifting straight into it avoids an intermediate copy
+    shifted = np.left_shift(samples, shift, dtype=np.int32) if shift > 0 else np.right_shift(samples, -shift, dtype=np.int32)
+    return _numpy_pack(shifted, newwidth)
+
+
+def _numpy_byteswap(fragment, width):
+    _check(fragment, width)
+    if width == 1: return bytes(fragment)
+    if width == 3: return np.frombuffer(fragment, dtype=np.uint8).reshape(-1, 3)[:, ::-1].tobytes()
+    return np.frombuffer(fragment, dtype="<i{}".format(width)).byteswap().tobytes()
+
+
+def _numpy_tomono(fragment, width, lfactor, rfactor):
+    _check(fragment, width, 2)
+    low, high = _limits(width)
+    samples = _numpy_unpack(fragment, width).reshape(-1, 2)
+    if isinstance(lfactor, int) and isinstance(rfactor, int):  # e.g., ``tomono(fragment, width, 1, 1)``, which can stay in integers
+        wide = np.int32 if width <= 2 and abs(lfactor) + abs(rfactor) <= 0xFFFF else np.int64  # the mix cannot overflow
+        mono = np.multiply(samples[:, 0], lfactor, dtype=wide)
+        mono += np.multiply(samples[:, 1], rfactor, dtype=wide)
+    else:
+        mono = samples[:, 0] * float(lfactor)
+        mono += samples[:, 1] * float(rfactor)
+        np.floor(mono, out=mono)
+    np.clip(mono, low, high, out=mono)
+    return _numpy_pack(mono, width)
+
+
+@functools.lru_cache(maxsize=8)
+def _polyphase_filter(up, down):
+    """
+    Returns the taps of a Kaiser-windowed sinc low-pass filter for resampling by ``up / down``, as an array of shape ``(up, taps per phase)``.
+
+    Row ``p`` holds the taps applied to consecutive input frames (oldest first) for outputs that fall ``p / up`` of a frame after an input frame.
+    """
+    taps_per_phase = 2 * _ZERO_CROSSINGS * max(up, down) // up + 1
+    length = taps_per_phase * up
+    cutoff = 0.5 / max(up, down)  # in cycles per sample of the upsampled signal
+    taps = 2 * cutoff * np.sinc(2 * cutoff * (np.arange(length) - length // 2)) * np.kaiser(length, _KAISER_BETA) * up
+    return np.ascontiguousarray(taps.reshape(taps_per_phase, up).T[:, ::-1])
+
+
+def _numpy_ratecv(fragment, width, nchannels, inrate, outrate, state):
+    """Polyphase FIR resampling; ``state`` is ``(last input frames, position of the next output)``."""
+    _check(fragment, width, nchannels)
+    step = math.gcd(inrate, outrate)
+    up, down = outrate // step, inrate // step
+    filters = _polyphase_filter(up, down)
+    taps = filters.shape[1]
+
+    frames = _numpy_unpack(fragment, width).reshape(-1, nchannels).astype(np.float64)
+    if state is None:  # start with silence, and align the center of the filter with the first input frame
+        history, position = np.zeros((taps, nchannels)), taps * up + (taps * up) // 2
+    else:
+        history, position = state
+    frames = np.concatenate((history, frames))
+    count = max(0, -(-(len(frames) * up - position) // down))
+    output = np.empty((count, nchannels))
+
+    # positions are measured in 1/``up`` of an input frame; the output at ``position`` uses the ``taps`` frames ending at ``position // up``
+    for channel in range(nchannels if count else 0):
+        windows = np.lib.stride_tricks.sliding_window_view(frames[:, channel], taps)
+        for first in range(min(up, count)):  # outputs ``first``, ``first + up``, ... share a filter phase, and their windows are ``down`` frames apart
+            index, phase = divmod(position + first * down, up)
+            rows = len(range(first, count, up))
+            block = _RESAMPLE_BLOCK // taps
+            for row in range(0, rows, block):
+                start = index - taps + 1 + row * down
+                output[first + row * up::up, channel][:block] = windows[start:start + min(block, rows - row) * down:down] @ filters[phase]
+
+    keep = min(len(frames), taps - 1)
+    position += count * down - (len(frames) - keep) * up
+    low, high = _limits(width)
+    np.rint(output, out=output)
+    np.clip(output, low, high, out=output)
+    return _numpy_pack(output.reshape(-1), width), (frames[len(frames) - keep:], position)
+
+
+def _numpy_resample(fragment, width, inrate, outrate):
+    _check(fragment, width)
+    data, state = _numpy_ratecv(fragment, width, 1, inrate, outrate, None)
+    tail, _ = _numpy_ratecv(b"\x00" * (len(state[0]) + 1) * width, width, 1, inrate, outrate, state)  # flush the frames still inside the filter
+    return (data + tail)[:_resampled_length(len(fragment) // width, inrate, outrate) * width]
+
+
+# public API: the NumPy versions when available
+
+def rms(fragment, width):
+    """Returns the root-mean-square of the samples in ``fragment``, a measure of its power."""
+    return (_numpy_rms if np is not None else _python_rms)(fragment, width)
+
+
+def add(fragment1, fragment2, width):
+    """Returns the sample-by-sample sum of two fragments of the same length, clipped on overflow."""
+    return (_numpy_add if np is not None else _python_add)(fragment1, fragment2, width)
+
+
+def bias(fragment, width, bias):
+    """Returns ``fragment`` with ``bias`` added to every sample, wrapping around on overflow."""
+    return (_numpy_bias if np is not None else _python_bias)(fragment, width, bias)
+
+
+def lin2lin(fragment, width, newwidth):
+    """Returns ``fragment`` converted from ``width`` to ``newwidth`` bytes per sample."""
+    return (_numpy_lin2lin if np is not None else _python_lin2lin)(fragment, width, newwidth)
+
+
+def byteswap(fragment, width):
+    """Returns ``fragment`` with the byte order of every sample reversed (little-endian <-> big-endian)."""
+    return (_numpy_byteswap if np is not None else _python_byteswap)(fragment, width)
+
+
+def tomono(fragment, width, lfactor, rfactor):
+    """Returns the mono mix ``left * lfactor + right * rfactor`` of the interleaved stereo ``fragment``, clipped on overflow."""
+    return (_numpy_tomono if np is not None else _python_tomono)(fragment, width, lfactor, rfactor)
+
+
+def ratecv(fragment, width, nchannels, inrate, outrate, state):
+    """
+    Resamples a chunk of a stream of interleaved ``nchannels`` audio from ``inrate`` Hz to ``outrate`` Hz, returning ``(converted_fragment, new_state)``.
+
+    Pass ``None`` as ``state`` for the first chunk and the returned state for the following ones. The state is specific to the implementation in use (it is not compatible with ``audioop.ratecv``). The filter looks ahead a few frames, so the output for the end of a chunk is only returned with the next one.
+    """
+    return (_numpy_ratecv if np is not None else _python_ratecv)(fragment, width, nchannels, inrate, outrate, state)
+
+
+def resample(fragment, width, inrate, outrate):
+    """Returns the whole mono ``fragment`` resampled from ``inrate`` Hz to ``outrate`` Hz, ``ceil(len * outrate / inrate)`` samples long."""
+    return (_numpy_resample if np is not None else _python_resample)(fragment, width, inrate, outrate)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
+import threading
 from collections.abc import Sequence
+from contextlib import contextmanager
 
 from speech_recognition import PortableNamedTemporaryFile
 from speech_recognition.audio import AudioData
@@ -16,36 +18,80 @@ Keyword = str
 Sensitivity = float
 KeywordEntry = tuple[Keyword, Sensitivity]
 
+DecoderKey = tuple["str | SphinxDataFilePaths", "tuple[KeywordEntry, ...] | None", "tuple[str, float] | None"]
 
-def recognize(
-    recognizer,
-    audio_data: AudioData,
-    language: str | SphinxDataFilePaths = "en-US",
-    keyword_entries: Sequence[KeywordEntry] | None = None,
-    grammar: str | None = None,
-    show_all: bool = False,
-):
-    """
-    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using CMU Sphinx.
-
-    The recognition language is determined by ``language``, an RFC5646 language tag like ``"en-US"`` or ``"en-GB"``, defaulting to US English. Out of the box, only ``en-US`` is supported. See `Notes on using `PocketSphinx <https://github.com/Uberi/speech_recognition/blob/master/reference/pocketsphinx.rst>`__ for information about installing other languages. This document is also included under ``reference/pocketsphinx.rst``. The ``language`` parameter can also be a tuple of filesystem paths, of the form ``(acoustic_parameters_directory, language_model_file, phoneme_dictionary_file)`` - this allows you to load arbitrary Sphinx models.
-
-    If specified, the keywords to search for are determined by ``keyword_entries``, an iterable of tuples of the form ``(keyword, sensitivity)``, where ``keyword`` is a phrase, and ``sensitivity`` is how sensitive to this phrase the recognizer should be, on a scale of 0 (very insensitive, more false negatives) to 1 (very sensitive, more false positives) inclusive. If not specified or ``None``, no keywords are used and Sphinx will simply transcribe whatever words it recognizes. Specifying ``keyword_entries`` is more accurate than just looking for those same keywords in non-keyword-based transcriptions, because Sphinx knows specifically what sounds to look for.
+#: maximum number of decoders kept per configuration; more concurrent callers wait for a free one
+DEFAULT_POOL_SIZE = max(1, min(4, os.cpu_count() or 1))
 
-    Sphinx can also handle FSG or JSGF grammars. The parameter ``grammar`` expects a path to the grammar file. Note that if a JSGF grammar is passed, an FSG grammar will be created at the same location to speed up execution in the next run. If ``keyword_entries`` are passed, content of ``grammar`` will be ignored.
-
-    Returns the most likely transcription if ``show_all`` is false (the default). Otherwise, returns the Sphinx ``pocketsphinx.pocketsphinx.Decoder`` object resulting from the recognition.
 
-    Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if there are any issues with the Sphinx installation.
+class DecoderPool(object):
     """
-    # TODO Move this validation into KeywordEntry initialization
-    assert keyword_entries is None or all(isinstance(keyword, (type(""), type(u""))) and 0 <= sensitivity <= 1 for keyword, sensitivity in keyword_entries), "``keyword_entries`` must be ``None`` or a list of pairs of strings and numbers between 0 and 1"
-
-    try:
-        from pocketsphinx import FsgModel, Jsgf, pocketsphinx
-    except ImportError:
-        raise RequestError("missing PocketSphinx module: ensure that PocketSphinx is set up correctly.")
+    Thread-safe pool of PocketSphinx decoders that all share the same configuration (model paths, keyword set and grammar).
 
+    Decoders are created lazily by ``factory`` the first time they are needed and reused afterwards, so the cost of loading the acoustic model, language model, dictionary and searches is only paid once per decoder. At most ``max_size`` decoders are created; when all of them are busy, ``acquire`` blocks until one is released.
+    """
+    def __init__(self, factory, max_size=DEFAULT_POOL_SIZE):
+        assert max_size >= 1, "``max_size`` must be at least 1"
+        self.factory = factory
+        self.max_size = max_size
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def acquire(self):
+        decoder = self.take()
+        try:
+            yield decoder
+        except BaseException:
+            self.discard(decoder)  # the decoder may be mid-utterance, so don't hand it out again
+            raise
+        else:
+            self.release(decoder)
+
+    def take(self):
+        """Returns an idle decoder, creating one if the pool isn't full yet. Must be paired with ``release`` or ``discard``."""
+        with self._condition:
+            while not self._idle and self._created >= self.max_size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self.factory()  # created outside the lock so other configurations/callers aren't blocked on model loading
+        except BaseException:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, decoder):
+        with self._condition:
+            self._idle.append(decoder)
+            self._condition.notify()
+
+    def discard(self, decoder):
+        """Forgets about ``decoder`` (for example, because the caller kept it), so a new one can be created in its place."""
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    @property
+    def size(self):
+        return self._created
+
+
+_decoder_pools: dict[DecoderKey, DecoderPool] = {}
+_decoder_pools_lock = threading.Lock()
+
+
+def clear_decoder_cache():
+    """Drops every cached decoder, e.g. after the model files on disk have changed."""
+    with _decoder_pools_lock:
+        _decoder_pools.clear()
+
+
+def _resolve_language(language):
     if isinstance(language, str):  # directory containing language data
         language_directory = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "pocketsphinx-data", language)
         if not os.path.isdir(language_directory):
@@ -61,6 +107,13 @@ def recognize(
         raise RequestError("missing PocketSphinx language model file: \"{}\"".format(language_model_file))
     if not os.path.isfile(phoneme_dictionary_file):
         raise RequestError("missing PocketSphinx phoneme dictionary file: \"{}\"".format(phoneme_dictionary_file))
+    return acoustic_parameters_directory, language_model_file, phoneme_dictionary_file
+
+
+def _create_decoder(paths, keyword_entries, grammar):
+    from pocketsphinx import FsgModel, Jsgf, pocketsphinx
+
+    acoustic_parameters_directory, language_model_file, phoneme_dictionary_file = paths
 
     # create decoder object
     config = pocketsphinx.Config()
@@ -70,22 +123,16 @@ def recognize(
     config.set_string("-logfn", os.devnull)  # disable logging (logging causes unwanted output in terminal)
     decoder = pocketsphinx.Decoder(config)
 
-    # obtain audio data
-    raw_data = audio_data.get_raw_data(convert_rate=16000, convert_width=2)  # the included language models require audio to be 16-bit mono 16 kHz in little-endian format
-
-    # obtain recognition results
     if keyword_entries is not None:  # explicitly specified set of keywords
         with PortableNamedTemporaryFile("w") as f:
             # generate a keywords file - Sphinx documentation recommendeds sensitivities between 1e-50 and 1e-5
             f.writelines("{} /1e{}/\n".format(keyword, 100 * sensitivity - 110) for keyword, sensitivity in keyword_entries)
             f.flush()
 
-            # perform the speech recognition with the keywords file (this is inside the context manager so the file isn;t deleted until we're done)
+            # load the keywords file (this is inside the context manager so the file isn't deleted until it has been read)
             decoder.add_kws("keywords", f.name)
             decoder.activate_search("keywords")
     elif grammar is not None:  # a path to a FSG or JSGF grammar
-        if not os.path.exists(grammar):
-            raise ValueError("Grammar '{0}' does not exist.".format(grammar))
         grammar_path = os.path.abspath(os.path.dirname(grammar))
         grammar_name = os.path.splitext(os.path.basename(grammar))[0]
         fsg_path = "{0}/{1}.fsg".format(grammar_path, grammar_name)
@@ -99,13 +146,102 @@ def recognize(
         decoder.set_fsg(grammar_name, fsg)
         decoder.set_search(grammar_name)
 
-    decoder.start_utt()  # begin utterance processing
-    decoder.process_raw(raw_data, False, True)  # process audio data with recognition enabled (no_search = False), as a full utterance (full_utt = True)
-    decoder.end_utt()  # stop utterance processing
+    return decoder
 
-    if show_all: return decoder
 
-    # return results
+def _evict_stale_grammar_pools(language_key, keywords, grammar):
+    """Drops the pools for older versions of ``grammar`` and for grammar files that no longer exist. Must be called with ``_decoder_pools_lock`` held."""
+    for key in list(_decoder_pools):
+        pool_language, pool_keywords, pool_grammar = key
+        if pool_language != language_key or pool_keywords != keywords or pool_grammar is None:
+            continue
+        if pool_grammar[0] == grammar or not os.path.exists(pool_grammar[0]):
+            del _decoder_pools[key]  # decoders still checked out stay usable, they just aren't returned to a shared pool any more
+
+
+def get_decoder_pool(
+    language: str | SphinxDataFilePaths = "en-US",
+    keyword_entries: Sequence[KeywordEntry] | None = None,
+    grammar: str | None = None,
+    max_size: int = DEFAULT_POOL_SIZE,
+) -> DecoderPool:
+    """
+    Returns the shared ``DecoderPool`` for the given ``language``, ``keyword_entries`` and ``grammar`` (see :py:func:`recognize` for their meaning), creating it if needed.
+
+    Model paths are only validated the first time a configuration is seen. A grammar is keyed by its path and modification time, so editing the grammar file results in new decoders; the pool for the previous version (and for grammar files that have since been deleted) is dropped at that point.
+    """
+    keywords = tuple((keyword, float(sensitivity)) for keyword, sensitivity in keyword_entries) if keyword_entries is not None else None
+    grammar_key = None
+    if keywords is None and grammar is not None:  # keywords take precedence, so the grammar doesn't matter if there are any
+        if not os.path.exists(grammar):
+            raise ValueError("Grammar '{0}' does not exist.".format(grammar))
+        grammar = os.path.abspath(grammar)
+        grammar_key = (grammar, os.path.getmtime(grammar))
+    language_key = language if isinstance(language, str) else tuple(language)
+    key = (language_key, keywords, grammar_key)
+
+    with _decoder_pools_lock:
+        pool = _decoder_pools.get(key)
+        if pool is None:
+            if grammar_key is not None:
+                _evict_stale_grammar_pools(language_key, keywords, grammar_key[0])
+            paths = _resolve_language(language)
+            pool = DecoderPool(lambda: _create_decoder(paths, keywords, grammar_key[0] if grammar_key else None), max_size)
+            _decoder_pools[key] = pool
+    return pool
+
+
+def recognize(
+    recognizer,
+    audio_data: AudioData,
+    language: str | SphinxDataFilePaths = "en-US",
+    keyword_entries: Sequence[KeywordEntry] | None = None,
+    grammar: str | None = None,
+    show_all: bool = False,
+):
+    """
+    Performs speech recognition on ``audio_data`` (an ``AudioData`` instance), using CMU Sphinx.
+
+    The recognition language is determined by ``language``, an RFC5646 language tag like ``"en-US"`` or ``"en-GB"``, defaulting to US English. Out of the box, only ``en-US`` is supported. See `Notes on using `PocketSphinx <https://github.com/Uberi/speech_recognition/blob/master/reference/pocketsphinx.rst>`__ for information about installing other languages. This document is also included under ``reference/pocketsphinx.rst``. The ``language`` parameter can also be a tuple of filesystem paths, of the form ``(acoustic_parameters_directory, language_model_file, phoneme_dictionary_file)`` - this allows you to load arbitrary Sphinx models.
+
+    If specified, the keywords to search for are determined by ``keyword_entries``, an iterable of tuples of the form ``(keyword, sensitivity)``, where ``keyword`` is a phrase, and ``sensitivity`` is how sensitive to this phrase the recognizer should be, on a scale of 0 (very insensitive, more false negatives) to 1 (very sensitive, more false positives) inclusive. If not specified or ``None``, no keywords are used and Sphinx will simply transcribe whatever words it recognizes. Specifying ``keyword_entries`` is more accurate than just looking for those same keywords in non-keyword-based transcriptions, because Sphinx knows specifically what sounds to look for.
+
+    Sphinx can also handle FSG or JSGF grammars. The parameter ``grammar`` expects a path to the grammar file. Note that if a JSGF grammar is passed, an FSG grammar will be created at the same location to speed up execution in the next run. If ``keyword_entries`` are passed, content of ``grammar`` will be ignored.
+
+    Returns the most likely transcription if ``show_all`` is false (the default). Otherwise, returns the Sphinx ``pocketsphinx.pocketsphinx.Decoder`` object resulting from the recognition.
+
+    Raises a ``speech_recognition.UnknownValueError`` exception if the speech is unintelligible. Raises a ``speech_recognition.RequestError`` exception if there are any issues with the Sphinx installation.
+    """
+    # TODO Move this validation into KeywordEntry initialization
+    assert keyword_entries is None or all(isinstance(keyword, (type(""), type(u""))) and 0 <= sensitivity <= 1 for keyword, sensitivity in keyword_entries), "``keyword_entries`` must be ``None`` or a list of pairs of strings and numbers between 0 and 1"
+
+    try:
+        from pocketsphinx import FsgModel, Jsgf, pocketsphinx  # noqa: F401
+    except ImportError:
+        raise RequestError("missing PocketSphinx module: ensure that PocketSphinx is set up correctly.")
+
+    pool = get_decoder_pool(language, keyword_entries, grammar)
+
+    # obtain audio data
+    raw_data = audio_data.get_raw_data(convert_rate=16000, convert_width=2)  # the included language models require audio to be 16-bit mono 16 kHz in little-endian format
+
+    # obtain recognition results
+    decoder = pool.take()
+    try:
+        decoder.start_utt()  # begin utterance processing
+        decoder.process_raw(raw_data, False, True)  # process audio data with recognition enabled (no_search = False), as a full utterance (full_utt = True)
+        decoder.end_utt()  # stop utterance processing
+    except BaseException:
+        pool.discard(decoder)
+        raise
+
+    if show_all:
+        pool.discard(decoder)  # the caller keeps this decoder, so it must not be handed out again
+        return decoder
+
     hypothesis = decoder.hyp()
+    pool.release(decoder)
+
+    # return results
     if hypothesis is not None: return hypothesis.hypstr
     raise UnknownValueError()  # no transcriptions available
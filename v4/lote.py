@@ -0,0 +1,169 @@
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from calculadora_texto import CalculadoraTexto
+from gramatica_operaciones import PALABRAS_CLAVE, REF
+
+
+# Palabras que el tokenizador convierte en referencia al resultado anterior
+PATRON_REFERENCIA = re.compile(
+    r'\b(?:' + '|'.join(sorted(p for p, (tipo, _) in PALABRAS_CLAVE.items() if tipo == REF)) + r')\b',
+    re.IGNORECASE)
+
+# Con menos líneas que esto no compensa arrancar procesos
+MINIMO_PARA_PROCESOS = 2000
+
+_calculadora = None
+
+
+def calculadora_proceso():
+    """Una calculadora por proceso, para aprovechar su caché de expresiones"""
+    global _calculadora
+    if _calculadora is None:
+        _calculadora = CalculadoraTexto()
+    return _calculadora
+
+
+def depende_de_anterior(linea):
+    return PATRON_REFERENCIA.search(linea) is not None
+
+
+def evaluar_linea(calc, numero, linea, ultimo_resultado):
+    """Evalúa una línea; devuelve el registro JSONL"""
+    inicio = time.perf_counter()
+    normalizado = calc.normalizar(linea)
+    resultado, tipo, error = calc.calcular(linea, ultimo_resultado)
+    return {
+        'linea': numero,
+        'entrada': linea,
+        'normalizado': normalizado,
+        'resultado': resultado,
+        'tipo': tipo,
+        'error': error,
+        'ms': round((time.perf_counter() - inicio) * 1000, 4),
+    }
+
+
+def agrupar_cadenas(lineas):
+    """Parte las líneas en cadenas: una línea independiente seguida de las que usan su resultado.
+
+    Cada cadena es (valor inicial, [(número, línea), ...]); el valor inicial solo
+    se conoce (0) para las líneas dependientes del principio del lote.
+    """
+    cadenas = []
+    actual = None
+    for numero, linea in enumerate(lineas, 1):
+        if actual is None or not depende_de_anterior(linea):
+            actual = (0 if actual is None and depende_de_anterior(linea) else None, [])
+            cadenas.append(actual)
+        actual[1].append((numero, linea))
+    return cadenas
+
+
+def evaluar_cadenas(cadenas):
+    """Trabajo de un proceso: evalúa cadenas en orden.
+
+    Si la línea que abre una cadena falla, sus dependientes no saben de qué
+    resultado partir: se devuelven como None y se resuelven después en orden.
+    Devuelve por cadena (registros, último resultado o None si no hubo ninguno).
+    """
+    calc = calculadora_proceso()
+    salida = []
+    for inicial, lineas in cadenas:
+        ultimo = inicial
+        ultimo_propio = None  # último resultado obtenido dentro de la cadena
+        registros = []
+        for numero, linea in lineas:
+            if ultimo is None and depende_de_anterior(linea):
+                registros.append(None)
+                continue
+            registro = evaluar_linea(calc, numero, linea, ultimo or 0)
+            if registro['error'] is None:
+                ultimo = ultimo_propio = registro['resultado']
+            registros.append(registro)
+        salida.append((registros, ultimo_propio))
+    return salida
+
+
+def bloques(cadenas, lineas_por_bloque):
+    bloque, tamano = [], 0
+    for cadena in cadenas:
+        bloque.append(cadena)
+        tamano += len(cadena[1])
+        if tamano >= lineas_por_bloque:
+            yield bloque
+            bloque, tamano = [], 0
+    if bloque:
+        yield bloque
+
+
+def procesos_para(lineas, procesos=None):
+    """Número de procesos que se usarán para el lote (1 = en este proceso)"""
+    if len(lineas) < MINIMO_PARA_PROCESOS:
+        return 1
+    return procesos or os.cpu_count() or 1
+
+
+def evaluar_lote(lineas, procesos=None, lineas_por_bloque=500):
+    """Evalúa todas las líneas y devuelve los registros en el orden de entrada"""
+    cadenas = agrupar_cadenas(lineas)
+    procesos = procesos_para(lineas, procesos)
+
+    if procesos == 1:
+        resultados = evaluar_cadenas(cadenas)
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = []
+            for parte in pool.map(evaluar_cadenas, bloques(cadenas, lineas_por_bloque)):
+                resultados.extend(parte)
+
+    # Pasada en orden: propagar el último resultado entre cadenas y completar las pendientes
+    calc = calculadora_proceso()
+    registros = []
+    ultimo = 0
+    for (_, lineas_cadena), (registros_cadena, ultimo_cadena) in zip(cadenas, resultados):
+        if any(registro is None for registro in registros_cadena):
+            for (numero, linea), registro in zip(lineas_cadena, registros_cadena):
+                if registro is None:
+                    registro = evaluar_linea(calc, numero, linea, ultimo)
+                if registro['error'] is None:
+                    ultimo = registro['resultado']
+                registros.append(registro)
+        else:
+            registros.extend(registros_cadena)
+            if ultimo_cadena is not None:
+                ultimo = ultimo_cadena
+    return registros
+
+
+def leer_lineas(origen):
+    """Líneas no vacías de un archivo o de stdin ('-')"""
+    if origen == '-':
+        return [linea.strip() for linea in sys.stdin if linea.strip()]
+    with open(origen, 'r', encoding='utf-8') as f:
+        return [linea.strip() for linea in f if linea.strip()]
+
+
+def ejecutar_lote(origen='-', destino=None, procesos=None):
+    """CLI de --lote: escribe un JSON por línea y un resumen por stderr"""
+    inicio = time.perf_counter()
+    lineas = leer_lineas(origen)
+    registros = evaluar_lote(lineas, procesos=procesos)
+
+    salida = open(destino, 'w', encoding='utf-8') if destino else sys.stdout
+    try:
+        for registro in registros:
+            salida.write(json.dumps(registro, ensure_ascii=False) + '\n')
+    finally:
+        if destino:
+            salida.close()
+
+    errores = sum(1 for registro in registros if registro['error'])
+    duracion = time.perf_counter() - inicio
+    print(f"📊 {len(registros)} líneas, {len(registros) - errores} correctas, {errores} con error "
+          f"en {duracion:.2f} s ({len(registros) / duracion if duracion else 0:,.0f} líneas/s, "
+          f"{procesos_para(lineas, procesos)} procesos)", file=sys.stderr)
@@ -1,23 +1,61 @@
-import speech_recognition as sr
-import pyttsx3
 import re
-import math
 import threading
 import time
 import json
 import os
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import queue
 import sys
+import atexit
+
+# speech_recognition, pyttsx3 y los módulos que dependen de ellos se importan
+# cuando se necesitan: "--ayuda" o "--comando '5+3'" no cargan audio
+from modelo_vosk import GestorModeloVosk
+from numeros_texto import convertir_numeros_texto
+from perfil_arranque import PerfilArranque
+from calculadora_texto import CalculadoraTexto, frases_consulta_historial
+from cache_capacidades import CacheCapacidades
+from diario_historial import DiarioHistorial, leer_cola
+from cola_voz import ColaVoz
+from cache_frases import CacheFrases, FRASES_FIJAS
+from lectura_numeros import LecturaConcatenada
+
+INICIO_ARRANQUE = time.perf_counter()
+
+def abrir_historial(config):
+    """Historial en disco según la configuración; devuelve (diario, consultas).
+    
+    Cada operación se guarda desde un hilo aparte, en SQLite (que además
+    responde las consultas por voz) o en el diario JSONL.
+    """
+    diario = consultas = None
+    if config['guardar_historial'] and config['historial_sqlite']:
+        from historial_sqlite import HistorialSQLite
+        diario = consultas = HistorialSQLite(verboso=config['modo_verboso']).iniciar()
+    elif config['guardar_historial'] and config['diario_historial']:
+        diario = DiarioHistorial(verboso=config['modo_verboso']).iniciar()
+    if diario is not None:
+        atexit.register(diario.cerrar)
+    return diario, consultas
+
 
 class CalculadoraVozOffline:
-    def __init__(self):
+    def __init__(self, usar_microfono=True, perfil=None):
+        self.perfil = perfil or PerfilArranque(INICIO_ARRANQUE)
+        self.usar_microfono = usar_microfono
+        
         # Configuración inicial
-        self.config = self.cargar_configuracion()
+        with self.perfil.fase('configuración'):
+            self.config = self.cargar_configuracion()
+        
+        self.diario, consultas = abrir_historial(self.config)
+        
+        # Núcleo sin audio: último resultado, historial y operaciones
+        self.nucleo = CalculadoraTexto(precision_decimales=self.config['precision_decimales'],
+                                       decir=self.hablar, diario=self.diario, consultas=consultas)
         
         # Variables de estado
-        self.ultimo_resultado = 0
-        self.historial = []
         self.modo_continuo = False
         self.pausado = False
         self.modo_offline = True
@@ -25,19 +63,70 @@ class CalculadoraVozOffline:
         # Cola para manejo de comandos
         self.cola_comandos = queue.Queue()
         
-        # Inicializar componentes de audio
+        # Si es una lista, hablar() guarda ahí los mensajes en lugar de decirlos (modo servidor)
+        self.salida_hablar = None
+        
+        # Audio ya sintetizado de las frases fijas; se configura al conocer el motor TTS
+        # y de las palabras con que se leen los resultados
+        self.cache_frases = None
+        self.lectura_numeros = None
+        if self.config['cache_frases']:
+            self.cache_frases = CacheFrases(verboso=self.config['modo_verboso'])
+            if self.config['lectura_concatenada']:
+                self.lectura_numeros = LecturaConcatenada(self.cache_frases)
+        
+        # Hilo de voz: hablar() encola y vuelve; el motor TTS solo se usa desde ese hilo.
+        # Lo que se reproduce de audio guardado no se une a otras frases
+        self.voz = ColaVoz(self.sintetizar, verboso=self.config['modo_verboso'], unible=self.frase_sintetizable)
+        # Proceso de espeak/festival que queda abierto entre frases (lo crea inicializar_tts)
+        self.proceso_tts = None
+        atexit.register(self.cerrar_voz)
+        
+        # Reconocimiento (sin micrófono no hace falta ninguno)
+        self.recognizer = None
+        self.microphone = None
+        self.captura = None
+        self.modelos_disponibles = []
+        # Ruta de la gramática JSGF que restringe Sphinx al vocabulario de la calculadora
+        self.gramatica_sphinx = None
+        self.gramatica_sphinx_preparada = False
+        
+        # Modelo Vosk: se carga una sola vez y queda residente
+        self.gestor_vosk = GestorModeloVosk(verboso=self.config['modo_verboso'])
+        
+        # Capacidades descubiertas en arranques anteriores (TTS, voz, micrófono, modelos)
+        self.capacidades = CacheCapacidades(verboso=self.config['modo_verboso'])
+        if self.config['cache_capacidades']:
+            with self.perfil.fase('caché de capacidades'):
+                self.capacidades.cargar()
+        
+        # Inicializar componentes de audio y verificar modelos offline disponibles
         self.inicializar_audio()
+        self.configurar_cache_frases()
+        if self.config['cache_capacidades']:
+            self.capacidades.guardar()
         
         # Patrones de operaciones
-        self.inicializar_patrones()
+        with self.perfil.fase('patrones'):
+            self.inicializar_patrones()
         
         # Palabras de activación para modo manos libres
         self.palabras_activacion = ['calculadora', 'oye calculadora', 'hey calculadora']
-        
-        # Verificar modelos offline disponibles
-        self.verificar_modelos_offline()
     
-    def cargar_configuracion(self):
+    @property
+    def ultimo_resultado(self):
+        return self.nucleo.ultimo_resultado
+    
+    @ultimo_resultado.setter
+    def ultimo_resultado(self, valor):
+        self.nucleo.ultimo_resultado = valor
+    
+    @property
+    def historial(self):
+        return self.nucleo.historial
+    
+    @staticmethod
+    def cargar_configuracion():
         """Carga configuración desde archivo JSON"""
         config_default = {
             'velocidad_voz': 180,
@@ -51,7 +140,15 @@ class CalculadoraVozOffline:
             'modo_offline_preferido': True,
             'motor_tts': 'pyttsx3',  # pyttsx3, espeak, festival
             'voz_seleccionada': 'auto',
-            'usar_reconocimiento_offline': True
+            'usar_reconocimiento_offline': True,
+            'reconocimiento_streaming': True,
+            'captura_continua': True,
+            'cache_capacidades': True,
+            'diario_historial': True,
+            'historial_sqlite': False,
+            'cache_frases': True,
+            'lectura_concatenada': True,
+            'gramatica_sphinx': True
         }
         
         try:
@@ -64,62 +161,189 @@ class CalculadoraVozOffline:
         
         return config_default
     
-    def verificar_modelos_offline(self):
-        """Verifica qué modelos de reconocimiento offline están disponibles"""
-        self.modelos_disponibles = []
+    def verificar_modelos_offline(self, pool=None):
+        """Verifica qué modelos de reconocimiento offline están disponibles.
+        
+        Con un pool de hilos, Sphinx y Vosk se comprueban a la vez.
+        """
+        if self.modelos_desde_cache():
+            return
+        
+        verificaciones = [('sphinx', self.verificar_sphinx), ('vosk', self.verificar_vosk)]
+        if pool is not None:
+            pendientes = [(nombre, pool.submit(funcion)) for nombre, funcion in verificaciones]
+            resultados = [(nombre, futuro.result()) for nombre, futuro in pendientes]
+        else:
+            resultados = [(nombre, funcion()) for nombre, funcion in verificaciones]
+        
+        # Se mantiene el orden de preferencia aunque terminen en otro orden
+        self.modelos_disponibles = [nombre for nombre, disponible in resultados if disponible]
+        self.capacidades.guardar_seccion('modelos', self.modelos_disponibles)
+        
+        if not self.modelos_disponibles:
+            print("⚠️  Sin modelos offline. Usando modo híbrido (online cuando sea posible)")
+            self.modo_offline = False
+    
+    def modelos_desde_cache(self):
+        """Usa la lista de modelos guardada tras una comprobación barata de cada uno.
+        
+        Si alguno ya no está, se descarta la caché y se sondea todo de nuevo.
+        """
+        modelos = self.capacidades.obtener('modelos')
+        if modelos is None:
+            return False
         
-        # Verificar PocketSphinx
+        import importlib.util
+        for modelo in modelos:
+            if importlib.util.find_spec('pocketsphinx' if modelo == 'sphinx' else modelo) is None:
+                self.capacidades.invalidar('modelos')
+                return False
+            if modelo == 'vosk' and not self.gestor_vosk.disponible():
+                self.capacidades.invalidar('modelos')
+                return False
+        
+        self.modelos_disponibles = list(modelos)
+        if not self.modelos_disponibles:
+            print("⚠️  Sin modelos offline. Usando modo híbrido (online cuando sea posible)")
+            self.modo_offline = False
+            return True
+        
+        print(f"✅ Modelos offline (caché): {', '.join(self.modelos_disponibles)}")
+        if 'vosk' in self.modelos_disponibles:
+            self.gestor_vosk.precargar(self.recognizer)
+        if 'sphinx' in self.modelos_disponibles:
+            # El decodificador se crea en segundo plano; si falla, se quita Sphinx
+            threading.Thread(target=self.precalentar_sphinx, daemon=True).start()
+        return True
+    
+    def precalentar_sphinx(self):
+        """Deja un decodificador de Sphinx en el pool validando de paso la caché"""
         try:
-            # Intentar importar y verificar si funciona
-            import speech_recognition as sr
-            r = sr.Recognizer()
-            # Crear un audio de prueba muy corto
-            test_audio = sr.AudioData(b'\x00' * 3200, 16000, 2)
+            self.probar_sphinx()
+        except Exception as e:
+            print(f"⚠️  PocketSphinx ya no funciona ({e}); se quita de los modelos offline")
+            self.modelos_disponibles = [m for m in self.modelos_disponibles if m != 'sphinx']
+            self.capacidades.invalidar('modelos')
+            if self.config['cache_capacidades']:
+                self.capacidades.guardar()
+    
+    def verificar_sphinx(self):
+        """Comprueba PocketSphinx decodificando un trozo de silencio"""
+        with self.perfil.fase('verificar sphinx'):
             try:
-                r.recognize_sphinx(test_audio)
-                self.modelos_disponibles.append('sphinx')
-                print("✅ PocketSphinx disponible para reconocimiento offline")
-            except sr.UnknownValueError:
-                # Esto es esperado con audio vacío, significa que funciona
-                self.modelos_disponibles.append('sphinx')
+                # Intentar importar y verificar si funciona
+                import speech_recognition as sr
+                try:
+                    self.probar_sphinx()
+                except Exception:
+                    print("⚠️  PocketSphinx no está completamente configurado")
+                    return False
                 print("✅ PocketSphinx disponible para reconocimiento offline")
-            except Exception:
-                print("⚠️  PocketSphinx no está completamente configurado")
-        except ImportError:
-            print("📦 PocketSphinx no instalado. Instalar con: pip install pocketsphinx")
+                return True
+            except ImportError:
+                print("📦 PocketSphinx no instalado. Instalar con: pip install pocketsphinx")
+                return False
+    
+    def probar_sphinx(self):
+        """Decodifica un trozo de silencio con la misma configuración que escuchar_offline.
         
-        # Verificar Vosk (si está disponible)
+        Así el decodificador (con la gramática ya compilada) queda creado en el pool.
+        Si la gramática no compila, se sigue con el modelo general.
+        """
+        import speech_recognition as sr
+        self.preparar_gramatica_sphinx()
+        audio = sr.AudioData(b'\x00' * 3200, 16000, 2)
         try:
-            import vosk
-            self.modelos_disponibles.append('vosk')
+            sr.Recognizer().recognize_sphinx(audio, language='es-ES', grammar=self.gramatica_sphinx)
+        except sr.UnknownValueError:
+            # Esto es esperado con audio vacío, significa que funciona
+            pass
+        except sr.RequestError:
+            # Falta PocketSphinx o el modelo: no es cosa de la gramática
+            raise
+        except Exception as e:
+            if self.gramatica_sphinx is None:
+                raise
+            print(f"⚠️  Gramática de Sphinx no válida ({e}); se usa el modelo general")
+            self.usar_gramatica_sphinx(None)
+            self.probar_sphinx()
+    
+    def preparar_gramatica_sphinx(self):
+        """Genera (una vez) la gramática con las operaciones, los comandos y las consultas del historial"""
+        if not self.config['gramatica_sphinx'] or self.gramatica_sphinx_preparada:
+            return
+        self.gramatica_sphinx_preparada = True
+        from gramatica_sphinx import crear_gramatica
+        palabras_clave = list(self.comandos_especiales()) + [palabras for palabras, _ in self.nucleo.comandos]
+        comandos = [palabra for palabras in palabras_clave for palabra in palabras]
+        comandos += frases_consulta_historial()
+        self.usar_gramatica_sphinx(crear_gramatica(comandos, verboso=self.config['modo_verboso']))
+    
+    def usar_gramatica_sphinx(self, ruta):
+        self.gramatica_sphinx = ruta
+        self.reconocedor_streaming.grammar_sphinx = ruta
+    
+    def verificar_vosk(self):
+        """Comprueba Vosk y su modelo en español (si está disponible)"""
+        with self.perfil.fase('verificar vosk'):
+            try:
+                import vosk
+            except ImportError:
+                print("📦 Vosk no instalado. Instalar con: pip install vosk")
+                return False
+            if not self.gestor_vosk.disponible():
+                print("⚠️  Vosk instalado pero sin modelo en español")
+                return False
             print("✅ Vosk disponible para reconocimiento offline")
-        except ImportError:
-            print("📦 Vosk no instalado. Instalar con: pip install vosk")
-        
-        if not self.modelos_disponibles:
-            print("⚠️  Sin modelos offline. Usando modo híbrido (online cuando sea posible)")
-            self.modo_offline = False
+            # Cargar el modelo en segundo plano y compartirlo con recognize_vosk
+            self.gestor_vosk.precargar(self.recognizer)
+            return True
     
     def inicializar_audio(self):
         """Inicializa los componentes de audio con múltiples opciones TTS"""
         print("🔧 Configurando sistema de audio offline...")
         
-        # Configurar síntesis de voz con múltiples motores
-        self.inicializar_tts()
+        if not self.usar_microfono:
+            with self.perfil.fase('tts'):
+                self.inicializar_tts()
+            return
         
-        # Configurar reconocimiento de voz
-        try:
-            self.recognizer = sr.Recognizer()
-            self.recognizer.energy_threshold = 4000
-            self.recognizer.dynamic_energy_threshold = True
-            self.recognizer.pause_threshold = 0.5
+        with self.perfil.fase('import speech_recognition'):
+            import speech_recognition as sr
+            from reconocimiento_streaming import ReconocedorStreaming
+            from reconocimiento_concurrente import OrquestadorReconocimiento
+        
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 4000
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 0.5
+        self.reconocedor_streaming = ReconocedorStreaming(
+            self.recognizer, self.gestor_vosk, idioma_sphinx='es-ES',
+            aceptar=self.es_orden_valida, verboso=self.config['modo_verboso'])
+        # Frase ya grabada: todos los motores offline a la vez, gana la primera orden válida
+        self.orquestador = OrquestadorReconocimiento(
+            [('sphinx', self.reconocer_con_sphinx), ('vosk', self.reconocer_con_vosk)],
+            aceptar=self.es_orden_valida, verboso=self.config['modo_verboso'])
+        
+        # Micrófono y modelos offline se comprueban en paralelo mientras el hilo
+        # principal prepara el TTS (algunos drivers de pyttsx3 lo necesitan)
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix='arranque') as pool:
+            microfono = pool.submit(self.inicializar_microfono)
+            modelos = pool.submit(self.verificar_modelos_offline, pool)
             
-            self.inicializar_microfono()
-            print("✅ Sistema de reconocimiento configurado")
+            # Configurar síntesis de voz con múltiples motores
+            with self.perfil.fase('tts'):
+                self.inicializar_tts()
             
-        except Exception as e:
-            print(f"❌ Error configurando reconocimiento: {e}")
-            raise
+            # Configurar reconocimiento de voz
+            try:
+                microfono.result()
+                print("✅ Sistema de reconocimiento configurado")
+            except Exception as e:
+                print(f"❌ Error configurando reconocimiento: {e}")
+                raise
+            finally:
+                modelos.result()
     
     def inicializar_tts(self):
         """Inicializa el motor TTS con múltiples opciones"""
@@ -135,6 +359,20 @@ class CalculadoraVozOffline:
         
         motor_preferido = self.config.get('motor_tts', 'pyttsx3')
         
+        # Motor que funcionó en el arranque anterior con la misma preferencia
+        cache_tts = self.capacidades.obtener('tts')
+        if cache_tts and cache_tts.get('preferido') == motor_preferido:
+            nombre = cache_tts.get('motor')
+            if nombre is None:
+                print("⚠️  Sin motor TTS disponible. Usando solo texto.")
+                return
+            init_func = dict(motores_tts).get(nombre)
+            if init_func and init_func():
+                self.motor_tts_actual = nombre
+                print(f"✅ Motor TTS: {nombre} (caché)")
+                return
+            self.capacidades.invalidar('tts')
+        
         # Intentar primero el motor preferido
         for nombre, init_func in motores_tts:
             if nombre == motor_preferido:
@@ -154,16 +392,22 @@ class CalculadoraVozOffline:
         
         if not self.tts_engine:
             print("⚠️  Sin motor TTS disponible. Usando solo texto.")
+        
+        self.capacidades.guardar_seccion('tts', {'preferido': motor_preferido, 'motor': self.motor_tts_actual})
     
     def init_pyttsx3(self):
         """Inicializa pyttsx3"""
         try:
+            with self.perfil.fase('import pyttsx3'):
+                import pyttsx3
             engine = pyttsx3.init()
             
-            # Configurar voz
-            voices = engine.getProperty('voices')
-            if voices:
-                self.configurar_voz_pyttsx3(engine, voices)
+            # Configurar voz (sin enumerar las voces si ya se resolvió antes)
+            if not self.voz_desde_cache(engine):
+                voices = engine.getProperty('voices')
+                voz_id = self.configurar_voz_pyttsx3(engine, voices) if voices else None
+                self.capacidades.guardar_seccion(
+                    'voz', {'config': self.config.get('voz_seleccionada', 'auto'), 'id': voz_id})
             
             engine.setProperty('rate', self.config['velocidad_voz'])
             engine.setProperty('volume', self.config['volumen_voz'])
@@ -174,8 +418,21 @@ class CalculadoraVozOffline:
             print(f"⚠️  pyttsx3 no disponible: {e}")
             return False
     
+    def voz_desde_cache(self, engine):
+        """Aplica la voz guardada para la misma configuración; False si hay que buscarla"""
+        cache_voz = self.capacidades.obtener('voz')
+        if not cache_voz or cache_voz.get('config') != self.config.get('voz_seleccionada', 'auto'):
+            return False
+        try:
+            if cache_voz.get('id'):
+                engine.setProperty('voice', cache_voz['id'])
+            return True
+        except Exception:
+            self.capacidades.invalidar('voz')
+            return False
+    
     def configurar_voz_pyttsx3(self, engine, voices):
-        """Configura la voz para pyttsx3"""
+        """Configura la voz para pyttsx3; devuelve el id elegido (None si se deja la de serie)"""
         print("\n🎙️  VOCES DISPONIBLES:")
         voces_espanol = []
         
@@ -202,6 +459,7 @@ class CalculadoraVozOffline:
                 voz_seleccionada = voz_femenina if voz_femenina else voces_espanol[0][1]
                 engine.setProperty('voice', voz_seleccionada.id)
                 print(f"🗣️  Voz seleccionada automáticamente: {voz_seleccionada.name}")
+                return voz_seleccionada.id
         
         elif voz_config.isdigit():
             # Selección manual por número
@@ -209,51 +467,71 @@ class CalculadoraVozOffline:
             if 0 <= indice < len(voices):
                 engine.setProperty('voice', voices[indice].id)
                 print(f"🗣️  Voz seleccionada manualmente: {voices[indice].name}")
+                return voices[indice].id
+        return None
     
     def init_espeak(self):
-        """Inicializa espeak como alternativa"""
-        try:
-            import subprocess
-            # Verificar si espeak está disponible
-            result = subprocess.run(['espeak', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                self.tts_engine = 'espeak'
-                print("🗣️  Usando eSpeak para síntesis de voz")
-                return True
-        except Exception as e:
-            print(f"⚠️  eSpeak no disponible: {e}")
-        return False
+        """Inicializa espeak como alternativa: un proceso abierto que lee las frases por stdin"""
+        from proceso_tts import ProcesoEspeak
+        return self.init_proceso_tts('espeak', 'eSpeak', lambda: ProcesoEspeak(
+            velocidad=self.config['velocidad_voz'], verboso=self.config['modo_verboso']))
     
     def init_festival(self):
-        """Inicializa festival como alternativa"""
+        """Inicializa festival como alternativa: un servidor local al que se piden las frases"""
+        from proceso_tts import ProcesoFestival
+        return self.init_proceso_tts('festival', 'Festival', lambda: ProcesoFestival(
+            verboso=self.config['modo_verboso']))
+    
+    def init_proceso_tts(self, programa, nombre, crear):
+        """Arranca el co-proceso del motor; sin salida de audio propia, un proceso por frase"""
+        import shutil
+        from proceso_tts import ErrorProceso
+        if not shutil.which(programa):
+            print(f"⚠️  {nombre} no disponible: no se encontró '{programa}'")
+            return False
         try:
-            import subprocess
-            result = subprocess.run(['festival', '--version'], 
-                                  capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                self.tts_engine = 'festival'
-                print("🗣️  Usando Festival para síntesis de voz")
-                return True
-        except Exception as e:
-            print(f"⚠️  Festival no disponible: {e}")
-        return False
+            self.proceso_tts = crear().iniciar()
+        except (OSError, ErrorProceso) as e:
+            self.proceso_tts = None
+            if self.config['modo_verboso']:
+                print(f"⚠️  {nombre} sin proceso persistente ({e}): se lanzará uno por frase")
+        self.tts_engine = programa
+        print(f"🗣️  Usando {nombre} para síntesis de voz")
+        return True
     
     def inicializar_microfono(self):
         """Inicializa el micrófono"""
+        with self.perfil.fase('micrófono'):
+            self.abrir_microfono()
+    
+    def abrir_microfono(self):
+        """Busca un micrófono que funcione y arranca la captura continua"""
+        import speech_recognition as sr
+        from captura_audio import CapturaMicrofono, EstimadorRuido
+        
         mic_inicializado = False
         
-        for mic_index in [None, 0, 1, 2]:
+        # Empezar por el índice que funcionó la última vez
+        candidatos = [None, 0, 1, 2]
+        cache_mic = self.capacidades.obtener('microfono')
+        if cache_mic and cache_mic.get('indice') in candidatos:
+            candidatos.remove(cache_mic['indice'])
+            candidatos.insert(0, cache_mic['indice'])
+        
+        for mic_index in candidatos:
             try:
                 if mic_index is None:
                     self.microphone = sr.Microphone()
                 else:
                     self.microphone = sr.Microphone(device_index=mic_index)
                 
+                # Basta con leer un trozo para saber si el dispositivo funciona;
+                # la calibración del ruido se hace después, sin bloquear
                 with self.microphone as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                    source.stream.read(source.CHUNK)
                 
                 mic_inicializado = True
+                self.capacidades.guardar_seccion('microfono', {'indice': mic_index})
                 if mic_index is not None:
                     print(f"🎤 Micrófono configurado (índice: {mic_index})")
                 break
@@ -263,23 +541,125 @@ class CalculadoraVozOffline:
         
         if not mic_inicializado:
             raise Exception("No se pudo inicializar el micrófono")
+        
+        # Un solo stream abierto para toda la sesión; cada escucha lee del buffer circular
+        # El hilo de captura también sigue el ruido de fondo y mantiene energy_threshold al día
+        self.captura = None
+        if self.config['captura_continua']:
+            try:
+                self.captura = CapturaMicrofono(self.microphone, estimador_ruido=EstimadorRuido(self.recognizer),
+                                                verboso=self.config['modo_verboso'])
+                self.captura.iniciar()
+                # El estimador es el único que mueve el umbral
+                self.recognizer.dynamic_energy_threshold = False
+            except Exception as e:
+                self.captura = None
+                print(f"⚠️  Captura continua no disponible ({e}), se abrirá el micrófono en cada escucha")
+        
+        if self.captura is None:
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+    
+    def fuente_audio(self):
+        """Fuente de audio para escuchar: el buffer de captura continua o el micrófono"""
+        if self.captura is not None and self.captura.activa:
+            return self.captura.fuente()
+        return self.microphone
     
     def hablar(self, texto, prioridad='normal'):
-        """TTS con múltiples motores"""
+        """Encola el texto en el hilo de voz sin esperar a que se diga.
+        
+        prioridad: 'alta' (se adelanta y descarta los 'baja' pendientes), 'normal' o 'baja'.
+        Devuelve un Future que se completa al terminar de decirlo (None si no se va a decir).
+        """
+        if self.salida_hablar is not None:
+            # Modo servidor: la respuesta es para el cliente, esté o no en pausa la voz local
+            print(f"🔊 {texto}")
+            self.salida_hablar.append(texto)
+            return None
+        
         if self.pausado and prioridad != 'alta':
-            return
+            return None
         
         print(f"🔊 {texto}")
         
         if not self.tts_engine:
-            time.sleep(len(texto) * 0.05)  # Simular tiempo de habla
+            return None
+        
+        return self.voz.decir(texto, prioridad)
+    
+    def cerrar_voz(self):
+        """Dice lo pendiente y cierra el proceso TTS"""
+        self.voz.detener(timeout=30)
+        if self.proceso_tts is not None:
+            self.proceso_tts.cerrar()
+    
+    def configurar_cache_frases(self):
+        """Ajusta la caché de frases a la voz actual y encola las frases que falten.
+        
+        Se llama al arrancar y tras cambiar velocidad, volumen o voz: con otra
+        configuración el audio guardado ya no vale y se vuelve a generar.
+        """
+        if self.cache_frases is None or not self.tts_engine:
             return
+        cambio = self.cache_frases.configurar(self.motor_tts_actual, self.config.get('voz_seleccionada', 'auto'),
+                                              self.config['velocidad_voz'], self.config['volumen_voz'])
+        frases = FRASES_FIJAS
+        if self.lectura_numeros is not None:
+            if cambio:
+                self.lectura_numeros.olvidar()
+            frases = frases + self.lectura_numeros.clips_necesarios()
+        for frase in frases:
+            if not self.cache_frases.contiene(frase):
+                # De fondo: lo que haya que decir pasa antes y escuchar() no espera a la caché
+                self.voz.ejecutar(lambda frase=frase: self.cache_frases.guardar(
+                    frase, lambda ruta: self.sintetizar_a_archivo(frase, ruta)), prioridad='fondo')
+    
+    def sintetizar_a_archivo(self, texto, ruta):
+        """Sintetiza a un WAV con el motor actual (solo desde el hilo de voz)"""
+        import subprocess
+        if self.motor_tts_actual == 'pyttsx3':
+            self.tts_engine.save_to_file(texto, ruta)
+            self.tts_engine.runAndWait()
+        elif self.proceso_tts is not None:
+            self.proceso_tts.a_archivo(texto, ruta)
+        elif self.motor_tts_actual == 'espeak':
+            cmd = ['espeak', '-v', 'es+f3', '-s', str(self.config['velocidad_voz']), '-w', ruta, texto]
+            subprocess.run(cmd, check=True, timeout=30)
+        elif self.motor_tts_actual == 'festival':
+            subprocess.run(['text2wave', '-o', ruta], input=texto, text=True, check=True, timeout=30)
+    
+    def frase_sintetizable(self, texto):
+        """False si el texto se va a decir con audio ya guardado"""
+        if self.cache_frases is None:
+            return True
+        if self.cache_frases.contiene(texto):
+            return False
+        return self.lectura_numeros is None or not self.lectura_numeros.disponible(texto)
+    
+    def sintetizar(self, texto):
+        """TTS con múltiples motores (bloquea hasta terminar; solo desde el hilo de voz)"""
+        if self.cache_frases is not None:
+            try:
+                ruta = self.cache_frases.buscar(texto)
+                if ruta:
+                    self.cache_frases.reproducir(ruta)
+                    return
+                # Resultados: prefijo y palabras del número ya sintetizados, unidos en memoria
+                if self.lectura_numeros is not None and self.lectura_numeros.reproducir(texto):
+                    return
+            except Exception as e:
+                if self.config['modo_verboso']:
+                    print(f"⚠️  No se pudo reproducir el audio guardado: {e}")
         
         try:
             if self.motor_tts_actual == 'pyttsx3':
                 self.tts_engine.say(texto)
                 self.tts_engine.runAndWait()
             
+            elif self.proceso_tts is not None:
+                self.proceso_tts.decir(texto)
+            
             elif self.motor_tts_actual == 'espeak':
                 import subprocess
                 # Configurar espeak en español
@@ -299,37 +679,41 @@ class CalculadoraVozOffline:
     
     def escuchar_offline(self, timeout=None):
         """Reconocimiento de voz completamente offline"""
+        import speech_recognition as sr
+        
         if timeout is None:
             timeout = self.config['timeout_escucha']
         
         try:
             print("🎤 Escuchando (modo offline)...")
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+            with self.fuente_audio() as source:
+                # Con captura continua el umbral ya está calibrado en segundo plano
+                if self.captura is None or not self.captura.activa:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+                
+                # Decodificar mientras se habla; si ningún motor admite streaming,
+                # se graba la frase completa y se decodifica después
+                if self.config['reconocimiento_streaming']:
+                    try:
+                        texto, motor = self.reconocedor_streaming.escuchar(
+                            source, self.modelos_disponibles, timeout=timeout, phrase_time_limit=15)
+                        print(f"📝 Escuchado ({motor.capitalize()}): {texto}")
+                        return texto.lower()
+                    except sr.UnknownValueError:
+                        return "no_entendido"
+                    except sr.RequestError as e:
+                        if self.config['modo_verboso']:
+                            print(f"⚠️  Streaming no disponible ({e}), usando modo por frase")
+                
                 audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=15)
             
             print("🔄 Procesando offline...")
             
-            # Intentar con diferentes motores offline
-            if 'sphinx' in self.modelos_disponibles:
-                try:
-                    texto = self.recognizer.recognize_sphinx(audio, language='es-ES')
-                    print(f"📝 Escuchado (Sphinx): {texto}")
-                    return texto.lower()
-                except sr.UnknownValueError:
-                    print("🔄 Sphinx no entendió, probando otro método...")
-                except Exception as e:
-                    print(f"⚠️  Error Sphinx: {e}")
-            
-            if 'vosk' in self.modelos_disponibles:
-                try:
-                    # Implementar Vosk si está disponible
-                    texto = self.reconocer_con_vosk(audio)
-                    if texto:
-                        print(f"📝 Escuchado (Vosk): {texto}")
-                        return texto.lower()
-                except Exception as e:
-                    print(f"⚠️  Error Vosk: {e}")
+            # Todos los motores offline a la vez: un fallo de Sphinx ya no retrasa a Vosk
+            texto, motor = self.orquestador.reconocer(audio, self.modelos_disponibles)
+            if texto:
+                print(f"📝 Escuchado ({motor.capitalize()}): {texto}")
+                return texto.lower()
             
             return "no_entendido"
             
@@ -339,47 +723,26 @@ class CalculadoraVozOffline:
             print(f"❌ Error en reconocimiento offline: {e}")
             return "error"
     
+    def reconocer_con_sphinx(self, audio):
+        """Reconocimiento con PocketSphinx ('' si no entendió)"""
+        import speech_recognition as sr
+        try:
+            return self.recognizer.recognize_sphinx(audio, language='es-ES', grammar=self.gramatica_sphinx)
+        except sr.UnknownValueError:
+            return ''
+    
     def reconocer_con_vosk(self, audio):
-        """Reconocimiento con Vosk (si está disponible)"""
+        """Reconocimiento con Vosk usando el modelo residente"""
         try:
-            import vosk
-            import json
-            
-            # Buscar modelo de español
-            model_paths = [
-                './vosk-model-es',
-                './models/vosk-model-es-0.42',
-                '/usr/share/vosk-models/es',
-            ]
-            
-            model = None
-            for path in model_paths:
-                if os.path.exists(path):
-                    model = vosk.Model(path)
-                    break
-            
-            if not model:
-                print("⚠️  Modelo Vosk en español no encontrado")
-                return None
-            
-            rec = vosk.KaldiRecognizer(model, audio.sample_rate)
-            
-            # Convertir audio para Vosk
-            audio_data = audio.get_raw_data(convert_rate=audio.sample_rate, convert_width=2)
-            
-            if rec.AcceptWaveform(audio_data):
-                result = json.loads(rec.Result())
-                return result.get('text', '')
-            else:
-                result = json.loads(rec.PartialResult())
-                return result.get('partial', '')
-                
+            return self.gestor_vosk.reconocer(audio)
         except Exception as e:
             print(f"Error Vosk: {e}")
             return None
     
     def escuchar_hibrido(self, timeout=None):
         """Modo híbrido: offline primero, online como respaldo"""
+        import speech_recognition as sr
+        
         if timeout is None:
             timeout = self.config['timeout_escucha']
         
@@ -393,7 +756,7 @@ class CalculadoraVozOffline:
         # Respaldo online
         try:
             print("🎤 Escuchando (modo online)...")
-            with self.microphone as source:
+            with self.fuente_audio() as source:
                 audio = self.recognizer.listen(source, timeout=timeout//2, phrase_time_limit=10)
             
             texto = self.recognizer.recognize_google(audio, language=self.config['idioma_reconocimiento'])
@@ -413,6 +776,11 @@ class CalculadoraVozOffline:
     
     def escuchar(self, timeout=None):
         """Punto de entrada principal para reconocimiento"""
+        if self.microphone is None:
+            print("❌ Micrófono no inicializado")
+            return "error"
+        # Que el micrófono no recoja lo que la propia calculadora está diciendo
+        self.voz.esperar()
         if self.config['usar_reconocimiento_offline'] and self.modelos_disponibles:
             return self.escuchar_offline(timeout)
         else:
@@ -420,6 +788,11 @@ class CalculadoraVozOffline:
     
     def cambiar_voz_interactivo(self):
         """Permite cambiar la voz de forma interactiva"""
+        if self.salida_hablar is not None:
+            # Las muestras sonarían en el servidor y la respuesta hay que escucharla
+            self.hablar("El cambio de voz necesita oír las voces y responder; usa el modo interactivo")
+            return
+        
         if self.motor_tts_actual != 'pyttsx3':
             self.hablar("El cambio de voz solo está disponible con el motor pyttsx3")
             return
@@ -432,23 +805,21 @@ class CalculadoraVozOffline:
             
             self.hablar("Te voy a mostrar las voces disponibles. Después me dices el número de la que prefieras.")
             
-            # Mostrar voces
+            # Mostrar voces; la demo se encola: cada cambio de voz va en orden con su frase
             print("\n🎙️  VOCES DISPONIBLES:")
             for i, voice in enumerate(voices):
                 if voice and hasattr(voice, 'name'):
                     print(f"   {i}: {voice.name}")
                     # Demo de cada voz
-                    self.tts_engine.setProperty('voice', voice.id)
-                    self.tts_engine.say(f"Voz número {i}")
-                    self.tts_engine.runAndWait()
-                    time.sleep(0.5)
+                    self.voz.ejecutar(lambda voz_id=voice.id: self.tts_engine.setProperty('voice', voz_id))
+                    self.voz.decir(f"Voz número {i}")
             
             # Restaurar voz actual
             voz_actual = self.config.get('voz_seleccionada', '0')
             if voz_actual.isdigit():
                 indice_actual = int(voz_actual)
                 if 0 <= indice_actual < len(voices):
-                    self.tts_engine.setProperty('voice', voices[indice_actual].id)
+                    self.voz.ejecutar(lambda: self.tts_engine.setProperty('voice', voices[indice_actual].id))
             
             self.hablar("¿Qué número de voz prefieres?")
             respuesta = self.escuchar()
@@ -458,8 +829,9 @@ class CalculadoraVozOffline:
             if match:
                 nuevo_indice = int(match.group())
                 if 0 <= nuevo_indice < len(voices):
-                    self.tts_engine.setProperty('voice', voices[nuevo_indice].id)
+                    self.voz.ejecutar(lambda: self.tts_engine.setProperty('voice', voices[nuevo_indice].id))
                     self.config['voz_seleccionada'] = str(nuevo_indice)
+                    self.configurar_cache_frases()
                     self.guardar_configuracion()
                     self.hablar(f"Voz cambiada a número {nuevo_indice}. ¿Te gusta cómo sueno ahora?")
                 else:
@@ -508,7 +880,6 @@ class CalculadoraVozOffline:
         elif 'híbrido' in respuesta or 'hibrido' in respuesta:
             self.config['usar_reconocimiento_offline'] = False
             self.hablar("Reconocimiento cambiado a modo híbrido: offline primero, online como respaldo")
-🎤 Esperando comando...
         
         self.guardar_configuracion()
     
@@ -539,126 +910,34 @@ class CalculadoraVozOffline:
             self.hablar("Para funcionar completamente offline, necesitas instalar modelos de reconocimiento.")
     
     def inicializar_patrones(self):
-        """Patrones de reconocimiento de operaciones"""
-        self.patrones_operaciones = {
-            # Operaciones básicas
-            r'\b(\d+(?:\.\d+)?)\s*(?:más|mas|suma|sumado|plus|\+)\s*(\d+(?:\.\d+)?)\b': 
-                lambda x, y: (float(x) + float(y), 'suma'),
-            
-            r'\b(\d+(?:\.\d+)?)\s*(?:menos|resta|restado|restar|-)\s*(\d+(?:\.\d+)?)\b': 
-                lambda x, y: (float(x) - float(y), 'resta'),
-            
-            r'\b(\d+(?:\.\d+)?)\s*(?:por|multiplicado|multiplicar|times|\*|x)\s*(?:por\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x, y: (float(x) * float(y), 'multiplicación'),
-            
-            r'\b(\d+(?:\.\d+)?)\s*(?:entre|dividido|dividir|division|/)\s*(?:por\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x, y: (float(x) / float(y) if float(y) != 0 else None, 'división'),
-            
-            r'\b(\d+(?:\.\d+)?)\s*(?:elevado|potencia|exponente|\^|\*\*)\s*(?:a\s*(?:la\s*)?)?(\d+(?:\.\d+)?)\b': 
-                lambda x, y: (float(x) ** float(y), 'potencia'),
-            
-            # Operaciones con resultado anterior
-            r'\b(?:resultado|anterior)\s*(?:más|mas|\+)\s*(\d+(?:\.\d+)?)\b':
-                lambda x: (self.ultimo_resultado + float(x), 'suma con resultado anterior'),
-            
-            r'\b(?:resultado|anterior)\s*(?:menos|-)\s*(\d+(?:\.\d+)?)\b':
-                lambda x: (self.ultimo_resultado - float(x), 'resta con resultado anterior'),
-            
-            # Operaciones unarias
-            r'\braíz\s*cuadrada\s*(?:de\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x: (math.sqrt(float(x)), 'raíz cuadrada'),
-            
-            r'\bseno\s*(?:de\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x: (math.sin(math.radians(float(x))), 'seno'),
-            
-            r'\bcoseno\s*(?:de\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x: (math.cos(math.radians(float(x))), 'coseno'),
-            
-            r'\btangente\s*(?:de\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x: (math.tan(math.radians(float(x))), 'tangente'),
-            
-            r'\blogaritmo\s*(?:de\s*)?(\d+(?:\.\d+)?)\b': 
-                lambda x: (math.log10(float(x)) if float(x) > 0 else None, 'logaritmo'),
-        }
+        """Motor de expresiones: gramática de operaciones + parser con precedencia"""
+        self.expresiones = self.nucleo.expresiones
     
     def procesar_operacion(self, texto):
         """Procesa operaciones matemáticas"""
-        texto_original = texto
-        texto = re.sub(r'[,.]', '.', texto)
-        texto = self.convertir_numeros_texto(texto)
-        
-        for patron, operacion in self.patrones_operaciones.items():
-            match = re.search(patron, texto, re.IGNORECASE)
-            if match:
-                try:
-                    grupos = match.groups()
-                    
-                    if len(grupos) == 1:
-                        resultado_tupla = operacion(grupos[0])
-                    else:
-                        resultado_tupla = operacion(grupos[0], grupos[1])
-                    
-                    if isinstance(resultado_tupla, tuple):
-                        resultado, tipo_operacion = resultado_tupla
-                    else:
-                        resultado, tipo_operacion = resultado_tupla, "operación"
-                    
-                    if resultado is None:
-                        return None, "Error: Operación no válida"
-                    
-                    if math.isnan(resultado) or math.isinf(resultado):
-                        return None, "Error: Resultado no válido"
-                    
-                    self.ultimo_resultado = resultado
-                    entrada_historial = {
-                        'operacion': texto_original,
-                        'resultado': resultado,
-                        'tipo': tipo_operacion,
-                        'timestamp': datetime.now().strftime("%H:%M:%S")
-                    }
-                    self.historial.append(entrada_historial)
-                    
-                    if len(self.historial) > 50:
-                        self.historial = self.historial[-50:]
-                    
-                    return resultado, f"El resultado de la {tipo_operacion} es {self.formatear_numero(resultado)}"
-                    
-                except Exception as e:
-                    return None, f"Error matemático: {str(e)}"
-        
-        return None, "No reconocí la operación. Prueba con 'cinco más tres' o 'diez por dos'."
+        return self.nucleo.procesar_operacion(texto)
     
     def convertir_numeros_texto(self, texto):
         """Convierte números escritos a dígitos"""
-        numeros_texto = {
-            'cero': '0', 'uno': '1', 'dos': '2', 'tres': '3', 'cuatro': '4',
-            'cinco': '5', 'seis': '6', 'siete': '7', 'ocho': '8', 'nueve': '9',
-            'diez': '10', 'once': '11', 'doce': '12', 'trece': '13', 'catorce': '14',
-            'quince': '15', 'veinte': '20', 'treinta': '30', 'cuarenta': '40',
-            'cincuenta': '50', 'sesenta': '60', 'setenta': '70', 'ochenta': '80',
-            'noventa': '90', 'cien': '100'
-        }
-        
-        for palabra, numero in numeros_texto.items():
-            texto = re.sub(r'\b' + palabra + r'\b', numero, texto, flags=re.IGNORECASE)
-        
-        return texto
+        return convertir_numeros_texto(texto)
     
     def formatear_numero(self, numero):
         """Formatea números para pronunciación"""
-        try:
-            if abs(numero - int(numero)) < 1e-10:
-                return str(int(numero))
-            else:
-                precision = self.config['precision_decimales']
-                formatted = f"{numero:.{precision}f}".rstrip('0').rstrip('.')
-                return formatted
-        except:
-            return str(numero)
+        return self.nucleo.formatear_numero(numero)
     
-    def procesar_comandos_especiales(self, comando):
-        """Procesa comandos especiales"""
-        comandos_especiales = {
+    def es_orden_valida(self, texto):
+        """Si una transcripción se entiende como orden: un comando conocido o una operación calculable"""
+        for palabras_clave in list(self.comandos_especiales()) + [palabras for palabras, _ in self.nucleo.comandos]:
+            if any(palabra in texto for palabra in palabras_clave):
+                return True
+        if self.nucleo.es_consulta_historial(texto):
+            return True
+        resultado, _, _ = self.nucleo.calcular(texto)
+        return resultado is not None
+    
+    def comandos_especiales(self):
+        """Palabras clave de cada comando especial y la acción que ejecutan"""
+        return {
             ('salir', 'cerrar', 'terminar', 'adiós', 'chao'): self.salir_seguro,
             ('ayuda',): self.mostrar_ayuda,
             ('cambiar voz', 'voz'): self.cambiar_voz_interactivo,
@@ -680,8 +959,14 @@ class CalculadoraVozOffline:
             ('volumen más alto',): lambda: self.cambiar_volumen(0.1),
             ('volumen más bajo',): lambda: self.cambiar_volumen(-0.1),
         }
+    
+    def procesar_comandos_especiales(self, comando):
+        """Procesa comandos especiales"""
+        # Las consultas ("historial de hoy") van antes: si no, 'historial' se las quedaría
+        if self.nucleo.consultas is not None and self.nucleo.consultar_historial(comando):
+            return True
         
-        for palabras_clave, accion in comandos_especiales.items():
+        for palabras_clave, accion in self.comandos_especiales().items():
             for palabra in palabras_clave:
                 if palabra in comando:
                     try:
@@ -696,34 +981,19 @@ class CalculadoraVozOffline:
     
     def leer_historial(self):
         """Lee el historial de operaciones"""
-        if not self.historial:
-            self.hablar("No hay operaciones en el historial")
-            return
-        
-        self.hablar(f"Tienes {len(self.historial)} operaciones en el historial. Te leo las últimas 5:")
-        
-        ultimas = self.historial[-5:]
-        for entrada in ultimas:
-            texto = f"A las {entrada['timestamp']}: {entrada['operacion']} = {self.formatear_numero(entrada['resultado'])}"
-            self.hablar(texto)
-            time.sleep(0.5)
+        self.nucleo.leer_historial()
     
     def limpiar_historial(self):
         """Limpia el historial"""
-        self.historial.clear()
-        self.hablar("Historial limpiado")
+        self.nucleo.limpiar_historial()
     
     def decir_ultimo_resultado(self):
         """Dice el último resultado calculado"""
-        if self.ultimo_resultado is not None:
-            self.hablar(f"El último resultado es {self.formatear_numero(self.ultimo_resultado)}")
-        else:
-            self.hablar("No hay resultado anterior")
+        self.nucleo.decir_ultimo_resultado()
     
     def borrar_resultado(self):
         """Borra el último resultado"""
-        self.ultimo_resultado = 0
-        self.hablar("Resultado borrado")
+        self.nucleo.borrar_resultado()
     
     def pausar_calculadora(self):
         """Pausa la calculadora"""
@@ -776,8 +1046,11 @@ Configuración actual:
         self.config['velocidad_voz'] = nueva_velocidad
         
         if self.motor_tts_actual == 'pyttsx3' and self.tts_engine:
-            self.tts_engine.setProperty('rate', nueva_velocidad)
+            self.voz.ejecutar(lambda: self.tts_engine.setProperty('rate', nueva_velocidad))
+        elif self.motor_tts_actual == 'espeak' and self.proceso_tts is not None:
+            self.voz.ejecutar(lambda: self.proceso_tts.configurar(nueva_velocidad))
         
+        self.configurar_cache_frases()
         self.hablar(f"Velocidad ajustada a {nueva_velocidad}")
     
     def cambiar_volumen(self, cambio):
@@ -786,8 +1059,9 @@ Configuración actual:
         self.config['volumen_voz'] = nuevo_volumen
         
         if self.motor_tts_actual == 'pyttsx3' and self.tts_engine:
-            self.tts_engine.setProperty('volume', nuevo_volumen)
+            self.voz.ejecutar(lambda: self.tts_engine.setProperty('volume', nuevo_volumen))
         
+        self.configurar_cache_frases()
         self.hablar(f"Volumen ajustado")
     
     def mostrar_ayuda(self):
@@ -803,11 +1077,15 @@ Configuración actual:
    • "raíz cuadrada de nueve"
    • "seno de treinta"
    • "resultado más cinco"
+   • "dos más tres por cuatro"
+   • "abre paréntesis dos más tres cierra paréntesis por cuatro"
 
 🎛️  CONTROLES:
    • "ayuda" - Esta ayuda
    • "historial" - Ver cálculos anteriores
    • "último resultado" - Repetir último resultado
+   • "historial de hoy", "suma de todos los resultados",
+     "cuál fue la última raíz cuadrada" - Con historial SQLite
    • "limpiar historial" - Borrar historial
    • "pausar/reanudar" - Control de pausa
    • "salir" - Cerrar calculadora
@@ -835,7 +1113,10 @@ Configuración actual:
         """Sale de forma segura guardando configuración"""
         self.hablar("Guardando configuración y cerrando...")
         
-        if self.config['guardar_historial'] and self.historial:
+        if self.diario is not None:
+            # Las operaciones ya están guardadas: solo falta lo que quede en la cola
+            self.diario.cerrar()
+        elif self.config['guardar_historial'] and self.historial:
             try:
                 historial_archivo = {
                     'fecha': datetime.now().isoformat(),
@@ -848,6 +1129,9 @@ Configuración actual:
         
         self.guardar_configuracion()
         self.hablar("¡Hasta luego!")
+        self.cerrar_voz()
+        if self.captura is not None:
+            self.captura.detener()
         sys.exit(0)
     
     def procesar_comando_voz(self, texto):
@@ -870,8 +1154,10 @@ Configuración actual:
         if self.config['modo_verboso']:
             print(f"💬 Procesando: '{texto}'")
         
-        # Verificar comandos especiales primero
-        if self.procesar_comandos_especiales(texto):
+        # Una operación que se entiende entera va antes que las palabras clave:
+        # "... cerrar paréntesis", "resultado anterior menos cuatro" no son comandos
+        resultado, _, _ = self.nucleo.calcular(texto)
+        if resultado is None and self.procesar_comandos_especiales(texto):
             return "comando_especial"
         
         # Procesar operaciones matemáticas
@@ -903,7 +1189,8 @@ Configuración actual:
                         continue
                 
                 if not self.modo_continuo:
-                    self.hablar("¿Alguna otra operación?")
+                    # Si llega algo más urgente, esta pregunta ya no hace falta
+                    self.hablar("¿Alguna otra operación?", prioridad='baja')
                     
             except KeyboardInterrupt:
                 self.hablar("Interrupción detectada")
@@ -928,6 +1215,25 @@ Configuración actual:
                 print("❌ No se detectó comando")
                 return None
     
+    def modo_servidor(self):
+        """Atiende comandos de otros procesos (--comando) por un socket Unix"""
+        from servidor import ServidorCalculadora
+        
+        try:
+            servidor = ServidorCalculadora(self)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return
+        
+        print(f"🛰️  Servidor escuchando en {servidor.ruta} (Ctrl+C para detener)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Servidor detenido")
+        finally:
+            servidor.server_close()
+            print(f"📊 Comandos atendidos: {servidor.comandos_atendidos}")
+    
     def diagnostico_sistema(self):
         """Ejecuta un diagnóstico del sistema"""
         print("\n🔍 DIAGNÓSTICO DEL SISTEMA:")
@@ -939,19 +1245,49 @@ Configuración actual:
             print(f"   ✅ Modelos offline: {', '.join(self.modelos_disponibles)}")
         else:
             print("   ⚠️  Sin modelos offline disponibles")
-        
+
+        if 'vosk' in self.modelos_disponibles:
+            stats_vosk = self.gestor_vosk.estadisticas()
+            if stats_vosk['cargado']:
+                print(f"   🧠 Vosk residente: {stats_vosk['ruta']} "
+                      f"({stats_vosk['tiempo_carga_s']:.2f} s, ~{stats_vosk['memoria_mb']:.0f} MB)")
+            else:
+                print("   🧠 Vosk: modelo aún no cargado")
+
+        if self.recognizer is not None:
+            for motor, stats_motor in self.orquestador.estadisticas().items():
+                if stats_motor['intentos']:
+                    print(f"   🏁 {motor.capitalize()}: ganó {stats_motor['ganadas']}/{stats_motor['intentos']} frases, "
+                          f"{stats_motor['latencia_ms']} ms de mediana, {stats_motor['errores']} errores")
+
         # Verificar TTS
         print("🗣️  SÍNTESIS DE VOZ:")
         if self.tts_engine:
             print(f"   ✅ Motor TTS: {self.motor_tts_actual}")
+            if self.proceso_tts is not None:
+                stats_tts = self.proceso_tts.estadisticas()
+                print(f"   ⏱️  Proceso {stats_tts['motor']}: {stats_tts['locuciones']} frases, "
+                      f"primer audio {stats_tts['primer_audio_ms']} ms (p95 {stats_tts['primer_audio_p95_ms']} ms), "
+                      f"{stats_tts['reinicios']} reinicios")
         else:
             print("   ⚠️  Sin motor TTS disponible")
         
         # Verificar micrófono
         print("🎤 MICRÓFONO:")
         try:
-            with self.microphone as source:
+            with self.fuente_audio() as source:
                 print("   ✅ Micrófono funcional")
+            if self.captura is not None:
+                stats = self.captura.estadisticas()
+                print(f"   🎙️  Captura continua: {'activa' if stats['activa'] else 'detenida'}, "
+                      f"{stats['segundos_capturados']} s capturados, {stats['desbordes']} desbordes")
+                ruido = stats['ruido']
+                if ruido and ruido['calibrado']:
+                    print(f"   📉 Ruido de fondo: {ruido['piso_ruido']} → umbral {ruido['umbral']} "
+                          f"(última energía {ruido['ultima_energia']}, "
+                          f"en seguimiento desde hace {ruido['segundos_desde_calibracion']} s)")
+                elif ruido:
+                    print("   📉 Ruido de fondo: calibrando...")
         except Exception as e:
             print(f"   ❌ Error de micrófono: {e}")
         
@@ -969,21 +1305,94 @@ Configuración actual:
 
 def main():
     """Función principal"""
+    if len(sys.argv) > 1 and sys.argv[1] == '--texto':
+        # Sin audio ni cabecera: solo el núcleo de texto, una línea de stdin por comando si no hay argumento
+        config = CalculadoraVozOffline.cargar_configuracion()
+        diario, consultas = abrir_historial(dict(config, modo_verboso=False))
+        nucleo = CalculadoraTexto(precision_decimales=config['precision_decimales'],
+                                  diario=diario, consultas=consultas)
+        comandos = [' '.join(sys.argv[2:])] if len(sys.argv) > 2 else (linea.strip() for linea in sys.stdin)
+        for comando in comandos:
+            if comando:
+                _, mensajes = nucleo.procesar_comando(comando)
+                print('\n'.join(mensajes))
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == '--historial':
+        # Últimas operaciones del historial configurado (SQLite o el diario, sin cargarlo entero)
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        config = CalculadoraVozOffline.cargar_configuracion()
+        if config['historial_sqlite']:
+            from historial_sqlite import HistorialSQLite
+            historial = HistorialSQLite(verboso=False)
+            try:
+                registros = [{'fecha': fecha, 'operacion': operacion, 'resultado': resultado}
+                             for fecha, operacion, resultado, _ in historial.ultimas(n)]
+            finally:
+                historial.cerrar()
+        else:
+            registros = leer_cola(n=n)
+        for registro in registros:
+            print(f"{registro.get('fecha', registro.get('timestamp'))}  {registro['operacion']} = {registro['resultado']}")
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == '--lote':
+        # Lote de comandos escritos: un JSON por línea en stdout (o --salida), resumen por stderr
+        from lote import ejecutar_lote
+        argumentos = sys.argv[2:]
+        opciones = {}
+        for opcion in ('--salida', '--procesos'):
+            if opcion in argumentos:
+                posicion = argumentos.index(opcion)
+                opciones[opcion] = argumentos[posicion + 1]
+                del argumentos[posicion:posicion + 2]
+        ejecutar_lote(argumentos[0] if argumentos else '-',
+                      destino=opciones.get('--salida'),
+                      procesos=int(opciones['--procesos']) if '--procesos' in opciones else None)
+        return
+    
     print("🧮 CALCULADORA DE VOZ OFFLINE")
     print("=" * 40)
     
+    # --perfil-arranque se puede combinar con cualquier otro modo
+    perfil = None
+    if '--perfil-arranque' in sys.argv:
+        sys.argv.remove('--perfil-arranque')
+        perfil = PerfilArranque(INICIO_ARRANQUE)
+    
+    def crear_calculadora(usar_microfono=True):
+        calc = CalculadoraVozOffline(usar_microfono=usar_microfono, perfil=perfil)
+        if perfil is not None:
+            perfil.imprimir()
+        return calc
+    
     # Verificar argumentos de línea de comandos
     if len(sys.argv) > 1:
         if sys.argv[1] == '--diagnostico':
-            calc = CalculadoraVozOffline()
+            calc = crear_calculadora()
             calc.diagnostico_sistema()
             return
+        elif sys.argv[1] == '--servidor':
+            calc = crear_calculadora(usar_microfono=False)
+            calc.modo_servidor()
+            return
         elif sys.argv[1] == '--comando':
-            calc = CalculadoraVozOffline()
             if len(sys.argv) > 2:
                 comando = ' '.join(sys.argv[2:])
+                
+                # Con un servidor en marcha, el comando se resuelve allí sin arrancar nada
+                from servidor import enviar_comando
+                respuesta = enviar_comando(comando)
+                if respuesta is not None:
+                    for mensaje in respuesta.get('mensajes', []):
+                        print(f"🔊 {mensaje}")
+                    return
+                
+                # Comando escrito: no hace falta micrófono ni modelos de reconocimiento
+                calc = crear_calculadora(usar_microfono=False)
                 calc.modo_comando_unico(comando)
             else:
+                calc = crear_calculadora()
                 calc.modo_comando_unico()
             return
         elif sys.argv[1] == '--ayuda':
@@ -993,7 +1402,12 @@ def main():
     python calculadora_voz.py --comando        # Un solo comando
     python calculadora_voz.py --comando "5+3"  # Comando específico
     python calculadora_voz.py --diagnostico    # Diagnóstico del sistema
+    python calculadora_voz.py --servidor       # Calculadora residente para --comando
+    python calculadora_voz.py --texto "5+3"    # Solo texto, sin audio (sin argumento: lee stdin)
+    python calculadora_voz.py --historial 20     # Últimas operaciones guardadas en el diario
+    python calculadora_voz.py --lote comandos.txt  # Lote a JSONL (- = stdin; --salida f, --procesos N)
     python calculadora_voz.py --ayuda         # Esta ayuda
+    python calculadora_voz.py --perfil-arranque  # Tiempos de cada fase del arranque
 
 📦 INSTALACIÓN DE DEPENDENCIAS OFFLINE:
     pip install speechrecognition pyttsx3
@@ -1007,7 +1421,7 @@ def main():
             return
     
     try:
-        calc = CalculadoraVozOffline()
+        calc = crear_calculadora()
         calc.modo_interactivo()
         
     except KeyboardInterrupt:
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import time
+
+
+# Rutas donde se busca el modelo de español, en orden de preferencia.
+# 'model' es la carpeta que usa speech_recognition.Recognizer.recognize_vosk
+RUTAS_MODELO_VOSK = [
+    './vosk-model-es',
+    './models/vosk-model-es-0.42',
+    '/usr/share/vosk-models/es',
+    'model',
+]
+
+
+def memoria_residente_mb():
+    """Devuelve la memoria residente del proceso en MB (0 si no se puede medir)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            paginas = int(f.read().split()[1])
+        return paginas * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except Exception:
+        pass
+    try:
+        import resource
+        # ru_maxrss está en KB en Linux (pico, no actual, pero sirve de referencia)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return 0.0
+
+
+class GestorModeloVosk:
+    """Mantiene el modelo Vosk y sus reconocedores cargados en memoria"""
+
+    def __init__(self, rutas=None, verboso=True):
+        self.rutas = list(rutas) if rutas else list(RUTAS_MODELO_VOSK)
+        self.verboso = verboso
+
+        self.modelo = None
+        self.ruta_modelo = None
+        self.tiempo_carga = None
+        self.memoria_mb = None
+
+        # Un KaldiRecognizer por frecuencia de muestreo, reutilizado entre frases
+        self._reconocedores = {}
+        self._lock_carga = threading.Lock()
+        self._lock_reconocer = threading.Lock()
+        self._carga_fallida = False
+        self._hilo_precarga = None
+
+    def buscar_modelo(self):
+        """Devuelve la primera ruta de modelo existente o None"""
+        for ruta in self.rutas:
+            if os.path.isdir(ruta):
+                return ruta
+        return None
+
+    def disponible(self):
+        """Indica si hay un modelo cargado o que se pueda cargar"""
+        return self.modelo is not None or (not self._carga_fallida and self.buscar_modelo() is not None)
+
+    def obtener_modelo(self):
+        """Carga el modelo la primera vez que se necesita y lo deja residente"""
+        if self.modelo is not None:
+            return self.modelo
+        if self._carga_fallida:
+            return None
+
+        with self._lock_carga:
+            if self.modelo is not None:
+                return self.modelo
+            if self._carga_fallida:
+                return None
+
+            ruta = self.buscar_modelo()
+            if not ruta:
+                self._carga_fallida = True
+                print("⚠️  Modelo Vosk en español no encontrado")
+                return None
+
+            try:
+                import vosk
+                if not self.verboso:
+                    vosk.SetLogLevel(-1)
+
+                memoria_antes = memoria_residente_mb()
+                inicio = time.perf_counter()
+                modelo = vosk.Model(ruta)
+                self.tiempo_carga = time.perf_counter() - inicio
+                self.memoria_mb = max(0.0, memoria_residente_mb() - memoria_antes)
+            except Exception as e:
+                self._carga_fallida = True
+                print(f"⚠️  Error cargando modelo Vosk: {e}")
+                return None
+
+            self.ruta_modelo = ruta
+            self.modelo = modelo
+            print(f"✅ Modelo Vosk cargado desde {ruta} "
+                  f"en {self.tiempo_carga:.2f} s (~{self.memoria_mb:.0f} MB)")
+            return self.modelo
+
+    def precargar(self, recognizer=None):
+        """Carga el modelo en segundo plano para no bloquear el arranque"""
+        if self._hilo_precarga is not None:
+            return
+
+        def cargar():
+            if recognizer is not None:
+                self.instalar_en(recognizer)
+            else:
+                self.obtener_modelo()
+
+        self._hilo_precarga = threading.Thread(target=cargar, daemon=True)
+        self._hilo_precarga.start()
+
+    def obtener_reconocedor(self, sample_rate):
+        """Devuelve un KaldiRecognizer reutilizable, reiniciado para una nueva frase"""
+        modelo = self.obtener_modelo()
+        if modelo is None:
+            return None
+
+        sample_rate = int(sample_rate)
+        rec = self._reconocedores.get(sample_rate)
+        if rec is None:
+            import vosk
+            rec = vosk.KaldiRecognizer(modelo, sample_rate)
+            self._reconocedores[sample_rate] = rec
+        else:
+            rec.Reset()
+        return rec
+
+    def tomar_reconocedor(self, sample_rate):
+        """Reserva el reconocedor para una frase; liberar con soltar_reconocedor()"""
+        self._lock_reconocer.acquire()
+        try:
+            rec = self.obtener_reconocedor(sample_rate)
+        except Exception:
+            self._lock_reconocer.release()
+            raise
+        if rec is None:
+            self._lock_reconocer.release()
+        return rec
+
+    def soltar_reconocedor(self):
+        """Libera el reconocedor reservado con tomar_reconocedor()"""
+        self._lock_reconocer.release()
+
+    def reconocer(self, audio):
+        """Reconoce un AudioData completo y devuelve el texto (o None)"""
+        rec = self.tomar_reconocedor(audio.sample_rate)
+        if rec is None:
+            return None
+        try:
+            audio_data = audio.get_raw_data(convert_rate=audio.sample_rate, convert_width=2)
+            rec.AcceptWaveform(audio_data)
+            resultado = json.loads(rec.FinalResult())
+            return resultado.get('text', '')
+        finally:
+            self.soltar_reconocedor()
+
+    def instalar_en(self, recognizer):
+        """Comparte el modelo con Recognizer.recognize_vosk para que no cargue 'model' por su cuenta"""
+        modelo = self.obtener_modelo()
+        if modelo is not None:
+            recognizer.vosk_model = modelo
+        return modelo is not None
+
+    def estadisticas(self):
+        """Datos de carga para diagnóstico"""
+        return {
+            'ruta': self.ruta_modelo,
+            'cargado': self.modelo is not None,
+            'tiempo_carga_s': self.tiempo_carga,
+            'memoria_mb': self.memoria_mb,
+            'reconocedores': sorted(self._reconocedores),
+        }
@@ -0,0 +1,374 @@
+import re
+
+
+# Palabras (letras) y números ya escritos en dígitos, con su posición en el texto
+PATRON_PALABRAS = re.compile(r'\d+(?:\.\d+)?|[^\W\d_]+')
+
+SIN_ACENTOS = str.maketrans('áéíóúü', 'aeiouu')
+
+# Clases de palabra dentro de un grupo menor que mil
+UNIDAD = 1
+DECENA = 2
+COMPLETO = 3   # diez..diecinueve, veintiuno..veintinueve: ya no admiten unidades
+CENTENA = 4
+
+PEQUENOS = {
+    'cero': (0, UNIDAD), 'uno': (1, UNIDAD), 'un': (1, UNIDAD), 'una': (1, UNIDAD),
+    'dos': (2, UNIDAD), 'tres': (3, UNIDAD), 'cuatro': (4, UNIDAD), 'cinco': (5, UNIDAD),
+    'seis': (6, UNIDAD), 'siete': (7, UNIDAD), 'ocho': (8, UNIDAD), 'nueve': (9, UNIDAD),
+    'diez': (10, COMPLETO), 'once': (11, COMPLETO), 'doce': (12, COMPLETO),
+    'trece': (13, COMPLETO), 'catorce': (14, COMPLETO), 'quince': (15, COMPLETO),
+    'dieciseis': (16, COMPLETO), 'diecisiete': (17, COMPLETO),
+    'dieciocho': (18, COMPLETO), 'diecinueve': (19, COMPLETO),
+    'veinte': (20, DECENA), 'veintiuno': (21, COMPLETO), 'veintiun': (21, COMPLETO),
+    'veintiuna': (21, COMPLETO), 'veintidos': (22, COMPLETO), 'veintitres': (23, COMPLETO),
+    'veinticuatro': (24, COMPLETO), 'veinticinco': (25, COMPLETO),
+    'veintiseis': (26, COMPLETO), 'veintisiete': (27, COMPLETO),
+    'veintiocho': (28, COMPLETO), 'veintinueve': (29, COMPLETO),
+    'treinta': (30, DECENA), 'cuarenta': (40, DECENA), 'cincuenta': (50, DECENA),
+    'sesenta': (60, DECENA), 'setenta': (70, DECENA), 'ochenta': (80, DECENA),
+    'noventa': (90, DECENA),
+    'cien': (100, CENTENA), 'ciento': (100, CENTENA),
+    'doscientos': (200, CENTENA), 'doscientas': (200, CENTENA),
+    'trescientos': (300, CENTENA), 'trescientas': (300, CENTENA),
+    'cuatrocientos': (400, CENTENA), 'cuatrocientas': (400, CENTENA),
+    'quinientos': (500, CENTENA), 'quinientas': (500, CENTENA),
+    'seiscientos': (600, CENTENA), 'seiscientas': (600, CENTENA),
+    'setecientos': (700, CENTENA), 'setecientas': (700, CENTENA),
+    'ochocientos': (800, CENTENA), 'ochocientas': (800, CENTENA),
+    'novecientos': (900, CENTENA), 'novecientas': (900, CENTENA),
+}
+
+# Qué clases pueden seguir a cada estado del grupo (0 = grupo vacío)
+SIGUIENTES = {
+    0: {UNIDAD, DECENA, COMPLETO, CENTENA},
+    CENTENA: {UNIDAD, DECENA, COMPLETO},
+    DECENA: set(),      # solo con 'y' + unidad ("treinta y dos")
+    UNIDAD: set(),
+    COMPLETO: set(),
+}
+
+ESCALAS = {
+    'mil': 10 ** 3,
+    'millon': 10 ** 6, 'millones': 10 ** 6,
+    'millardo': 10 ** 9, 'millardos': 10 ** 9,
+    'billon': 10 ** 12, 'billones': 10 ** 12,
+}
+
+# Denominadores de fracciones ("tres cuartos") y ordinales sueltos ("a la quinta")
+DENOMINADORES = {
+    'medio': 2, 'medios': 2, 'media': 2, 'medias': 2,
+    'tercio': 3, 'tercios': 3,
+    'cuarto': 4, 'cuartos': 4, 'quinto': 5, 'quintos': 5,
+    'sexto': 6, 'sextos': 6, 'septimo': 7, 'septimos': 7,
+    'octavo': 8, 'octavos': 8, 'noveno': 9, 'novenos': 9,
+    'decimo': 10, 'decimos': 10, 'centesimo': 100, 'centesimos': 100,
+    'milesimo': 1000, 'milesimos': 1000,
+}
+
+ORDINALES = {
+    'primero': 1, 'primera': 1, 'primer': 1,
+    'segundo': 2, 'segunda': 2,
+    'tercero': 3, 'tercera': 3, 'tercer': 3,
+    'cuarto': 4, 'cuarta': 4, 'quinto': 5, 'quinta': 5,
+    'sexto': 6, 'sexta': 6, 'septimo': 7, 'septima': 7,
+    'octavo': 8, 'octava': 8, 'noveno': 9, 'novena': 9,
+    'decimo': 10, 'decima': 10,
+}
+
+SEPARADORES_DECIMALES = {'coma', 'punto'}
+
+# Tras estas palabras, 'menos' es una resta y no el signo del número
+ANTES_DE_RESTA = {'resultado', 'anterior'}
+CIERRES = {'cierra', 'cerrar'}
+
+# Delante de una potencia 'menos' es el signo de toda la potencia y no se pega al
+# número: "menos dos elevado a dos" = -(2^2), no (-2)^2
+POTENCIAS = {'elevado', 'potencia', 'exponente'}
+
+# 'un'/'una' solo son número delante de una escala o fracción ("un millón", "un cuarto")
+ARTICULOS = {'un', 'una'}
+
+
+def normalizar(palabra):
+    """Minúsculas y sin acentos, para buscar en las tablas"""
+    return palabra.lower().translate(SIN_ACENTOS)
+
+
+def formatear(valor):
+    """Escribe el número en dígitos, sin '.0' si es entero"""
+    if isinstance(valor, float) and valor.is_integer() and abs(valor) < 1e15:
+        valor = int(valor)
+    return str(valor)
+
+
+class LectorNumeros:
+    """Lee números en palabras sobre una lista de palabras normalizadas"""
+
+    def __init__(self, palabras):
+        self.palabras = palabras
+        self.n = len(palabras)
+
+    def es_numero_en_digitos(self, i):
+        return i < self.n and self.palabras[i][0].isdigit()
+
+    def leer_cardinal(self, i):
+        """Lee un cardinal desde i; devuelve (valor entero, siguiente índice) o None"""
+        palabras, n = self.palabras, self.n
+        total = 0        # parte de millones y superiores ya cerrada
+        seccion = 0      # parte por debajo del millón ya cerrada (miles)
+        grupo = 0        # grupo actual menor que mil
+        estado = 0
+        leido = False
+        j = i
+
+        while j < n:
+            palabra = palabras[j]
+
+            if palabra[0].isdigit():
+                if leido:
+                    break
+                grupo = float(palabra) if '.' in palabra else int(palabra)
+                estado = COMPLETO
+                leido = True
+                j += 1
+                continue
+
+            pequeno = PEQUENOS.get(palabra)
+            if pequeno is not None:
+                valor, clase = pequeno
+                if clase not in SIGUIENTES[estado]:
+                    break
+                if palabra in ARTICULOS:
+                    siguiente = palabras[j + 1] if j + 1 < n else None
+                    if siguiente not in ESCALAS and siguiente not in DENOMINADORES:
+                        break
+                grupo += valor
+                estado = clase
+                leido = True
+                j += 1
+                continue
+
+            if palabra == 'y' and estado == DECENA and j + 1 < n:
+                unidad = PEQUENOS.get(palabras[j + 1])
+                if unidad is None or unidad[1] != UNIDAD or unidad[0] == 0:
+                    break
+                if palabras[j + 1] in ARTICULOS:
+                    siguiente = palabras[j + 2] if j + 2 < n else None
+                    if siguiente not in ESCALAS:
+                        break
+                grupo += unidad[0]
+                estado = UNIDAD
+                j += 2
+                continue
+
+            escala = ESCALAS.get(palabra)
+            if escala is not None:
+                if escala == 1000:
+                    if seccion:
+                        break  # "mil mil" no es un número
+                    seccion = (grupo or 1) * 1000
+                elif escala == 10 ** 12:
+                    if not (leido or total or seccion):
+                        break
+                    total = (total + seccion + grupo) * escala
+                    seccion = 0
+                else:
+                    if not (grupo or seccion):
+                        break
+                    total += (seccion + grupo) * escala
+                    seccion = 0
+                grupo = 0
+                estado = 0
+                leido = True
+                j += 1
+                # "un millón de ..."
+                if escala >= 10 ** 6 and j < n and palabras[j] == 'de' and not self.empieza_numero(j + 1):
+                    j += 1
+                continue
+
+            break
+
+        if not leido:
+            return None
+        return total + seccion + grupo, j
+
+    def empieza_numero(self, i):
+        return i < self.n and (self.palabras[i][0].isdigit() or self.palabras[i] in PEQUENOS
+                               or self.palabras[i] in ESCALAS)
+
+    def leer_decimales(self, i):
+        """Lee las cifras tras 'coma'/'punto': "cero cinco" -> '05', "catorce" -> '14'"""
+        cifras = ''
+        j = i
+        while j < self.n:
+            if self.palabras[j] == 'cero':
+                cifras += '0'
+                j += 1
+                continue
+            cardinal = self.leer_cardinal(j)
+            if cardinal is None or isinstance(cardinal[0], float):
+                break
+            cifras += str(cardinal[0])
+            j = cardinal[1]
+        return cifras, j
+
+    def leer_numero(self, i, signo_permitido):
+        """Lee un número completo (signo, decimales, fracciones); devuelve (valor, siguiente) o None"""
+        palabras, n = self.palabras, self.n
+        signo = 1
+        inicio = i
+
+        if palabras[i] == 'menos' and signo_permitido and self.empieza_numero(i + 1):
+            signo = -1
+            i += 1
+
+        cardinal = self.leer_cardinal(i)
+        if cardinal is None:
+            ordinal = ORDINALES.get(palabras[i])
+            if ordinal is not None and signo == 1:
+                return ordinal, i + 1
+            return None
+
+        valor, j = cardinal
+        if j < n and palabras[j] in SEPARADORES_DECIMALES:
+            cifras, k = self.leer_decimales(j + 1)
+            if cifras:
+                valor = float(f"{valor}.{cifras}")
+                j = k
+        elif j + 1 < n and palabras[j] == 'y' and palabras[j + 1] in ('medio', 'media'):
+            valor = valor + 0.5
+            j += 2
+        elif j < n and palabras[j] in DENOMINADORES and valor != 0:
+            valor = valor / DENOMINADORES[palabras[j]]
+            j += 1
+
+        if j == inicio:
+            return None
+        if signo == -1 and j < n and palabras[j] in POTENCIAS:
+            return None
+        return signo * valor, j
+
+
+def sigue_a_operando(palabras, i):
+    """Indica si la palabra i va detrás de 'resultado' o de un paréntesis cerrado"""
+    if i == 0:
+        return False
+    anterior = palabras[i - 1]
+    if anterior in ANTES_DE_RESTA:
+        return True
+    return anterior == 'parentesis' and i >= 2 and palabras[i - 2] in CIERRES
+
+
+def convertir_numeros_texto(texto):
+    """Convierte números escritos en palabras a dígitos en una sola pasada"""
+    coincidencias = list(PATRON_PALABRAS.finditer(texto))
+    if not coincidencias:
+        return texto
+
+    palabras = [normalizar(m.group()) for m in coincidencias]
+    lector = LectorNumeros(palabras)
+
+    partes = []
+    ultimo_fin = 0
+    anterior_es_numero = False
+    i = 0
+    while i < len(palabras):
+        signo_permitido = not anterior_es_numero and not sigue_a_operando(palabras, i)
+        leido = lector.leer_numero(i, signo_permitido)
+        if leido is None:
+            anterior_es_numero = False
+            i += 1
+            continue
+
+        valor, siguiente = leido
+        partes.append(texto[ultimo_fin:coincidencias[i].start()])
+        partes.append(formatear(valor))
+        ultimo_fin = coincidencias[siguiente - 1].end()
+        anterior_es_numero = True
+        i = siguiente
+
+    partes.append(texto[ultimo_fin:])
+    return ''.join(partes)
+
+
+# Del número a las palabras con que se dice (con tildes, para la síntesis)
+UNIDADES_HABLADAS = [
+    'cero', 'uno', 'dos', 'tres', 'cuatro', 'cinco', 'seis', 'siete', 'ocho', 'nueve',
+    'diez', 'once', 'doce', 'trece', 'catorce', 'quince', 'dieciséis', 'diecisiete',
+    'dieciocho', 'diecinueve', 'veinte', 'veintiuno', 'veintidós', 'veintitrés',
+    'veinticuatro', 'veinticinco', 'veintiséis', 'veintisiete', 'veintiocho', 'veintinueve',
+]
+DECENAS_HABLADAS = ['', '', '', 'treinta', 'cuarenta', 'cincuenta', 'sesenta', 'setenta',
+                    'ochenta', 'noventa']
+CENTENAS_HABLADAS = ['', 'ciento', 'doscientos', 'trescientos', 'cuatrocientos', 'quinientos',
+                     'seiscientos', 'setecientos', 'ochocientos', 'novecientos']
+
+# Todas las palabras que puede devolver numero_a_palabras
+VOCABULARIO_HABLADO = sorted(set(UNIDADES_HABLADAS + DECENAS_HABLADAS[3:] + CENTENAS_HABLADAS[1:]) |
+                             {'y', 'un', 'veintiún', 'cien', 'mil', 'millón', 'millones', 'coma', 'menos'})
+
+
+def grupo_a_palabras(n, apocopado=False):
+    """Palabras de 1..999; apocopado para delante de mil/millones ("veintiún mil")"""
+    palabras = []
+    centenas, resto = divmod(n, 100)
+    if centenas:
+        palabras.append('cien' if n == 100 else CENTENAS_HABLADAS[centenas])
+    if resto < 30:
+        if resto:
+            palabras.append(UNIDADES_HABLADAS[resto])
+    else:
+        decenas, unidades = divmod(resto, 10)
+        palabras.append(DECENAS_HABLADAS[decenas])
+        if unidades:
+            palabras += ['y', UNIDADES_HABLADAS[unidades]]
+    if apocopado and palabras[-1] == 'uno':
+        palabras[-1] = 'un'
+    elif apocopado and palabras[-1] == 'veintiuno':
+        palabras[-1] = 'veintiún'
+    return palabras
+
+
+def miles_a_palabras(n, apocopado=False):
+    """Palabras de 1..999999"""
+    miles, unidades = divmod(n, 1000)
+    palabras = []
+    if miles:
+        palabras += ['mil'] if miles == 1 else grupo_a_palabras(miles, apocopado=True) + ['mil']
+    if unidades:
+        palabras += grupo_a_palabras(unidades, apocopado)
+    return palabras
+
+
+def entero_a_palabras(n):
+    """Palabras de un entero entre 0 y 10**12 - 1"""
+    if n == 0:
+        return ['cero']
+    millones, resto = divmod(n, 10 ** 6)
+    palabras = []
+    if millones:
+        palabras += ['un', 'millón'] if millones == 1 else miles_a_palabras(millones, apocopado=True) + ['millones']
+    if resto:
+        palabras += miles_a_palabras(resto)
+    return palabras
+
+
+def numero_a_palabras(texto):
+    """Palabras de un número escrito en dígitos ("-1234.05" -> menos mil doscientos... coma cero cinco).
+
+    Los decimales se leen cifra a cifra. Devuelve None si no es un número
+    que se sepa leer así (notación científica, un billón o más).
+    """
+    coincidencia = re.fullmatch(r'(-)?(\d+)(?:\.(\d+))?', texto.strip())
+    if not coincidencia:
+        return None
+    signo, entero, decimales = coincidencia.groups()
+    if len(entero.lstrip('0')) > 12:
+        return None
+    palabras = ['menos'] if signo else []
+    palabras += entero_a_palabras(int(entero))
+    if decimales:
+        palabras.append('coma')
+        palabras += [UNIDADES_HABLADAS[int(cifra)] for cifra in decimales]
+    return palabras
@@ -0,0 +1,41 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PerfilArranque:
+    """Mide cada fase del arranque, también las que corren en paralelo en otros hilos"""
+
+    def __init__(self, inicio=None):
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.fases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def fase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            with self._lock:
+                self.fases.append((nombre, inicio - self.inicio, fin - inicio,
+                                   threading.current_thread().name))
+
+    def total(self):
+        """Segundos desde el inicio hasta el final de la última fase"""
+        with self._lock:
+            if not self.fases:
+                return 0.0
+            return max(desde + duracion for _, desde, duracion, _ in self.fases)
+
+    def imprimir(self):
+        """Tabla de fases ordenadas por el momento en que empezaron"""
+        with self._lock:
+            fases = sorted(self.fases, key=lambda fase: fase[1])
+
+        print("\n⏱️  PERFIL DE ARRANQUE:")
+        print(f"   {'Fase':<32} {'Inicio':>10} {'Duración':>10}  Hilo")
+        for nombre, desde, duracion, hilo in fases:
+            print(f"   {nombre:<32} {desde * 1000:8.1f}ms {duracion * 1000:8.1f}ms  {hilo}")
+        print(f"   {'Total':<32} {'':>10} {self.total() * 1000:8.1f}ms")
@@ -0,0 +1,478 @@
+import html
+import io
+import os
+import select
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import wave
+from collections import deque
+
+
+# espeak --stdout no marca dónde acaba cada frase: se le pide (por SSML) un silencio
+# de CENTINELA_MS tras cada una y, como el audio llega en orden, una racha de muestras
+# a cero de al menos FIN_CENTINELA segundos (más larga que cualquier pausa natural)
+# indica que la frase terminó. El resto del centinela se descarta antes de la siguiente
+CENTINELA_MS = 3000
+FIN_CENTINELA = 1.5
+# Más que esto sin audio (o sin respuesta de festival) se trata como proceso colgado
+ESPERA_RESPUESTA = 10.0
+ESPERA_ARRANQUE = 10.0
+
+BLOQUE_LECTURA = 8192
+LATENCIAS_GUARDADAS = 200
+
+# Separador del protocolo del servidor de festival tras cada forma de onda o expresión
+CLAVE_FESTIVAL = b'ft_StUfF_key'
+
+
+class ErrorProceso(Exception):
+    """El co-proceso TTS murió o dejó de responder"""
+
+
+def percentil(valores, fraccion):
+    if not valores:
+        return None
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * fraccion))]
+
+
+class SalidaAudio:
+    """Reproduce PCM a medida que llega (PyAudio, o un aplay que queda abierto).
+
+    Lleva la cuenta del audio enviado para que terminar() espere a que suene
+    entero: aplay acepta los datos antes de reproducirlos.
+    """
+
+    def __init__(self):
+        self.formato_actual = None
+        self._pyaudio = None
+        self._stream = None
+        self._aplay = None
+        self._bytes_por_segundo = 1
+        self._fin_previsto = 0.0
+
+    @staticmethod
+    def disponible():
+        try:
+            import pyaudio  # noqa: F401
+            return True
+        except ImportError:
+            return shutil.which('aplay') is not None
+
+    def formato(self, frecuencia, canales, ancho):
+        if (frecuencia, canales, ancho) == self.formato_actual:
+            return
+        self.cerrar()
+        self.formato_actual = (frecuencia, canales, ancho)
+        self._bytes_por_segundo = frecuencia * canales * ancho
+        try:
+            import pyaudio
+            self._pyaudio = pyaudio.PyAudio()
+            self._stream = self._pyaudio.open(format=self._pyaudio.get_format_from_width(ancho),
+                                              channels=canales, rate=frecuencia, output=True)
+        except ImportError:
+            tipo = 'U8' if ancho == 1 else f'S{ancho * 8}_LE'
+            self._aplay = subprocess.Popen(['aplay', '-q', '-t', 'raw', '-f', tipo, '-r', str(frecuencia),
+                                            '-c', str(canales)], stdin=subprocess.PIPE)
+
+    def empezar(self):
+        pass
+
+    def escribir(self, datos):
+        self._fin_previsto = max(self._fin_previsto, time.monotonic()) + len(datos) / self._bytes_por_segundo
+        if self._stream is not None:
+            self._stream.write(datos)
+        else:
+            self._aplay.stdin.write(datos)
+            self._aplay.stdin.flush()
+
+    def terminar(self):
+        """Espera a que acabe de sonar lo enviado"""
+        restante = self._fin_previsto - time.monotonic()
+        if restante > 0:
+            time.sleep(restante)
+
+    def cerrar(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+        if self._aplay is not None:
+            try:
+                self._aplay.stdin.close()
+                self._aplay.wait(5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._aplay.kill()
+            self._aplay = None
+        self.formato_actual = None
+
+
+class DestinoWav:
+    """Guarda en un WAV el audio de una locución en lugar de reproducirlo"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.wav = None
+
+    def formato(self, frecuencia, canales, ancho):
+        if self.wav is None:
+            self.wav = wave.open(self.ruta, 'wb')
+            self.wav.setframerate(frecuencia)
+            self.wav.setnchannels(canales)
+            self.wav.setsampwidth(ancho)
+
+    def empezar(self):
+        # Si se repite la locución tras un reinicio, el archivo empieza de nuevo
+        self.terminar()
+        self.wav = None
+
+    def escribir(self, datos):
+        self.wav.writeframes(datos)
+
+    def terminar(self):
+        if self.wav is not None:
+            self.wav.close()
+
+
+class ProcesoTTS:
+    """Motor TTS en un proceso que se arranca una vez y recibe las frases por tubería o socket.
+
+    Cada frase se manda al proceso ya abierto, sin pagar su arranque; si se
+    cae o deja de responder, se arranca otro y la frase se repite una vez.
+    De cada locución se guarda la latencia hasta el primer audio y hasta que
+    termina de sonar.
+    """
+
+    nombre = None
+
+    def __init__(self, verboso=True):
+        self.verboso = verboso
+        self.proceso = None
+        self.salida = SalidaAudio()
+        self._lock = threading.Lock()
+
+        self.latencias = deque(maxlen=LATENCIAS_GUARDADAS)  # (primer audio, total) en segundos
+        self.locuciones = 0
+        self.reinicios = 0
+        self.errores = 0
+
+    def iniciar(self):
+        with self._lock:
+            if self.proceso is None:
+                self._arrancar()
+        return self
+
+    def vivo(self):
+        return self.proceso is not None and self.proceso.poll() is None
+
+    def decir(self, texto, destino=None):
+        """Sintetiza y reproduce el texto (o lo manda a destino); vuelve al terminar.
+
+        Devuelve (segundos hasta el primer audio, segundos en total), o None si
+        el texto no tiene nada que decir.
+        """
+        texto = ' '.join(texto.split())
+        if not any(caracter.isalnum() for caracter in texto):
+            return None
+        destino = destino or self.salida
+
+        with self._lock:
+            for intento in range(2):
+                inicio = time.monotonic()
+                try:
+                    if self.proceso is not None and not self.vivo():
+                        self.reinicios += 1
+                        self._parar()
+                    if self.proceso is None:
+                        self._arrancar()
+                    destino.empezar()
+                    primer_audio = self._locucion(texto, destino)
+                    destino.terminar()
+                except (OSError, ValueError, ErrorProceso) as e:
+                    self.errores += 1
+                    self._parar()
+                    if destino is self.salida:
+                        self.salida.cerrar()
+                    if intento:
+                        raise ErrorProceso(f"{self.nombre} no responde: {e}") from e
+                    if self.verboso:
+                        print(f"⚠️  {self.nombre} se detuvo ({e}); reiniciando")
+                    self.reinicios += 1
+                    continue
+
+                latencia = (primer_audio - inicio, time.monotonic() - inicio)
+                self.latencias.append(latencia)
+                self.locuciones += 1
+                return latencia
+
+    def a_archivo(self, texto, ruta):
+        """Sintetiza el texto a un WAV"""
+        destino = DestinoWav(ruta)
+        try:
+            self.decir(texto, destino)
+        finally:
+            destino.terminar()
+
+    def cerrar(self):
+        with self._lock:
+            self._parar()
+        self.salida.cerrar()
+
+    def _arrancar(self):
+        raise NotImplementedError
+
+    def _locucion(self, texto, destino):
+        """Manda una frase y pasa su audio a destino; devuelve cuándo llegó el primer audio"""
+        raise NotImplementedError
+
+    def _parar(self):
+        if self.proceso is None:
+            return
+        try:
+            if self.proceso.stdin:
+                self.proceso.stdin.close()
+            self.proceso.terminate()
+            self.proceso.wait(2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proceso.kill()
+        self.proceso = None
+
+    def estadisticas(self):
+        primeras = [primera for primera, _ in self.latencias]
+        totales = [total for _, total in self.latencias]
+
+        def ms(valor):
+            return None if valor is None else round(valor * 1000, 1)
+
+        return {
+            'motor': self.nombre,
+            'activo': self.vivo(),
+            'locuciones': self.locuciones,
+            'reinicios': self.reinicios,
+            'errores': self.errores,
+            'primer_audio_ms': ms(percentil(primeras, 0.5)),
+            'primer_audio_p95_ms': ms(percentil(primeras, 0.95)),
+            'total_ms': ms(percentil(totales, 0.5)),
+            'ultima_ms': ms(totales[-1]) if totales else None,
+        }
+
+
+class ProcesoEspeak(ProcesoTTS):
+    """espeak --stdin --stdout: lee una frase por línea y escribe su audio como un WAV continuo.
+
+    Cada frase va seguida de un silencio centinela (ver CENTINELA_MS) con el que
+    se sabe dónde acaba, tarde lo que tarde en llegar su audio.
+    """
+
+    nombre = 'espeak'
+
+    def __init__(self, voz='es+f3', velocidad=180, programa='espeak', verboso=True):
+        super().__init__(verboso)
+        self.voz = voz
+        self.velocidad = velocidad
+        self.programa = programa
+        self._formato = None
+        self._resto = b''
+        self._bytes_fin = None
+
+    def configurar(self, velocidad):
+        """Cambia la velocidad; el proceso se reinicia con ella en la próxima frase"""
+        with self._lock:
+            if velocidad != self.velocidad:
+                self.velocidad = velocidad
+                self._parar()
+
+    def _arrancar(self):
+        if not self.salida.disponible():
+            raise ErrorProceso("sin salida de audio (PyAudio o aplay)")
+        self.proceso = subprocess.Popen(
+            [self.programa, '-m', '-v', self.voz, '-s', str(self.velocidad), '--stdin', '--stdout'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+        # La cabecera WAV llega con el audio de la primera frase
+        self._formato = None
+        self._resto = b''
+        self._bytes_fin = None
+
+    def _leer(self, espera):
+        """Lo que haya en la salida de espeak, esperando como mucho 'espera' segundos (b'' si nada)"""
+        salida = self.proceso.stdout.fileno()
+        listos, _, _ = select.select([salida], [], [], espera)
+        if not listos:
+            return b''
+        datos = os.read(salida, BLOQUE_LECTURA)
+        if not datos:
+            raise ErrorProceso(f"{self.programa} terminó (código {self.proceso.wait()})")
+        return datos
+
+    def _descartar_restos(self):
+        """Lo que queda en la tubería de la frase anterior (el final de su centinela)"""
+        if self._formato is None:
+            return  # aún no llegó la cabecera: no hubo frase anterior
+        marco = self._formato[1] * self._formato[2]
+        while True:
+            leido = self._leer(0)
+            if not leido:
+                return
+            # Se conserva el marco a medias para no desalinear las muestras siguientes
+            datos = self._resto + leido
+            self._resto = datos[len(datos) - len(datos) % marco:]
+
+    def _locucion(self, texto, destino):
+        self._descartar_restos()
+        # -m: el texto es SSML, así que se escapa y el centinela es un <break>
+        linea = f'{html.escape(texto, quote=False)} <break time="{CENTINELA_MS}ms"/>\n'
+        self.proceso.stdin.write(linea.encode('utf-8'))
+
+        primer_audio = None
+        ceros = 0  # bytes a cero retenidos al final: pausa dentro de la frase o centinela
+        while True:
+            leido = self._leer(ESPERA_RESPUESTA)
+            if not leido:
+                if primer_audio is None:
+                    raise ErrorProceso(f"{self.programa} no devolvió audio")
+                raise ErrorProceso(f"{self.programa} no terminó la frase")
+
+            datos = self._resto + leido
+            if self._formato is None:
+                # La cabecera WAV llega una sola vez, con el audio de la primera frase
+                if len(datos) < 44:
+                    self._resto = datos
+                    continue
+                with wave.open(io.BytesIO(datos[:44]), 'rb') as cabecera:
+                    self._formato = (cabecera.getframerate(), cabecera.getnchannels(), cabecera.getsampwidth())
+                frecuencia, canales, ancho = self._formato
+                self._bytes_fin = int(FIN_CENTINELA * frecuencia) * canales * ancho
+                datos = datos[44:]
+            destino.formato(*self._formato)
+
+            # Solo marcos completos: una lectura puede cortar una muestra por la mitad
+            marco = self._formato[1] * self._formato[2]
+            completos = len(datos) - len(datos) % marco
+            self._resto = datos[completos:]
+            datos = datos[:completos]
+
+            # Los ceros del final se retienen hasta saber si son una pausa (les sigue
+            # audio) o el centinela; los de antes del primer audio no se reproducen
+            hasta = len(datos.rstrip(b'\x00'))
+            hasta += -hasta % marco
+            if hasta:
+                if primer_audio is None:
+                    primer_audio = time.monotonic()
+                    ceros = 0
+                destino.escribir(bytes(ceros) + datos[:hasta])
+                ceros = 0
+            ceros += len(datos) - hasta
+
+            if primer_audio is not None and ceros >= self._bytes_fin:
+                return primer_audio
+
+
+def puerto_libre():
+    with socket.socket() as prueba:
+        prueba.bind(('127.0.0.1', 0))
+        return prueba.getsockname()[1]
+
+
+def escapar_scheme(texto):
+    return texto.replace('\\', '\\\\').replace('"', '\\"')
+
+
+class ProcesoFestival(ProcesoTTS):
+    """festival --server en un puerto local; el cliente pide cada frase y recibe su forma de onda.
+
+    Con (tts_return_to_client) el servidor no reproduce: devuelve un WAV por
+    enunciado, así que las frases largas empiezan a sonar con el primero.
+    """
+
+    nombre = 'festival'
+
+    def __init__(self, programa='festival', verboso=True):
+        super().__init__(verboso)
+        self.programa = programa
+        self.puerto = None
+        self.conexion = None
+        self._buffer = b''
+
+    def _arrancar(self):
+        if not self.salida.disponible():
+            raise ErrorProceso("sin salida de audio (PyAudio o aplay)")
+        self.puerto = puerto_libre()
+        self.proceso = subprocess.Popen(
+            [self.programa, '--server', f'(set! server_port {self.puerto})'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        limite = time.monotonic() + ESPERA_ARRANQUE
+        while self.conexion is None:
+            try:
+                self.conexion = socket.create_connection(('127.0.0.1', self.puerto), timeout=ESPERA_RESPUESTA)
+            except OSError:
+                if self.proceso.poll() is not None or time.monotonic() > limite:
+                    self._parar()
+                    raise ErrorProceso("el servidor de festival no arrancó")
+                time.sleep(0.05)
+        self._buffer = b''
+
+        self._orden("(Parameter.set 'Wavefiletype 'riff)", None)
+        self._orden("(tts_return_to_client)", None)
+
+    def _parar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+        super()._parar()
+
+    def _recibir(self, n):
+        while len(self._buffer) < n:
+            datos = self.conexion.recv(BLOQUE_LECTURA)
+            if not datos:
+                raise ErrorProceso("el servidor de festival cerró la conexión")
+            self._buffer += datos
+        datos, self._buffer = self._buffer[:n], self._buffer[n:]
+        return datos
+
+    def _recibir_hasta_clave(self):
+        while CLAVE_FESTIVAL not in self._buffer:
+            datos = self.conexion.recv(BLOQUE_LECTURA)
+            if not datos:
+                raise ErrorProceso("el servidor de festival cerró la conexión")
+            self._buffer += datos
+        datos, _, self._buffer = self._buffer.partition(CLAVE_FESTIVAL)
+        return datos
+
+    def _descartar_restos(self):
+        """Lo que quede sin leer de una respuesta anterior, para no tomarlo por la de esta orden"""
+        self._buffer = b''
+        while select.select([self.conexion], [], [], 0)[0]:
+            if not self.conexion.recv(BLOQUE_LECTURA):
+                raise ErrorProceso("el servidor de festival cerró la conexión")
+
+    def _orden(self, expresion, destino):
+        """Envía una expresión y lee la respuesta hasta OK (o ER); devuelve cuándo llegó el primer audio"""
+        self._descartar_restos()
+        self.conexion.sendall(expresion.encode('utf-8') + b'\n')
+        primer_audio = None
+        while True:
+            respuesta = self._recibir(3)
+            if respuesta == b'OK\n':
+                return primer_audio
+            if respuesta == b'ER\n':
+                raise ErrorProceso(f"festival no pudo evaluar {expresion[:40]}")
+            datos = self._recibir_hasta_clave()
+            if respuesta == b'WV\n' and destino is not None:
+                if primer_audio is None:
+                    primer_audio = time.monotonic()
+                with wave.open(io.BytesIO(datos), 'rb') as wav:
+                    destino.formato(wav.getframerate(), wav.getnchannels(), wav.getsampwidth())
+                    destino.escribir(wav.readframes(wav.getnframes()))
+
+    def _locucion(self, texto, destino):
+        primer_audio = self._orden(f'(SayText "{escapar_scheme(texto)}")', destino)
+        if primer_audio is None:
+            raise ErrorProceso("festival no devolvió audio")
+        return primer_audio
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+LATENCIAS_GUARDADAS = 200
+
+
+class EstadisticasMotor:
+    """Cuántas veces ganó cada motor y cuánto tarda en decodificar"""
+
+    def __init__(self):
+        self.intentos = 0
+        self.ganadas = 0
+        self.vacias = 0
+        self.errores = 0
+        self.latencias = deque(maxlen=LATENCIAS_GUARDADAS)
+
+    def resumen(self):
+        latencias = sorted(self.latencias)
+        mediana = latencias[len(latencias) // 2] if latencias else None
+        return {
+            'intentos': self.intentos,
+            'ganadas': self.ganadas,
+            'tasa_victoria': round(self.ganadas / self.intentos, 3) if self.intentos else None,
+            'vacias': self.vacias,
+            'errores': self.errores,
+            'latencia_ms': round(mediana * 1000, 1) if mediana is not None else None,
+        }
+
+
+class OrquestadorReconocimiento:
+    """Decodifica la misma frase con todos los motores a la vez y se queda con la primera válida.
+
+    Una hipótesis vale en cuanto llega si aceptar(texto) la da por buena (p. ej.
+    se entiende como orden de la calculadora); los motores que sigan
+    decodificando no se pueden interrumpir, pero su resultado se ignora. Si
+    ninguna pasa el filtro se devuelve la no vacía del motor que va antes en
+    la lista, como hacía el orden fijo Sphinx → Vosk.
+    """
+
+    def __init__(self, motores, aceptar=None, verboso=True):
+        # nombre -> función(audio) que devuelve el texto ('' si no entendió)
+        self.motores = dict(motores)
+        self.aceptar = aceptar
+        self.verboso = verboso
+
+        self.pool = ThreadPoolExecutor(max_workers=len(self.motores), thread_name_prefix='reconocer')
+        self.estadisticas_motor = {nombre: EstadisticasMotor() for nombre in self.motores}
+        self._lock = threading.Lock()
+        self.ultima_latencia = None
+
+    def _decodificar(self, nombre, audio):
+        """Ejecuta un motor y anota su latencia; devuelve el texto o None si falló"""
+        estadisticas = self.estadisticas_motor[nombre]
+        inicio = time.perf_counter()
+        try:
+            texto = (self.motores[nombre](audio) or '').strip()
+        except Exception as e:
+            texto = None
+            if self.verboso:
+                print(f"⚠️  Error {nombre.capitalize()}: {e}")
+        with self._lock:
+            estadisticas.intentos += 1
+            estadisticas.latencias.append(time.perf_counter() - inicio)
+            if texto is None:
+                estadisticas.errores += 1
+            elif not texto:
+                estadisticas.vacias += 1
+        return texto
+
+    def reconocer(self, audio, nombres=None):
+        """Devuelve (texto, motor) de la hipótesis elegida, o (None, None) si nadie entendió"""
+        nombres = [nombre for nombre in (nombres or self.motores) if nombre in self.motores]
+        inicio = time.perf_counter()
+        futuros = {self.pool.submit(self._decodificar, nombre, audio): nombre for nombre in nombres}
+
+        hipotesis = {}
+        elegido = None
+        pendientes = set(futuros)
+        while pendientes and elegido is None:
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                texto = futuro.result()
+                if not texto:
+                    continue
+                nombre = futuros[futuro]
+                hipotesis[nombre] = texto
+                if self.aceptar is None or self.aceptar(texto.lower()):
+                    elegido = nombre
+                    break
+
+        if elegido is None:
+            # Ninguna se entiende como orden: la del motor preferido
+            elegido = next((nombre for nombre in nombres if nombre in hipotesis), None)
+        for futuro in pendientes:
+            futuro.cancel()
+
+        self.ultima_latencia = time.perf_counter() - inicio
+        if elegido is None:
+            return None, None
+        with self._lock:
+            self.estadisticas_motor[elegido].ganadas += 1
+        return hipotesis[elegido], elegido
+
+    def estadisticas(self):
+        with self._lock:
+            return {nombre: estadisticas.resumen() for nombre, estadisticas in self.estadisticas_motor.items()}
+
+    def cerrar(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
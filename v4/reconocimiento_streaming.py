@@ -0,0 +1,180 @@
+import json
+import time
+
+import speech_recognition as sr
+from speech_recognition import dsp
+
+
+class SesionVosk:
+    """Alimenta un KaldiRecognizer residente trozo a trozo"""
+
+    nombre = 'vosk'
+
+    def __init__(self, gestor_vosk, sample_rate):
+        self.gestor_vosk = gestor_vosk
+        self.sample_rate = sample_rate
+        self.rec = None
+
+    def iniciar(self):
+        # El reconocedor queda reservado durante toda la frase
+        self.rec = self.gestor_vosk.tomar_reconocedor(self.sample_rate)
+        return self.rec is not None
+
+    def alimentar(self, pcm16):
+        self.rec.AcceptWaveform(pcm16)
+
+    def finalizar(self):
+        try:
+            return json.loads(self.rec.FinalResult()).get('text', '')
+        finally:
+            self.rec = None
+            self.gestor_vosk.soltar_reconocedor()
+
+    def cancelar(self):
+        if self.rec is not None:
+            self.rec = None
+            self.gestor_vosk.soltar_reconocedor()
+
+
+class SesionSphinx:
+    """Alimenta un decodificador PocketSphinx del pool con full_utt=False"""
+
+    nombre = 'sphinx'
+    FRECUENCIA = 16000  # los modelos de PocketSphinx esperan 16 kHz
+
+    def __init__(self, idioma, sample_rate, grammar=None):
+        self.idioma = idioma
+        self.sample_rate = sample_rate
+        self.grammar = grammar
+        self.pool = None
+        self.decoder = None
+        self.estado_resample = None
+
+    def iniciar(self):
+        from speech_recognition.recognizers import pocketsphinx as sr_pocketsphinx
+
+        self.pool = sr_pocketsphinx.get_decoder_pool(self.idioma, grammar=self.grammar)
+        self.decoder = self.pool.take()
+        try:
+            self.decoder.start_utt()
+        except Exception:
+            self.pool.discard(self.decoder)
+            self.decoder = None
+            raise
+        return True
+
+    def alimentar(self, pcm16):
+        if self.sample_rate != self.FRECUENCIA:
+            pcm16, self.estado_resample = dsp.ratecv(
+                pcm16, 2, 1, self.sample_rate, self.FRECUENCIA, self.estado_resample)
+        self.decoder.process_raw(pcm16, False, False)
+
+    def finalizar(self):
+        decoder, self.decoder = self.decoder, None
+        try:
+            decoder.end_utt()
+            hipotesis = decoder.hyp()
+        except Exception:
+            self.pool.discard(decoder)
+            raise
+        self.pool.release(decoder)
+        return hipotesis.hypstr if hipotesis is not None else ''
+
+    def cancelar(self):
+        if self.decoder is not None:
+            self.pool.discard(self.decoder)
+            self.decoder = None
+
+
+class ReconocedorStreaming:
+    """Decodifica la frase mientras se escucha, usando listen(stream=True).
+
+    Al final se elige la hipótesis igual que OrquestadorReconocimiento: la del
+    primer motor (en orden de preferencia) que aceptar(texto) da por buena y,
+    si ninguna lo es, la primera no vacía.
+    """
+
+    def __init__(self, recognizer, gestor_vosk=None, idioma_sphinx='es-ES', aceptar=None, verboso=True):
+        self.recognizer = recognizer
+        self.gestor_vosk = gestor_vosk
+        self.idioma_sphinx = idioma_sphinx
+        self.aceptar = aceptar
+        self.verboso = verboso
+        self.grammar_sphinx = None
+        self.ultima_latencia = None
+
+    def crear_sesiones(self, motores, sample_rate):
+        """Crea e inicia una sesión por motor disponible (en orden de preferencia)"""
+        sesiones = []
+        for motor in motores:
+            if motor == 'sphinx':
+                sesion = SesionSphinx(self.idioma_sphinx, sample_rate, self.grammar_sphinx)
+            elif motor == 'vosk' and self.gestor_vosk is not None:
+                sesion = SesionVosk(self.gestor_vosk, sample_rate)
+            else:
+                continue
+            try:
+                if sesion.iniciar():
+                    sesiones.append(sesion)
+            except Exception as e:
+                if self.verboso:
+                    print(f"⚠️  No se pudo iniciar {motor} en streaming: {e}")
+        return sesiones
+
+    def escuchar(self, source, motores, timeout=None, phrase_time_limit=None):
+        """Escucha una frase alimentando los motores en vivo; devuelve (texto, motor)"""
+        sesiones = self.crear_sesiones(motores, source.SAMPLE_RATE)
+        if not sesiones:
+            raise sr.RequestError("ningún motor offline admite streaming")
+
+        try:
+            for trozo in self.recognizer.listen(source, timeout=timeout,
+                                                phrase_time_limit=phrase_time_limit, stream=True):
+                pcm16 = trozo.frame_data
+                if trozo.sample_width != 2:
+                    pcm16 = dsp.lin2lin(pcm16, trozo.sample_width, 2)
+                for sesion in list(sesiones):
+                    try:
+                        sesion.alimentar(pcm16)
+                    except Exception as e:
+                        if self.verboso:
+                            print(f"⚠️  Error {sesion.nombre} en streaming: {e}")
+                        sesion.cancelar()
+                        sesiones.remove(sesion)
+        except BaseException:
+            for sesion in sesiones:
+                sesion.cancelar()
+            raise
+
+        # Fin de frase detectado: solo queda cerrar la hipótesis de cada motor
+        inicio = time.perf_counter()
+        texto, motor = self.elegir_hipotesis(sesiones)
+        self.ultima_latencia = time.perf_counter() - inicio
+
+        if self.verboso:
+            print(f"⚡ Hipótesis final en {self.ultima_latencia * 1000:.1f} ms tras el fin de frase")
+
+        if not texto:
+            raise sr.UnknownValueError()
+        return texto, motor
+
+    def elegir_hipotesis(self, sesiones):
+        """Cierra las sesiones hasta dar con una orden válida; devuelve (texto, motor)"""
+        primera = ('', None)
+        for indice, sesion in enumerate(sesiones):
+            try:
+                texto = sesion.finalizar().strip()
+            except Exception as e:
+                if self.verboso:
+                    print(f"⚠️  Error {sesion.nombre} al finalizar: {e}")
+                continue
+            if not texto:
+                continue
+            if self.aceptar is None or self.aceptar(texto.lower()):
+                for resto in sesiones[indice + 1:]:
+                    resto.cancelar()
+                return texto, sesion.nombre
+            if not primera[0]:
+                primera = (texto, sesion.nombre)
+        # Ninguna se entiende como orden: la del motor preferido
+        return primera
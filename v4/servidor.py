@@ -0,0 +1,132 @@
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+
+
+def ruta_socket_por_defecto():
+    """Socket por usuario en el directorio temporal (CALCULADORA_SOCKET lo cambia)"""
+    ruta = os.environ.get('CALCULADORA_SOCKET')
+    if ruta:
+        return ruta
+    return os.path.join(tempfile.gettempdir(), f'calculadora_voz_{os.getuid()}.sock')
+
+
+def enviar_comando(comando, ruta=None, timeout=5.0):
+    """Cliente: envía un comando al servidor y devuelve su respuesta (dict).
+
+    Devuelve None si no hay ningún servidor escuchando, para que quien llama
+    pueda resolver el comando por su cuenta.
+    """
+    ruta = ruta or ruta_socket_por_defecto()
+    if not os.path.exists(ruta):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexion:
+            conexion.settimeout(timeout)
+            conexion.connect(ruta)
+            conexion.sendall(json.dumps({'comando': comando}, ensure_ascii=False).encode('utf-8') + b'\n')
+            with conexion.makefile('r', encoding='utf-8') as respuesta:
+                linea = respuesta.readline()
+    except (ConnectionRefusedError, FileNotFoundError):
+        return None
+    except OSError as e:
+        # Servidor colgado (timeout) o socket de otro usuario (permisos)
+        print(f"⚠️  El servidor de {ruta} no responde ({e}); se resuelve el comando aquí")
+        return None
+    if not linea:
+        return None
+    try:
+        return json.loads(linea)
+    except ValueError:
+        print(f"⚠️  Respuesta no válida del servidor de {ruta}; se resuelve el comando aquí")
+        return None
+
+
+class ManejadorComandos(socketserver.StreamRequestHandler):
+    """Una petición JSON por línea, una respuesta JSON por línea"""
+
+    def handle(self):
+        for linea in self.rfile:
+            if not linea.strip():
+                continue
+            try:
+                peticion = json.loads(linea)
+                respuesta = self.server.ejecutar(str(peticion.get('comando', '')))
+            except ValueError as e:
+                respuesta = {'estado': 'error', 'mensajes': [f"Petición no válida: {e}"]}
+            self.wfile.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            if respuesta.get('estado') == 'servidor_detenido':
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class ServidorCalculadora(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Mantiene una calculadora inicializada y atiende comandos por un socket Unix"""
+
+    daemon_threads = True
+
+    def __init__(self, calculadora, ruta=None):
+        self.calculadora = calculadora
+        self.ruta = ruta or ruta_socket_por_defecto()
+        # La calculadora guarda estado (último resultado, historial): un comando cada vez
+        self._lock = threading.Lock()
+        self.comandos_atendidos = 0
+
+        self.limpiar_socket_huerfano()
+        # El socket nace ya con permisos 0600: con chmod después de bind otro usuario podría conectarse antes
+        mascara = os.umask(0o177)
+        try:
+            super().__init__(self.ruta, ManejadorComandos)
+        finally:
+            os.umask(mascara)
+
+    def limpiar_socket_huerfano(self):
+        """Borra el socket de un servidor que ya no existe; falla si hay uno vivo"""
+        if not os.path.exists(self.ruta):
+            return
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as prueba:
+                prueba.connect(self.ruta)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.ruta)
+            return
+        except OSError as e:
+            raise RuntimeError(f"No se puede usar el socket {self.ruta}: {e}")
+        raise RuntimeError(f"Ya hay un servidor escuchando en {self.ruta}")
+
+    def ejecutar(self, comando):
+        """Procesa un comando y devuelve lo que la calculadora habría dicho"""
+        calc = self.calculadora
+        with self._lock:
+            inicio = time.perf_counter()
+            calc.salida_hablar = []
+            try:
+                estado = calc.procesar_comando_voz(comando)
+            except SystemExit:
+                # "salir" detiene el servidor en lugar del proceso desde este hilo
+                estado = 'servidor_detenido'
+            except Exception as e:
+                calc.salida_hablar.append(f"Error: {e}")
+                estado = 'error'
+            finally:
+                mensajes, calc.salida_hablar = calc.salida_hablar, None
+            self.comandos_atendidos += 1
+
+            respuesta = {'estado': estado, 'mensajes': mensajes,
+                         'ms': round((time.perf_counter() - inicio) * 1000, 3)}
+            if estado == 'operacion_exitosa':
+                respuesta['resultado'] = calc.ultimo_resultado
+            return respuesta
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.ruta)
+        except OSError:
+            pass
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los módulos de la calculadora y las librerías copiadas en el venv (speech_recognition, pyttsx3)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, 'lib', 'python3.12', 'site-packages'))
+sys.path.insert(0, RAIZ)
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+import pytest
+
+import main
+from calculadora_texto import CalculadoraTexto
+from historial_sqlite import HistorialSQLite
+
+
+@pytest.fixture
+def nucleo(tmp_path):
+    historial = HistorialSQLite(str(tmp_path / 'historial.db'), verboso=False).iniciar()
+    yield CalculadoraTexto(diario=historial, consultas=historial)
+    historial.cerrar()
+
+
+def test_historial_de_hoy(nucleo):
+    nucleo.procesar_comando('dos más tres')
+    nucleo.procesar_comando('raíz cuadrada de nueve')
+    estado, mensajes = nucleo.procesar_comando('historial de hoy')
+    assert estado == 'comando_especial'
+    assert mensajes[0] == "Hoy has hecho 2 operaciones. Te leo las últimas 5:"
+    assert mensajes[1].endswith("dos más tres = 5")
+
+
+def test_suma_de_todos_los_resultados(nucleo):
+    nucleo.procesar_comando('dos más tres')
+    nucleo.procesar_comando('diez por dos')
+    assert nucleo.procesar_comando('suma de todos los resultados') == \
+        ('comando_especial', ["La suma de los 2 resultados es 25"])
+
+
+def test_ultima_de_un_tipo(nucleo):
+    nucleo.procesar_comando('raíz cuadrada de nueve')
+    nucleo.procesar_comando('dos más tres')
+    _, mensajes = nucleo.procesar_comando('cuál fue la última raíz cuadrada')
+    hoy = datetime.now().date().isoformat()
+    assert mensajes[0].startswith(f"La última raíz cuadrada fue raíz cuadrada de nueve = 3, el {hoy}")
+    assert nucleo.procesar_comando('cuál fue la última división')[1] == ["No hay ninguna división en el historial"]
+
+
+def test_sin_consultas_historial_de_hoy_lee_la_sesion():
+    nucleo = CalculadoraTexto()
+    nucleo.procesar_comando('dos más tres')
+    _, mensajes = nucleo.procesar_comando('historial de hoy')
+    assert mensajes[0] == "Tienes 1 operaciones en el historial. Te leo las últimas 5:"
+
+
+def calculadora_voz(nucleo):
+    """CalculadoraVozOffline sin audio: solo el núcleo, que es lo que usan estos caminos"""
+    calculadora = object.__new__(main.CalculadoraVozOffline)
+    calculadora.nucleo = nucleo
+    return calculadora
+
+
+@pytest.mark.parametrize('frase, esperado', [
+    ('historial de hoy', "Hoy has hecho 1 operaciones. Te leo las últimas 5:"),
+    ('dime la suma de todos los resultados', "La suma de los 1 resultados es 5"),
+    ('cuál fue la última suma', "La última suma fue dos más tres = 5"),
+])
+def test_consultas_llegan_por_voz(nucleo, frase, esperado):
+    """Las consultas van antes que la tabla de comandos especiales ('historial' las tapaba)"""
+    mensajes = []
+    nucleo.decir = mensajes.append
+    nucleo.procesar_comando('dos más tres')
+    mensajes.clear()
+
+    calculadora = calculadora_voz(nucleo)
+    assert calculadora.es_orden_valida(frase)
+    assert calculadora.procesar_comandos_especiales(frase)
+    assert mensajes[0].startswith(esperado)
+
+
+def calculadora_voz_completa(nucleo):
+    """Lo que usa procesar_comando_voz, con hablar() guardando los mensajes (como en modo servidor)"""
+    calculadora = calculadora_voz(nucleo)
+    calculadora.config = {'modo_verboso': False}
+    calculadora.salida_hablar = []
+    calculadora.pausado = False
+    nucleo.decir = calculadora.hablar
+    return calculadora
+
+
+@pytest.mark.parametrize('frase, esperado', [
+    ('abre paréntesis dos más tres cerrar paréntesis por cuatro', 20),
+    ('resultado anterior menos cuatro', 3),
+    ('siete más uno y continuar', 8),
+])
+def test_operaciones_con_palabras_de_comando(frase, esperado):
+    """'cerrar', 'resultado anterior' o 'continuar' dentro de una operación no disparan el comando"""
+    nucleo = CalculadoraTexto()
+    nucleo.ultimo_resultado = 7
+    calculadora = calculadora_voz_completa(nucleo)
+    assert calculadora.procesar_comando_voz(frase) == 'operacion_exitosa'
+    assert nucleo.ultimo_resultado == esperado
+
+    nucleo.ultimo_resultado = 7
+    assert CalculadoraTexto.procesar_comando(nucleo, frase)[0] == 'operacion_exitosa'
+    assert nucleo.ultimo_resultado == esperado
+
+
+def test_los_comandos_siguen_llegando():
+    nucleo = CalculadoraTexto()
+    nucleo.ultimo_resultado = 7
+    calculadora = calculadora_voz_completa(nucleo)
+    assert calculadora.procesar_comando_voz('resultado anterior') == 'comando_especial'
+    assert calculadora.salida_hablar == ["El último resultado es 7"]
+    assert calculadora.procesar_comando_voz('borrar resultado') == 'comando_especial'
+    assert nucleo.ultimo_resultado == 0
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import pytest
+
+from cola_voz import ColaVoz, unir_frases
+
+
+class Sintetizador:
+    """Apunta lo que se dice; mientras 'bloqueo' no esté puesto, el hilo de voz se queda en la primera locución"""
+
+    def __init__(self):
+        self.dichos = []
+        self.bloqueo = threading.Event()
+        self.bloqueo.set()
+
+    def __call__(self, texto):
+        self.bloqueo.wait(5)
+        self.dichos.append(texto)
+
+
+@pytest.fixture
+def sintetizador():
+    return Sintetizador()
+
+
+@pytest.fixture
+def cola(sintetizador):
+    cola = ColaVoz(sintetizador, verboso=False).iniciar()
+    yield cola
+    sintetizador.bloqueo.set()
+    cola.detener(timeout=5)
+
+
+def ocupar(cola, sintetizador):
+    """Deja el hilo de voz diciendo 'ocupada' hasta que se suelte el bloqueo"""
+    sintetizador.bloqueo.clear()
+    cola.decir('ocupada')
+    while not cola._ocupada:
+        time.sleep(0.001)
+
+
+def test_unir_frases():
+    assert unir_frases(['El resultado es 5', '¿Alguna otra operación?']) == \
+        'El resultado es 5. ¿Alguna otra operación?'
+
+
+def test_prioridad_y_union(cola, sintetizador):
+    ocupar(cola, sintetizador)
+    cola.decir('uno', 'baja')
+    cola.decir('dos')
+    cola.decir('tres')
+    sintetizador.bloqueo.set()
+    assert cola.esperar(5)
+    assert sintetizador.dichos == ['ocupada', 'dos. tres', 'uno']
+
+
+def test_alta_cancela_baja(cola, sintetizador):
+    ocupar(cola, sintetizador)
+    baja = cola.decir('luego', 'baja')
+    cola.decir('ya', 'alta')
+    sintetizador.bloqueo.set()
+    assert cola.esperar(5)
+    assert baja.cancelled()
+    assert sintetizador.dichos == ['ocupada', 'ya']
+
+
+def test_baja_caducada_no_se_dice(sintetizador):
+    cola = ColaVoz(sintetizador, max_espera_baja=0.01, verboso=False).iniciar()
+    try:
+        ocupar(cola, sintetizador)
+        baja = cola.decir('tarde', 'baja')
+        time.sleep(0.05)
+        sintetizador.bloqueo.set()
+        assert cola.esperar(5)
+        assert baja.cancelled()
+    finally:
+        cola.detener()
+
+
+def test_esperar_no_espera_al_trabajo_de_fondo(cola, sintetizador):
+    """La caché de frases se rellena de fondo: escuchar() no debe quedarse esperándola"""
+    soltar = threading.Event()
+    en_curso = cola.ejecutar(lambda: soltar.wait(5), 'fondo')
+    pendiente = cola.ejecutar(lambda: True, 'fondo')
+    while not en_curso.running():
+        time.sleep(0.001)
+    assert cola.esperar(0.5)
+
+    # Lo que hay que decir pasa delante del trabajo de fondo que queda
+    dicho = cola.decir('hola', 'baja')
+    assert not cola.esperar(0.05)
+    soltar.set()
+    assert cola.esperar(5)
+    assert dicho.result(1)
+    assert sintetizador.dichos == ['hola']
+    assert pendiente.result(5)
+
+
+def test_detener_descarta_el_trabajo_de_fondo(sintetizador):
+    cola = ColaVoz(sintetizador, verboso=False).iniciar()
+    soltar = threading.Event()
+    ocupar(cola, sintetizador)
+    fondo = [cola.ejecutar(lambda: soltar.wait(5), 'fondo') for _ in range(50)]
+    dicho = cola.decir('adiós')
+    sintetizador.bloqueo.set()
+    threading.Timer(0.2, soltar.set).start()
+    cola.detener(timeout=5)
+    assert dicho.result(1)
+    # Como mucho, el que el hilo ya hubiera empezado
+    assert sum(futuro.cancelled() for futuro in fondo) >= len(fondo) - 1
+
+
+def test_error_del_motor_llega_al_futuro(sintetizador):
+    def fallar(texto):
+        raise RuntimeError('sin audio')
+    cola = ColaVoz(fallar, verboso=False).iniciar()
+    try:
+        with pytest.raises(RuntimeError):
+            cola.decir('hola').result(5)
+    finally:
+        cola.detener()
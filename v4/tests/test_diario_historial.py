@@ -0,0 +1,49 @@
+from diario_historial import DiarioHistorial, leer_cola
+
+
+def escribir(archivo, registros):
+    diario = DiarioHistorial(archivo, verboso=False).iniciar()
+    for registro in registros:
+        diario.registrar(registro)
+    diario.cerrar()
+    return diario
+
+
+def test_escribe_y_lee_la_cola(tmp_path):
+    archivo = str(tmp_path / 'historial.jsonl')
+    diario = escribir(archivo, [{'operacion': f'{i} más 1', 'resultado': i + 1} for i in range(100)])
+    assert diario.escritos == 100
+    assert [registro['resultado'] for registro in leer_cola(archivo, n=3)] == [98, 99, 100]
+    assert leer_cola(archivo, n=0) == []
+
+
+def test_lineas_compactas_una_por_registro(tmp_path):
+    archivo = str(tmp_path / 'historial.jsonl')
+    escribir(archivo, [{'operacion': 'raíz cuadrada de 9', 'resultado': 3}])
+    with open(archivo, encoding='utf-8') as f:
+        assert f.read() == '{"operacion":"raíz cuadrada de 9","resultado":3}\n'
+
+
+def test_ignora_linea_cortada(tmp_path):
+    archivo = str(tmp_path / 'historial.jsonl')
+    escribir(archivo, [{'operacion': '1 más 1', 'resultado': 2}])
+    with open(archivo, 'ab') as f:
+        f.write(b'{"operacion":"2 m')  # corte durante una escritura
+    assert leer_cola(archivo, n=5) == [{'operacion': '1 más 1', 'resultado': 2}]
+
+    # La sesión siguiente no pega su registro a la línea a medias
+    escribir(archivo, [{'operacion': '3 más 3', 'resultado': 6}])
+    assert [registro['resultado'] for registro in leer_cola(archivo, n=5)] == [2, 6]
+
+
+def test_rota_y_lee_los_rotados(tmp_path):
+    archivo = str(tmp_path / 'historial.jsonl')
+    diario = DiarioHistorial(archivo, tamano_maximo=200, lote_maximo=1, verboso=False).iniciar()
+    for i in range(20):
+        diario.registrar({'operacion': f'{i} más 0', 'resultado': i})
+    diario.cerrar()
+    assert diario.rotaciones >= 1
+    assert (tmp_path / 'historial.jsonl.1').exists()
+    resultados = [registro['resultado'] for registro in leer_cola(archivo, n=5)]
+    assert resultados == sorted(resultados)
+    assert resultados[-1] == 19
@@ -0,0 +1,146 @@
+import ctypes
+import importlib
+import sys
+import types
+
+import pytest
+
+
+class Evento:
+    def __init__(self, tipo, posicion=0, longitud=0):
+        self.type = tipo
+        self.text_position = posicion
+        self.length = longitud
+
+
+def espeak_falso():
+    """Lo que usa el driver de la librería de espeak: Synth llama al callback en el acto"""
+    modulo = types.ModuleType('pyttsx3.drivers._espeak')
+    modulo.EVENT_LIST_TERMINATED, modulo.EVENT_WORD, modulo.EVENT_MSG_TERMINATED = 0, 1, 6
+    modulo.AUDIO_OUTPUT_RETRIEVAL, modulo.CHARS_UTF8, modulo.ENDPAUSE = 1, 1, 0x1000
+    modulo.RATE, modulo.VOLUME, modulo.PITCH = 1, 2, 3
+    modulo.callback = None
+    modulo.Initialize = lambda salida, bufer: 22050
+    modulo.GetCurrentVoice = lambda: None
+    modulo.SetVoiceByName = lambda nombre: 0
+    modulo.SetParameter = lambda parametro, valor, relativo: 0
+    modulo.IsPlaying = lambda: False
+    modulo.Cancel = lambda: None
+
+    def SetSynthCallback(callback):
+        modulo.callback = callback
+
+    def Synth(texto, flags=0):
+        muestras = ctypes.create_string_buffer(bytes(range(8)))
+        eventos = [Evento(modulo.EVENT_WORD, 1, len(texto)), Evento(modulo.EVENT_MSG_TERMINATED),
+                   Evento(modulo.EVENT_LIST_TERMINATED)]
+        try:
+            modulo.callback(muestras, 4, eventos)
+        except Exception:
+            pass  # como con ctypes: una excepción no sale del callback
+
+    modulo.SetSynthCallback = SetSynthCallback
+    modulo.Synth = Synth
+    return modulo
+
+
+class PyAudioFalso:
+    creados = 0
+
+    def __init__(self):
+        PyAudioFalso.creados += 1
+        self.terminado = False
+        self.streams = []
+
+    def open(self, **kwargs):
+        stream = types.SimpleNamespace(datos=[], cerrado=False)
+        stream.write = stream.datos.append
+        stream.stop_stream = lambda: None
+        stream.abort = lambda: None
+        stream.close = lambda: setattr(stream, 'cerrado', True)
+        self.streams.append(stream)
+        return stream
+
+    def terminate(self):
+        self.terminado = True
+
+
+class ProxyFalso:
+    def __init__(self):
+        self._name = None
+        self.avisos = []
+
+    def notify(self, tema, **kwargs):
+        self.avisos.append((tema, kwargs))
+
+    def setBusy(self, ocupado):
+        pass
+
+
+@pytest.fixture
+def espeak(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyttsx3.drivers._espeak', espeak_falso())
+    monkeypatch.setitem(sys.modules, 'pyaudio', types.SimpleNamespace(PyAudio=PyAudioFalso, paInt16=8))
+    monkeypatch.delitem(sys.modules, 'pyttsx3.drivers.espeak', raising=False)
+    modulo = importlib.import_module('pyttsx3.drivers.espeak')
+    monkeypatch.setattr(modulo.platform, 'system', lambda: 'Linux')
+    PyAudioFalso.creados = 0
+    yield modulo
+    sys.modules.pop('pyttsx3.drivers.espeak', None)
+
+
+def decir(driver, *textos):
+    for texto in textos:
+        driver.say(texto)
+    driver.endLoop()
+    driver.startLoop()
+
+
+def test_un_pyaudio_por_driver(espeak):
+    driver = espeak.EspeakDriver(ProxyFalso())
+    decir(driver, 'uno', 'dos', 'tres')
+    assert PyAudioFalso.creados == 1
+    audio = driver._pyaudio
+    assert len(audio.streams) == 3 and all(stream.cerrado for stream in audio.streams)
+    assert audio.streams[0].datos == [bytes(range(8))]
+
+    driver.destroy()
+    assert audio.terminado
+
+
+def test_error_de_reproduccion_se_lanza_al_terminar(espeak, monkeypatch):
+    class SalidaRota:
+        def __init__(self, rate):
+            pass
+
+        def write(self, datos):
+            pass
+
+        def close(self, discard=False):
+            raise OSError('dispositivo ocupado')
+
+    monkeypatch.setattr(espeak.EspeakDriver, 'sink_factory', SalidaRota)
+    proxy = ProxyFalso()
+    driver = espeak.EspeakDriver(proxy)
+    with pytest.raises(RuntimeError, match='Playback error: dispositivo ocupado'):
+        decir(driver, 'uno', 'dos')
+
+    temas = [tema for tema, _ in proxy.avisos]
+    assert temas.count('error') == 2
+    assert temas.count('finished-utterance') == 2  # el error no corta lo que quedaba en la cola
+
+    # El error ya se entregó: la siguiente vuelta no lo repite
+    monkeypatch.setattr(espeak.EspeakDriver, 'sink_factory', None)
+    decir(driver, 'tres')
+
+
+def test_error_guardando_wav(espeak, tmp_path, monkeypatch):
+    def cerrar_sin_espacio(sink, discard=False):
+        sink._file.close()
+        raise OSError('disco lleno')
+
+    monkeypatch.setattr(espeak.WaveFileSink, 'close', cerrar_sin_espacio)
+    driver = espeak.EspeakDriver(ProxyFalso())
+    driver.save_to_file('hola', str(tmp_path / 'hola.wav'))
+    with pytest.raises(RuntimeError, match='Error saving WAV file: disco lleno'):
+        decir(driver)
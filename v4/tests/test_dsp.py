@@ -0,0 +1,138 @@
+import math
+import os
+import random
+import subprocess
+import sys
+import warnings
+import wave
+
+import pytest
+
+from speech_recognition import dsp
+
+IMPLEMENTACIONES = ['python'] + (['numpy'] if dsp.np is not None else [])
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:  # Python 3.13+: solo quedan las pruebas sin referencia
+        audioop = None
+
+con_audioop = pytest.mark.skipif(audioop is None, reason="audioop no está disponible")
+
+
+def funcion(implementacion, nombre):
+    return getattr(dsp, f'_{implementacion}_{nombre}')
+
+
+def seno(frecuencia_muestreo, segundos, frecuencia=440, amplitud=10000):
+    n = int(frecuencia_muestreo * segundos)
+    return dsp._pack([round(amplitud * math.sin(2 * math.pi * frecuencia * i / frecuencia_muestreo))
+                      for i in range(n)], 2)
+
+
+def ruido(n):
+    return random.Random(n).randbytes(n)
+
+
+@con_audioop
+@pytest.mark.parametrize('implementacion', IMPLEMENTACIONES)
+@pytest.mark.parametrize('ancho', [1, 2, 3, 4])
+def test_igual_que_audioop(implementacion, ancho):
+    fragmento, otro = ruido(ancho * 1000), ruido(ancho * 1000 + 1)[:ancho * 1000]
+    f = lambda nombre: funcion(implementacion, nombre)
+    assert f('rms')(fragmento, ancho) == audioop.rms(fragmento, ancho)
+    assert f('add')(fragmento, otro, ancho) == audioop.add(fragmento, otro, ancho)
+    for desplazamiento in (-128, 128, 12345, -(1 << 20)):
+        assert f('bias')(fragmento, ancho, desplazamiento) == audioop.bias(fragmento, ancho, desplazamiento)
+    for nuevo_ancho in (1, 2, 3, 4):
+        assert f('lin2lin')(fragmento, ancho, nuevo_ancho) == audioop.lin2lin(fragmento, ancho, nuevo_ancho)
+    assert f('byteswap')(fragmento, ancho) == audioop.byteswap(fragmento, ancho)
+    for izquierda, derecha in ((1, 1), (0.5, 0.5), (0.3, 0.9), (3, -2), (40000, 40000)):
+        assert f('tomono')(fragmento, ancho, izquierda, derecha) == audioop.tomono(fragmento, ancho, izquierda, derecha)
+
+
+@con_audioop
+@pytest.mark.parametrize('entrada, salida', [(44100, 16000), (48000, 16000), (8000, 16000)])
+def test_ratecv_lineal_como_audioop(entrada, salida):
+    """Sin NumPy, ratecv interpola como audioop (salvo el redondeo)"""
+    fragmento = ruido(2 * 4410)
+    referencia, _ = audioop.ratecv(fragmento, 2, 1, entrada, salida, None)
+    propio, _ = dsp._python_ratecv(fragmento, 2, 1, entrada, salida, None)
+    comunes = min(len(referencia), len(propio)) // 2
+    assert abs(len(referencia) - len(propio)) <= 4
+    assert max(abs(a - b) for a, b in zip(dsp._unpack(referencia, 2)[:comunes], dsp._unpack(propio, 2)[:comunes])) <= 1
+
+
+@pytest.mark.parametrize('implementacion', IMPLEMENTACIONES)
+@pytest.mark.parametrize('canales', [1, 2])
+@pytest.mark.parametrize('entrada, salida', [(44100, 16000), (48000, 16000), (8000, 16000), (16000, 24000)])
+def test_ratecv_por_trozos_igual_que_de_una_vez(implementacion, canales, entrada, salida):
+    ratecv = funcion(implementacion, 'ratecv')
+    fragmento = ruido(2 * canales * 3000)
+    de_una_vez, _ = ratecv(fragmento, 2, canales, entrada, salida, None)
+
+    estado, por_trozos = None, b''
+    paso = 2 * canales * 317  # trozos que no coinciden con el periodo del filtro
+    for inicio in range(0, len(fragmento), paso):
+        convertido, estado = ratecv(fragmento[inicio:inicio + paso], 2, canales, entrada, salida, estado)
+        por_trozos += convertido
+    assert por_trozos == de_una_vez
+
+
+@pytest.mark.parametrize('implementacion', IMPLEMENTACIONES)
+@pytest.mark.parametrize('entrada, salida', [(44100, 16000), (8000, 16000), (16000, 24000)])
+def test_resample_longitud_y_calidad(implementacion, entrada, salida):
+    convertido = funcion(implementacion, 'resample')(seno(entrada, 0.25), 2, entrada, salida)
+    muestras = dsp._unpack(convertido, 2)
+    assert len(muestras) == math.ceil(int(entrada * 0.25) * salida / entrada)
+
+    # Lejos de los bordes, el seno convertido sigue al ideal
+    esperado = [10000 * math.sin(2 * math.pi * 440 * i / salida) for i in range(len(muestras))]
+    errores = [muestras[i] - esperado[i] for i in range(50, len(muestras) - 50)]
+    assert math.sqrt(sum(e * e for e in errores) / len(errores)) < 100
+
+
+@pytest.mark.skipif(dsp.np is None, reason="sin NumPy no hay filtro antialiasing")
+def test_resample_filtra_lo_que_no_cabe():
+    """12 kHz no cabe en 16 kHz de muestreo: el filtro lo quita en lugar de plegarlo"""
+    convertido = dsp.resample(seno(48000, 0.25, frecuencia=12000), 2, 48000, 16000)
+    assert dsp.rms(convertido, 2) < 100
+
+
+def test_api_publica_usa_numpy_si_esta():
+    fragmento = ruido(200)
+    esperado = funcion(IMPLEMENTACIONES[-1], 'rms')(fragmento, 2)
+    assert dsp.rms(fragmento, 2) == esperado
+
+
+@pytest.mark.parametrize('implementacion', IMPLEMENTACIONES)
+def test_errores(implementacion):
+    with pytest.raises(ValueError):
+        funcion(implementacion, 'rms')(b'\x00' * 10, 5)
+    with pytest.raises(ValueError):
+        funcion(implementacion, 'rms')(b'\x00' * 3, 2)
+    with pytest.raises(ValueError):
+        funcion(implementacion, 'tomono')(b'\x00' * 6, 2, 1, 1)
+
+
+def test_sin_aifc(tmp_path):
+    """Python 3.13 ya no trae aifc: la librería carga y lee WAV; el AIFF explica qué falta"""
+    ruta = tmp_path / 'tono.wav'
+    with wave.open(str(ruta), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(seno(16000, 0.1))
+    codigo = (
+        "import sys; sys.modules['aifc'] = None\n"
+        "import speech_recognition as sr\n"
+        "with sr.AudioFile(sys.argv[1]) as fuente: audio = sr.Recognizer().record(fuente)\n"
+        "try: audio.get_aiff_data()\n"
+        "except ImportError as e: print(e)\n"
+    )
+    salida = subprocess.run([sys.executable, '-c', codigo, str(ruta)], capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)})
+    assert salida.returncode == 0, salida.stderr
+    assert 'pip install standard-aifc' in salida.stdout
@@ -0,0 +1,63 @@
+import pytest
+
+from expresiones import MotorExpresiones
+from numeros_texto import convertir_numeros_texto
+
+
+@pytest.fixture
+def motor():
+    return MotorExpresiones()
+
+
+def evaluar(motor, texto, ultimo_resultado=0):
+    return motor.evaluar(convertir_numeros_texto(texto), ultimo_resultado)
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    # Frases que ya entendía la gramática de una sola operación
+    ('dos más tres', 5),
+    ('cuánto es diez menos tres por favor', 7),
+    ('el resultado de dos más tres', 5),
+    ('dame el resultado de cinco por dos', 10),
+    ('resta 10 menos 2', 8),
+    ('suma 2 más 3', 5),
+    ('multiplicar tres por cuatro', 12),
+    ('veinte dividido por cuatro', 5),
+    ('raíz cuadrada de 16', 4),
+    # Operaciones encadenadas
+    ('dos más tres por cuatro', 14),
+    ('abre paréntesis dos más tres cierra paréntesis por cuatro', 20),
+    ('dos elevado a tres elevado a dos', 512),
+    ('raíz cuadrada de 16 por 2', 8),
+    ('menos dos elevado a dos', -4),
+    ('menos dos más tres', 1),
+])
+def test_resultados(motor, texto, esperado):
+    resultado, _ = evaluar(motor, texto)
+    assert resultado == pytest.approx(esperado)
+
+
+def test_resultado_anterior(motor):
+    assert evaluar(motor, 'resultado más cinco', 7) == (12, 'suma con resultado anterior')
+    assert evaluar(motor, 'resultado anterior por 2', 7)[0] == 14
+
+
+def test_tipo_hablado(motor):
+    assert evaluar(motor, 'dos más tres')[1] == 'suma'
+    assert evaluar(motor, 'raíz cuadrada de 16')[1] == 'raíz cuadrada'
+    assert evaluar(motor, 'dos más tres por cuatro')[1] == 'operación combinada'
+
+
+@pytest.mark.parametrize('texto', ['hola', 'cinco', 'historial', 'resta'])
+def test_sin_operacion(motor, texto):
+    assert evaluar(motor, texto) is None
+
+
+def test_division_por_cero(motor):
+    assert evaluar(motor, 'cinco entre cero') == (None, 'división')
+
+
+def test_cache(motor):
+    motor.evaluar('2 más 3')
+    motor.evaluar('2  MÁS 3')
+    assert motor.estadisticas() == {'entradas': 1, 'aciertos': 1, 'fallos': 1}
@@ -0,0 +1,78 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+import gramatica_sphinx
+import main
+from calculadora_texto import CalculadoraTexto
+from gramatica_sphinx import crear_gramatica, vocabulario
+
+
+def acepta(jsgf, frase):
+    """Comprueba la frase contra la regla pública (solo la sintaxis que usa generar_jsgf)"""
+    reglas, publica = {}, None
+    for linea in jsgf.splitlines():
+        definicion = re.match(r'(public )?<(\w+)> = (.*);$', linea)
+        if definicion is None:
+            continue
+        if definicion.group(1):
+            publica = definicion.group(3)
+        else:
+            reglas[definicion.group(2)] = definicion.group(3).split(' | ')
+
+    patron = []
+    for simbolo in re.findall(r'<\w+>|[()\[\]|+]', publica):
+        if simbolo.startswith('<'):
+            patron.append('(?:' + '|'.join(re.escape(alternativa + ' ') for alternativa in reglas[simbolo[1:-1]]) + ')')
+        else:
+            patron.append({'(': '(?:', '[': '(?:', ']': ')?'}.get(simbolo, simbolo))
+    return re.fullmatch(''.join(patron), frase + ' ') is not None
+
+
+@pytest.fixture
+def comandos(monkeypatch):
+    """Las frases que CalculadoraVozOffline pasa a crear_gramatica"""
+    capturados = []
+    monkeypatch.setattr(gramatica_sphinx, 'crear_gramatica',
+                        lambda comandos, **_: capturados.extend(comandos))
+    calculadora = object.__new__(main.CalculadoraVozOffline)
+    calculadora.config = {'gramatica_sphinx': True, 'modo_verboso': False}
+    calculadora.gramatica_sphinx_preparada = False
+    calculadora.reconocedor_streaming = SimpleNamespace()
+    calculadora.nucleo = CalculadoraTexto()
+    calculadora.preparar_gramatica_sphinx()
+    return capturados
+
+
+@pytest.fixture
+def jsgf(comandos, tmp_path, monkeypatch):
+    """Gramática escrita por crear_gramatica con un diccionario que tiene todas las palabras"""
+    palabras = {palabra for frases in vocabulario(comandos).values()
+                for frase in frases for palabra in frase.split()}
+    diccionario = tmp_path / 'es.dict'
+    diccionario.write_text(''.join(f'{palabra} x\n' for palabra in sorted(palabras)), encoding='utf-8')
+    monkeypatch.setattr(gramatica_sphinx, 'ruta_diccionario', lambda idioma: str(diccionario))
+    ruta = crear_gramatica(comandos, directorio=str(tmp_path / 'gramatica'), verboso=False)
+    with open(ruta, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('frase', [
+    'historial de hoy',
+    'suma de todos los resultados',
+    'cuál fue la última raíz cuadrada',
+    'oye calculadora cuál fue la última multiplicación',
+    'dime la última suma por favor',
+])
+def test_consultas_del_historial_en_la_gramatica(jsgf, frase):
+    assert acepta(jsgf, frase)
+
+
+@pytest.mark.parametrize('frase', ['cinco más tres', 'último resultado', 'limpiar historial'])
+def test_operaciones_y_comandos_siguen_en_la_gramatica(jsgf, frase):
+    assert acepta(jsgf, frase)
+
+
+def test_la_gramatica_no_acepta_cualquier_cosa(jsgf):
+    assert not acepta(jsgf, 'cuál fue la última película')
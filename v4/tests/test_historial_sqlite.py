@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import pytest
+
+from historial_sqlite import HistorialSQLite
+
+
+@pytest.fixture
+def historial(tmp_path):
+    historial = HistorialSQLite(str(tmp_path / 'historial.db'), verboso=False).iniciar()
+    yield historial
+    historial.cerrar()
+
+
+def registrar(historial, fecha, operacion, resultado, tipo):
+    historial.registrar({'fecha': fecha, 'operacion': operacion, 'resultado': resultado, 'tipo': tipo})
+
+
+def test_consultas_ven_lo_encolado(historial):
+    registrar(historial, '2026-01-01T10:00:00', '2 más 3', 5, 'suma')
+    registrar(historial, '2026-01-01T10:01:00', 'raíz cuadrada de 9', 3, 'raíz cuadrada')
+    assert historial.contar() == 2
+    assert historial.suma_resultados() == (2, 8)
+
+
+def test_del_dia(historial):
+    hoy = date.today()
+    ayer = hoy - timedelta(days=1)
+    registrar(historial, f'{ayer.isoformat()}T23:59:59', '1 más 1', 2, 'suma')
+    registrar(historial, f'{hoy.isoformat()}T00:00:00', '2 más 2', 4, 'suma')
+    registrar(historial, f'{hoy.isoformat()}T12:00:00', '3 más 3', 6, 'suma')
+    assert [operacion for _, operacion, _, _ in historial.del_dia()] == ['2 más 2', '3 más 3']
+    assert [operacion for _, operacion, _, _ in historial.del_dia(ayer)] == ['1 más 1']
+
+
+def test_ultima_de_tipo_incluye_resultado_anterior(historial):
+    registrar(historial, '2026-01-01T10:00:00', 'raíz cuadrada de 9', 3, 'raíz cuadrada')
+    registrar(historial, '2026-01-01T10:01:00', 'raíz cuadrada del resultado', 1.7320508, 'raíz cuadrada con resultado anterior')
+    registrar(historial, '2026-01-01T10:02:00', '2 más 3', 5, 'suma')
+    assert historial.ultima_de_tipo('raíz cuadrada')[1] == 'raíz cuadrada del resultado'
+    assert historial.ultima_de_tipo('división') is None
+
+
+def test_tipo_mencionado_sin_tildes():
+    assert HistorialSQLite.tipo_mencionado('cuál fue la última raiz cuadrada') == 'raíz cuadrada'
+    assert HistorialSQLite.tipo_mencionado('cuál fue la última multiplicación') == 'multiplicación'
+    assert HistorialSQLite.tipo_mencionado('cuál fue la última cosa') is None
+
+
+def test_persiste_entre_sesiones(tmp_path):
+    archivo = str(tmp_path / 'historial.db')
+    historial = HistorialSQLite(archivo, verboso=False).iniciar()
+    registrar(historial, '2026-01-01T10:00:00', '2 más 3', 5, 'suma')
+    historial.cerrar()
+
+    historial = HistorialSQLite(archivo, verboso=False).iniciar()
+    try:
+        assert historial.contar() == 1
+    finally:
+        historial.cerrar()
+
+
+def test_ultimas_en_orden(historial):
+    for i in range(5):
+        registrar(historial, f'2026-01-01T10:0{i}:00', f'{i} más 0', i, 'suma')
+    assert [resultado for _, _, resultado, _ in historial.ultimas(3)] == [2, 3, 4]
@@ -0,0 +1,80 @@
+import wave
+from array import array
+
+from lectura_numeros import LecturaConcatenada, PAUSA_PALABRAS, PAUSA_PREFIJO, recortar_silencio
+from numeros_texto import numero_a_palabras
+
+FRECUENCIA = 8000
+
+
+class CacheFalsa:
+    """Una CacheFrases con un WAV por pieza en tmp_path"""
+
+    def __init__(self, directorio, piezas):
+        self.rutas = {}
+        for i, pieza in enumerate(piezas):
+            ruta = str(directorio / f'{i}.wav')
+            # 10 muestras de silencio, 4 de señal y otras 10 de silencio
+            muestras = array('h', [0] * 10 + [1000 + i] * 4 + [0] * 10)
+            with wave.open(ruta, 'wb') as wav:
+                wav.setsampwidth(2)
+                wav.setnchannels(1)
+                wav.setframerate(FRECUENCIA)
+                wav.writeframes(muestras.tobytes())
+            self.rutas[pieza] = ruta
+        self.reproducido = None
+
+    def contiene(self, pieza):
+        return pieza in self.rutas
+
+    def buscar(self, pieza):
+        return self.rutas.get(pieza)
+
+    def reproducir_pcm(self, datos, ancho, canales, frecuencia):
+        self.reproducido = (datos, ancho, canales, frecuencia)
+
+
+def test_numero_a_palabras():
+    assert numero_a_palabras('-1234.05') == ['menos', 'mil', 'doscientos', 'treinta', 'y', 'cuatro',
+                                             'coma', 'cero', 'cinco']
+    assert numero_a_palabras('21000') == ['veintiún', 'mil']
+    assert numero_a_palabras('1000000') == ['un', 'millón']
+    assert numero_a_palabras(str(10 ** 12 - 1))[:3] == ['novecientos', 'noventa', 'y']
+    assert numero_a_palabras(str(10 ** 12)) is None  # un billón
+    assert numero_a_palabras('1e+20') is None
+
+
+def test_recortar_silencio_deja_margen():
+    muestras = array('h', [0] * 1000 + [5000] * 10 + [0] * 1000)
+    recortado = array('h', recortar_silencio(muestras.tobytes(), 2, 1, FRECUENCIA))
+    margen = int(0.015 * FRECUENCIA)
+    assert len(recortado) == 10 + 2 * margen
+    assert recortar_silencio(bytes(100), 2, 1, FRECUENCIA) == bytes(100)
+
+
+def test_piezas():
+    lectura = LecturaConcatenada(None)
+    assert lectura.piezas('El resultado de la suma es 8') == ['El resultado de la suma es', 'ocho']
+    assert lectura.piezas('El último resultado es -2.5') == ['El último resultado es', 'menos', 'dos', 'coma', 'cinco']
+    assert lectura.piezas('Historial limpiado') is None
+
+
+def test_compone_con_pausas(tmp_path):
+    cache = CacheFalsa(tmp_path, ['El resultado de la suma es', 'treinta', 'y', 'uno'])
+    lectura = LecturaConcatenada(cache)
+    texto = 'El resultado de la suma es 31'
+    assert lectura.disponible(texto)
+    assert not lectura.disponible('El resultado de la suma es 32')
+
+    assert lectura.reproducir(texto)
+    datos, ancho, canales, frecuencia = cache.reproducido
+    assert (ancho, canales, frecuencia) == (2, 1, FRECUENCIA)
+    # Cada clip de 24 muestras queda en sus 4 de señal (el margen de recorte cubre el silencio)
+    pausas = int(PAUSA_PREFIJO * FRECUENCIA) + 2 * int(PAUSA_PALABRAS * FRECUENCIA)
+    assert len(datos) == (4 * 24 + pausas) * 2
+    assert lectura.lecturas == 1
+
+
+def test_sin_clips_se_sintetiza_entero(tmp_path):
+    lectura = LecturaConcatenada(CacheFalsa(tmp_path, ['El resultado de la suma es']))
+    assert not lectura.reproducir('El resultado de la suma es 8')
@@ -0,0 +1,39 @@
+import pytest
+
+from numeros_texto import convertir_numeros_texto
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('veintitrés', '23'),
+    ('ciento cuarenta y dos', '142'),
+    ('dos mil quinientos', '2500'),
+    ('tres coma cinco', '3.5'),
+    ('cero coma cero cinco', '0.05'),
+    ('menos siete', '-7'),
+    ('un millón', '1000000'),
+    ('mil millones', '1000000000'),
+    ('tres billones', '3000000000000'),
+    ('novecientos noventa y nueve mil novecientos noventa y nueve millones', '999999000000'),
+    ('tercero', '3'),
+    ('un cuarto', '0.25'),
+    ('tres y medio', '3.5'),
+])
+def test_numeros(texto, esperado):
+    assert convertir_numeros_texto(texto) == esperado
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('cuánto es dos más tres', 'cuánto es 2 más 3'),
+    # 'menos' entre dos operandos es una resta, no el signo
+    ('diez menos siete', '10 menos 7'),
+    ('resultado menos tres', 'resultado menos 3'),
+    # ... y delante de una potencia es el signo de toda la potencia
+    ('menos dos elevado a dos', 'menos 2 elevado a 2'),
+    ('la raíz cuadrada de dieciséis', 'la raíz cuadrada de 16'),
+])
+def test_frases(texto, esperado):
+    assert convertir_numeros_texto(texto) == esperado
+
+
+def test_sin_numeros():
+    assert convertir_numeros_texto('historial') == 'historial'
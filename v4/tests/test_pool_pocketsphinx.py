@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from speech_recognition.recognizers import pocketsphinx
+
+
+@pytest.fixture
+def modelo(tmp_path):
+    """Rutas de un modelo de Sphinx falso: get_decoder_pool solo comprueba que existan"""
+    (tmp_path / 'acustico').mkdir()
+    (tmp_path / 'modelo.lm.bin').write_text('')
+    (tmp_path / 'diccionario.dict').write_text('')
+    pocketsphinx.clear_decoder_cache()
+    yield (str(tmp_path / 'acustico'), str(tmp_path / 'modelo.lm.bin'), str(tmp_path / 'diccionario.dict'))
+    pocketsphinx.clear_decoder_cache()
+
+
+def gramaticas_en_cache():
+    return sorted(os.path.basename(clave[2][0]) for clave in pocketsphinx._decoder_pools if clave[2])
+
+
+def test_misma_gramatica_reutiliza_el_pool(modelo, tmp_path):
+    gramatica = tmp_path / 'a.gram'
+    gramatica.write_text('#JSGF V1.0;')
+    assert pocketsphinx.get_decoder_pool(modelo, grammar=str(gramatica)) is \
+        pocketsphinx.get_decoder_pool(modelo, grammar=str(gramatica))
+
+
+def test_gramatica_modificada_descarta_el_pool_viejo(modelo, tmp_path):
+    gramatica = tmp_path / 'a.gram'
+    gramatica.write_text('#JSGF V1.0;')
+    viejo = pocketsphinx.get_decoder_pool(modelo, grammar=str(gramatica))
+    pocketsphinx.get_decoder_pool(modelo)  # sin gramática: no se toca
+
+    os.utime(gramatica, (os.path.getmtime(gramatica) + 5,) * 2)
+    nuevo = pocketsphinx.get_decoder_pool(modelo, grammar=str(gramatica))
+    assert nuevo is not viejo
+    assert gramaticas_en_cache() == ['a.gram']
+    assert len(pocketsphinx._decoder_pools) == 2
+
+
+def test_gramatica_borrada_descarta_su_pool(modelo, tmp_path):
+    vieja, nueva = tmp_path / 'calculadora_1.gram', tmp_path / 'calculadora_2.gram'
+    vieja.write_text('#JSGF V1.0;')
+    pocketsphinx.get_decoder_pool(modelo, grammar=str(vieja))
+    nueva.write_text('#JSGF V1.0;')
+    vieja.unlink()
+    pocketsphinx.get_decoder_pool(modelo, grammar=str(nueva))
+    assert gramaticas_en_cache() == ['calculadora_2.gram']
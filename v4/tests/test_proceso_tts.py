@@ -0,0 +1,139 @@
+import struct
+import sys
+import textwrap
+
+import pytest
+
+import proceso_tts
+from proceso_tts import ProcesoEspeak, ProcesoFestival
+
+FRECUENCIA = 22050
+MUESTRAS_PALABRA = int(FRECUENCIA * 0.05)
+MUESTRAS_PAUSA = int(FRECUENCIA * 0.2)
+
+# Como espeak -m --stdin --stdout: una cabecera WAV, el audio de cada línea seguido
+# del <break> pedido, y la salida con búfer (el final del centinela se queda en él)
+ESPEAK_FALSO = f'''
+    import re, struct, sys, time
+    assert '-m' in sys.argv
+    salida = sys.stdout.buffer
+    salida.write(b'RIFF' + struct.pack('<I', 0x7ffff000) + b'WAVEfmt ' +
+                 struct.pack('<IHHIIHH', 16, 1, 1, {FRECUENCIA}, {FRECUENCIA * 2}, 2, 16) +
+                 b'data' + struct.pack('<I', 0x7ffff000 - 36))
+    for linea in sys.stdin.buffer:
+        texto = linea.decode('utf-8')
+        pausa = re.search(r'<break time="(\\d+)ms"/>', texto)
+        for i, palabra in enumerate(texto[:pausa.start()].split()):
+            if i:
+                salida.write(bytes({MUESTRAS_PAUSA} * 2))
+            if palabra == 'lento':
+                salida.flush()
+                time.sleep(0.3)
+            salida.write(struct.pack('<h', len(palabra)) * {MUESTRAS_PALABRA})
+        for _ in range(int({FRECUENCIA} * int(pausa.group(1)) / 1000) // 500):
+            salida.write(bytes(1000))
+'''
+
+# Como festival --server con (tts_return_to_client): WV + WAV + clave por frase y OK al final;
+# tras "doble" manda un OK de más que no corresponde a ninguna orden
+FESTIVAL_FALSO = f'''
+    import io, re, socket, struct, sys, wave
+    puerto = int(re.search(r'server_port (\\d+)', sys.argv[2]).group(1))
+    servidor = socket.socket()
+    servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    servidor.bind(('127.0.0.1', puerto))
+    servidor.listen(1)
+    conexion, _ = servidor.accept()
+    for linea in conexion.makefile('rb'):
+        texto = linea.decode('utf-8')
+        frase = re.search(r'SayText "(.*)"', texto)
+        if not frase:
+            conexion.sendall(b'OK\\n')
+            continue
+        wav = io.BytesIO()
+        with wave.open(wav, 'wb') as salida:
+            salida.setnchannels(1)
+            salida.setsampwidth(2)
+            salida.setframerate({FRECUENCIA})
+            salida.writeframes(struct.pack('<h', len(frase.group(1))) * 100)
+        extra = b'OK\\n' if 'doble' in texto else b''
+        conexion.sendall(b'WV\\n' + wav.getvalue() + b'ft_StUfF_key' + b'OK\\n' + extra)
+'''
+
+
+class Destino:
+    """Recoge el audio de cada locución"""
+
+    def __init__(self):
+        self.locuciones = []
+
+    def formato(self, frecuencia, canales, ancho):
+        self.formato_actual = (frecuencia, canales, ancho)
+
+    def empezar(self):
+        self.locuciones.append(b'')
+
+    def escribir(self, datos):
+        self.locuciones[-1] += datos
+
+    def terminar(self):
+        pass
+
+
+def programa(tmp_path, nombre, codigo):
+    ruta = tmp_path / nombre
+    ruta.write_text(f'#!{sys.executable}\n' + textwrap.dedent(codigo))
+    ruta.chmod(0o755)
+    return str(ruta)
+
+
+def audio_esperado(texto):
+    partes = [struct.pack('<h', len(palabra)) * MUESTRAS_PALABRA for palabra in texto.split()]
+    return bytes(MUESTRAS_PAUSA * 2).join(partes)
+
+
+@pytest.fixture(autouse=True)
+def con_salida(monkeypatch):
+    monkeypatch.setattr(proceso_tts.SalidaAudio, 'disponible', staticmethod(lambda: True))
+
+
+@pytest.fixture
+def espeak(tmp_path):
+    proceso = ProcesoEspeak(programa=programa(tmp_path, 'espeak', ESPEAK_FALSO), verboso=False)
+    yield proceso
+    proceso.cerrar()
+
+
+def test_espeak_corta_cada_frase_en_su_centinela(espeak):
+    destino = Destino()
+    frases = ['El resultado de la suma es 8', '¿Alguna otra operación?', 'Historial limpiado']
+    for frase in frases:
+        espeak.decir(frase, destino)
+    # Las pausas entre palabras se conservan; el centinela y lo que sobró de él, no
+    assert destino.locuciones == [audio_esperado(frase) for frase in frases]
+    assert espeak.reinicios == 0
+
+
+def test_espeak_no_corta_si_el_audio_se_retrasa(espeak):
+    destino = Destino()
+    espeak.decir('habla lento hoy', destino)
+    espeak.decir('y sigue', destino)
+    assert destino.locuciones == [audio_esperado('habla lento hoy'), audio_esperado('y sigue')]
+
+
+def test_espeak_escapa_el_texto(espeak):
+    destino = Destino()
+    espeak.decir('5 < 8 y 8 > 5', destino)
+    assert destino.locuciones == [audio_esperado('5 &lt; 8 y 8 &gt; 5')]
+
+
+def test_festival_descarta_restos_de_la_respuesta_anterior(tmp_path):
+    festival = ProcesoFestival(programa=programa(tmp_path, 'festival', FESTIVAL_FALSO), verboso=False)
+    try:
+        destino = Destino()
+        festival.decir('doble', destino)
+        festival.decir('otra frase', destino)
+        assert destino.locuciones == [struct.pack('<h', 5) * 100, struct.pack('<h', 10) * 100]
+        assert festival.reinicios == 0
+    finally:
+        festival.cerrar()
@@ -0,0 +1,82 @@
+import pytest
+import speech_recognition as sr
+
+from reconocimiento_streaming import ReconocedorStreaming
+
+
+class SesionFalsa:
+    def __init__(self, nombre, texto=None, error=None):
+        self.nombre = nombre
+        self.texto = texto
+        self.error = error
+        self.alimentada = b''
+        self.estado = 'abierta'
+
+    def iniciar(self):
+        return True
+
+    def alimentar(self, pcm16):
+        self.alimentada += pcm16
+
+    def finalizar(self):
+        self.estado = 'finalizada'
+        if self.error:
+            raise self.error
+        return self.texto
+
+    def cancelar(self):
+        self.estado = 'cancelada'
+
+
+class Trozo:
+    frame_data = b'\x01\x00' * 4
+    sample_width = 2
+
+
+class RecognizerFalso:
+    def listen(self, source, timeout=None, phrase_time_limit=None, stream=False):
+        yield Trozo()
+        yield Trozo()
+
+
+def reconocedor(sesiones, aceptar):
+    reconocedor = ReconocedorStreaming(RecognizerFalso(), aceptar=aceptar, verboso=False)
+    reconocedor.crear_sesiones = lambda motores, sample_rate: list(sesiones)
+    return reconocedor
+
+
+def es_orden(texto):
+    return 'más' in texto
+
+
+fuente = type('Fuente', (), {'SAMPLE_RATE': 16000})()
+
+
+def test_salta_la_hipotesis_que_no_es_orden():
+    sphinx, vosk = SesionFalsa('sphinx', 'mas tres'), SesionFalsa('vosk', 'dos más tres')
+    assert reconocedor([sphinx, vosk], es_orden).escuchar(fuente, ['sphinx', 'vosk']) == ('dos más tres', 'vosk')
+    assert sphinx.alimentada == vosk.alimentada == Trozo.frame_data * 2
+
+
+def test_la_primera_valida_cancela_las_demas():
+    sphinx, vosk = SesionFalsa('sphinx', 'dos más tres'), SesionFalsa('vosk', 'dos más dos')
+    assert reconocedor([sphinx, vosk], es_orden).escuchar(fuente, []) == ('dos más tres', 'sphinx')
+    assert vosk.estado == 'cancelada'
+
+
+def test_sin_orden_valida_la_del_motor_preferido():
+    sphinx, vosk = SesionFalsa('sphinx', ''), SesionFalsa('vosk', 'hola')
+    otra = SesionFalsa('otra', 'adiós')
+    assert reconocedor([sphinx, vosk, otra], es_orden).escuchar(fuente, []) == ('hola', 'vosk')
+    assert otra.estado == 'finalizada'
+
+
+def test_error_al_finalizar_pasa_al_siguiente():
+    sphinx = SesionFalsa('sphinx', error=RuntimeError('decoder roto'))
+    vosk = SesionFalsa('vosk', 'dos más tres')
+    assert reconocedor([sphinx, vosk], es_orden).escuchar(fuente, []) == ('dos más tres', 'vosk')
+
+
+def test_nada_entendido():
+    with pytest.raises(sr.UnknownValueError):
+        reconocedor([SesionFalsa('sphinx', ''), SesionFalsa('vosk', '')], es_orden).escuchar(fuente, [])
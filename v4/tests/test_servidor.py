@@ -0,0 +1,78 @@
+import os
+import socket
+import stat
+import threading
+
+import pytest
+
+import main
+from servidor import ServidorCalculadora, enviar_comando
+
+
+class CalculadoraFalsa:
+    """Lo mínimo que usa el servidor: procesar_comando_voz y hablar() de la calculadora real"""
+
+    hablar = main.CalculadoraVozOffline.hablar
+    cambiar_voz_interactivo = main.CalculadoraVozOffline.cambiar_voz_interactivo
+
+    def __init__(self):
+        self.salida_hablar = None
+        self.pausado = False
+        self.tts_engine = None
+        self.ultimo_resultado = 0
+
+    def procesar_comando_voz(self, comando):
+        if comando == 'pausar':
+            self.pausado = True
+            self.hablar("Calculadora pausada", 'alta')
+            return 'pausado'
+        if comando == 'cambiar voz':
+            self.cambiar_voz_interactivo()
+            return 'comando_especial'
+        self.ultimo_resultado = 5
+        self.hablar("El resultado es 5")
+        return 'operacion_exitosa'
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    servidor = ServidorCalculadora(CalculadoraFalsa(), str(tmp_path / 'calc.sock'))
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_responde_lo_que_diria(servidor):
+    respuesta = enviar_comando('dos más tres', servidor.ruta)
+    assert respuesta['estado'] == 'operacion_exitosa'
+    assert respuesta['mensajes'] == ["El resultado es 5"]
+    assert respuesta['resultado'] == 5
+
+
+def test_socket_privado(servidor):
+    assert stat.S_IMODE(os.stat(servidor.ruta).st_mode) == 0o600
+
+
+def test_pausa_no_deja_sin_respuesta(servidor):
+    enviar_comando('pausar', servidor.ruta)
+    assert enviar_comando('dos más tres', servidor.ruta)['mensajes'] == ["El resultado es 5"]
+
+
+def test_cambio_de_voz_rechazado(servidor):
+    mensajes = enviar_comando('cambiar voz', servidor.ruta)['mensajes']
+    assert len(mensajes) == 1 and 'modo interactivo' in mensajes[0]
+
+
+def test_sin_servidor(tmp_path):
+    assert enviar_comando('dos más tres', str(tmp_path / 'nadie.sock')) is None
+
+
+def test_servidor_colgado(tmp_path, capsys):
+    ruta = str(tmp_path / 'colgado.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as colgado:
+        colgado.bind(ruta)
+        colgado.listen(1)  # acepta la conexión pero nunca contesta
+        assert enviar_comando('dos más tres', ruta, timeout=0.2) is None
+    assert 'no responde' in capsys.readouterr().out